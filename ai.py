@@ -0,0 +1,51 @@
+from card import BLACK, COLORS, FACE_COLOR
+
+def dominant_color(hand):
+    """Color the AI holds most of, used when it plays a wild card"""
+    return COLORS[hand.dominant_color()]  # From the hand's counts, first color wins ties
+
+def greedy_move(engine, player):
+    """Play the first valid card in the hand, or None to draw"""
+    hand = engine.hands[player]
+    mask = engine.playable_mask()
+    if not hand.can_play(mask):
+        return None  # Known from the hand's index, without a scan
+    for card in hand:
+        if mask >> card.face & 1:
+            if FACE_COLOR[card.face] == BLACK:
+                return card, dominant_color(hand)
+            return card, None
+
+def random_move(engine, player):
+    """Play a random valid card, or None to draw"""
+    hand = engine.hands[player]
+    mask = engine.playable_mask()
+    if not hand.can_play(mask):
+        return None
+    # Every valid card is equally likely. Usually a good share of the hand
+    # is valid, so picking cards at random until one is valid takes a few
+    # tries whatever the hand size; after 8 misses, pick among the valid
+    # faces weighted by their counts instead.
+    choice = engine.rng.choice
+    for _ in range(8):
+        card = choice(hand.cards)
+        if mask >> card.face & 1:
+            break
+    else:
+        faces = hand.playable_faces(mask)
+        counts = hand.face_counts
+        pick = engine.rng.randrange(sum(counts[face] for face in faces))
+        for face in faces:
+            pick -= counts[face]
+            if pick < 0:
+                break
+        card = hand.card_of(face)
+    if FACE_COLOR[card.face] == BLACK:
+        return card, dominant_color(hand)
+    return card, None
+
+# Strategies by name, for the tournament runner
+STRATEGIES = {
+    "greedy": greedy_move,
+    "random": random_move,
+}
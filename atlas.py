@@ -0,0 +1,108 @@
+"""Card sprite atlas: every card image pre-scaled to each size the UI uses.
+
+Build it (again after changing the card images) with:
+
+    python atlas.py
+
+For each size there is one sheet with the cards stacked top to bottom,
+saved as PNG and as raw RGBA bytes. Stacking keeps every card's pixels
+contiguous, so a card is a slice of the raw file, which is memory-mapped
+instead of decoded. The raw files are build output and not committed;
+without them the PNG sheets are decoded once per size.
+"""
+import json
+import mmap
+import os
+import threading
+from PIL import Image
+
+CARD_DIR = "./media/cards"
+ATLAS_DIR = "./media/cards/atlas"
+SIZES = ((150, 225), (100, 150))  # Top card and deck, cards in the hand
+
+def sheet_name(size):
+    return f"cards_{size[0]}x{size[1]}"
+
+def build_atlas(source_dir=CARD_DIR, out_dir=ATLAS_DIR, sizes=SIZES):
+    """Write the sheets and index.json; returns the number of cards packed"""
+    names = sorted(name for name in os.listdir(source_dir) if name.endswith(".png"))
+    sources = [Image.open(os.path.join(source_dir, name)).convert("RGBA") for name in names]
+    os.makedirs(out_dir, exist_ok=True)
+    for width, height in sizes:
+        sheet = Image.new("RGBA", (width, height * len(names)))
+        for slot, source in enumerate(sources):
+            sheet.paste(source.resize((width, height), Image.LANCZOS), (0, slot * height))
+        base = os.path.join(out_dir, sheet_name((width, height)))
+        sheet.save(base + ".png", optimize=True)
+        with open(base + ".rgba", "wb") as f:
+            f.write(sheet.tobytes())
+    index = {"cards": names, "sizes": [list(size) for size in sizes]}
+    with open(os.path.join(out_dir, "index.json"), "w") as f:
+        json.dump(index, f, indent=1)
+    return len(names)
+
+class Atlas:
+    """Slices pre-scaled card images out of the atlas sheets.
+
+    Safe to use from the prefetch thread and the Tk thread at once: each
+    sheet is opened once, under a lock.
+    """
+    def __init__(self, directory=ATLAS_DIR):
+        self.directory = directory
+        with open(os.path.join(directory, "index.json")) as f:
+            index = json.load(f)
+        self.slots = {name: slot for slot, name in enumerate(index["cards"])}
+        self.sizes = {tuple(size) for size in index["sizes"]}
+        self._sheets = {}  # size -> raw RGBA buffer of the whole sheet
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, directory=ATLAS_DIR):
+        """The atlas in directory, or None if it has not been built"""
+        try:
+            return cls(directory)
+        except (OSError, ValueError):
+            return None
+
+    def _sheet(self, size):
+        buffer = self._sheets.get(size)
+        if buffer is not None:
+            return buffer
+        with self._lock:
+            buffer = self._sheets.get(size)
+            if buffer is not None:
+                return buffer  # Opened by the other thread meanwhile
+            base = os.path.join(self.directory, sheet_name(size))
+            try:
+                with open(base + ".rgba", "rb") as f:
+                    buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                with Image.open(base + ".png") as sheet:
+                    buffer = sheet.convert("RGBA").tobytes()
+            self._sheets[size] = buffer
+            return buffer
+
+    def image(self, path, size):
+        """PIL image of the card file at path scaled to size, or None if the
+        atlas has no such card or size"""
+        size = tuple(size)
+        slot = self.slots.get(os.path.basename(path))
+        if slot is None or size not in self.sizes:
+            return None
+        tile = size[0] * size[1] * 4
+        view = memoryview(self._sheet(size))[slot * tile:(slot + 1) * tile]
+        return Image.frombuffer("RGBA", size, view, "raw", "RGBA", 0, 1)
+
+    def close(self):
+        with self._lock:
+            for buffer in self._sheets.values():
+                if isinstance(buffer, mmap.mmap):
+                    try:
+                        buffer.close()
+                    except BufferError:
+                        pass  # An image still shows it; unmapped once that is freed
+            self._sheets.clear()
+
+if __name__ == "__main__":
+    count = build_atlas()
+    print(f"Packed {count} cards at {', '.join('x'.join(map(str, s)) for s in SIZES)} into {ATLAS_DIR}")
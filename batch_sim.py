@@ -0,0 +1,143 @@
+import numpy as np
+from card import (BLACK, CARD_FACE, COLORS, DRAW_FOUR, DRAW_TWO, FACE_COLOR, FACE_VALUE,
+                  NUM_FACES, PLAYABLE, REVERSE, SKIP, VALUES)
+
+# The card tables of card.py as arrays
+FACE_COLOR_NP = np.array(FACE_COLOR, dtype=np.int8)
+FACE_VALUE_NP = np.array(FACE_VALUE, dtype=np.int8)
+PLAYABLE_NP = np.array(
+    [[mask >> face & 1 for face in range(NUM_FACES)] for mask in PLAYABLE], dtype=bool
+)
+FULL_DECK = np.bincount(np.array(CARD_FACE), minlength=NUM_FACES).astype(np.int16)
+NOT_BLACK = FACE_COLOR_NP != BLACK
+
+class BatchSimulator:
+    """Plays many games in lockstep with NumPy, one turn per step().
+
+    Hands, draw pile and discard pile are stored as counts per face: drawing
+    a card is sampling a face weighted by the counts left in the pile, which
+    is the same as drawing from the top of a shuffled deck. Every seat plays
+    like ai.random_move: a random valid card, the color it holds most of
+    for wild cards, and a draw when it has nothing to play.
+    """
+    def __init__(self, num_games, num_players=3, seed=None, hand_size=7):
+        self.num_games = num_games
+        self.num_players = num_players
+        self.rng = np.random.default_rng(seed)
+        games = np.arange(num_games)
+
+        self.hands = np.zeros((num_games, num_players, NUM_FACES), dtype=np.int16)
+        self.deck = np.tile(FULL_DECK, (num_games, 1))
+        self.deck_size = np.full(num_games, len(CARD_FACE), dtype=np.int64)
+        self.discard = np.zeros((num_games, NUM_FACES), dtype=np.int16)  # Below the top card
+        self.current = np.zeros(num_games, dtype=np.int64)
+        self.direction = np.ones(num_games, dtype=np.int64)
+        self.winner = np.full(num_games, -1, dtype=np.int64)
+        self.done = np.zeros(num_games, dtype=bool)
+        self.turns = np.zeros(num_games, dtype=np.int64)
+
+        for _ in range(hand_size):
+            for player in range(num_players):
+                self._draw(games, np.full(num_games, player), 1)
+
+        # Initial card (not wild)
+        self.top = self._sample(self.deck * NOT_BLACK)
+        self.deck[games, self.top] -= 1
+        self.deck_size -= 1
+        self.active_color = FACE_COLOR_NP[self.top].astype(np.int64)
+
+    def _sample(self, weights):
+        """Pick one face per row, weighted by the counts in weights"""
+        cumulative = weights.cumsum(axis=1)
+        r = self.rng.random(len(weights)) * cumulative[:, -1]
+        return (cumulative > r[:, None]).argmax(axis=1)
+
+    def _draw(self, games, players, count):
+        """Move up to count cards from the draw pile into each player's hand,
+        refilling empty draw piles from the discard piles"""
+        for _ in range(count):
+            self._reshuffle(games)
+            has_cards = self.deck_size[games] > 0
+            games, players = games[has_cards], players[has_cards]
+            if len(games) == 0:
+                return
+            faces = self._sample(self.deck[games])
+            self.deck[games, faces] -= 1
+            self.deck_size[games] -= 1
+            self.hands[games, players, faces] += 1
+
+    def _reshuffle(self, games):
+        """Turn the discard piles of games with an empty deck into new decks"""
+        empty = games[self.deck_size[games] == 0]
+        if len(empty):
+            self.deck[empty] += self.discard[empty]
+            self.deck_size[empty] = self.deck[empty].sum(axis=1)
+            self.discard[empty] = 0
+
+    def step(self):
+        """Play one turn in every game that is still running"""
+        games = np.flatnonzero(~self.done)
+        if len(games) == 0:
+            return 0
+        players = self.current[games]
+        direction = self.direction[games]
+        hands = self.hands[games, players]
+
+        state = self.active_color[games] * len(VALUES) + FACE_VALUE_NP[self.top[games]]
+        legal = hands * PLAYABLE_NP[state]
+        can_play = legal.sum(axis=1) > 0
+        self.turns[games] += 1
+
+        # Players without a valid card draw one and pass
+        drawing, drawers = games[~can_play], players[~can_play]
+        stalled = (self.deck_size[drawing] == 0) & (self.discard[drawing].sum(axis=1) == 0)
+        self.done[drawing[stalled]] = True
+        drawing, drawers = drawing[~stalled], drawers[~stalled]
+        self._draw(drawing, drawers, 1)
+        self.current[drawing] = (drawers + self.direction[drawing]) % self.num_players
+
+        # The others play a random valid card
+        playing, players, direction = games[can_play], players[can_play], direction[can_play]
+        faces = self._sample(legal[can_play])
+        self.hands[playing, players, faces] -= 1
+        self.discard[playing, self.top[playing]] += 1
+        self.top[playing] = faces
+
+        colors = FACE_COLOR_NP[faces].astype(np.int64)
+        wild = colors == BLACK
+        color_counts = self.hands[playing[wild], players[wild], :52].reshape(-1, len(COLORS), 13).sum(axis=2)
+        colors[wild] = color_counts.argmax(axis=1)  # First color wins ties
+        self.active_color[playing] = colors
+
+        won = self.hands[playing, players].sum(axis=1) == 0
+        self.winner[playing[won]] = players[won]
+        self.done[playing[won]] = True
+        keep = ~won
+        playing, players, direction, faces = playing[keep], players[keep], direction[keep], faces[keep]
+
+        values = FACE_VALUE_NP[faces]
+        reverse = values == REVERSE
+        direction[reverse] *= -1
+        self.direction[playing] = direction
+        next_players = (players + direction) % self.num_players
+
+        for value, count in ((DRAW_TWO, 2), (DRAW_FOUR, 4)):
+            hit = values == value
+            self._draw(playing[hit], next_players[hit], count)
+
+        skipped = (values == SKIP) | (values == DRAW_TWO) | (values == DRAW_FOUR)
+        if self.num_players == 2:
+            skipped |= reverse  # Reverse acts as Skip
+        self.current[playing] = np.where(skipped, next_players + direction, next_players) % self.num_players
+        return len(games)
+
+    def run(self, max_turns=10000):
+        """Step until every game is over. Returns the winners (-1 for none)"""
+        while not self.done.all():
+            self.step()
+            self.done |= self.turns >= max_turns
+        return self.winner
+
+    def check_conservation(self):
+        total = self.hands.sum(axis=(1, 2)) + self.deck.sum(axis=1) + self.discard.sum(axis=1) + 1
+        return bool((total == len(CARD_FACE)).all() and (self.deck.sum(axis=1) == self.deck_size).all())
@@ -0,0 +1,209 @@
+from card import BLACK, CARDS, COLORS, FACE_COLOR, PLAYABLE, top_state
+
+MAX_BIAS = 8.0  # Cap on how much likelier a color gets from repeated wild choices
+
+class BeliefTracker:
+    """What one player knows about the cards they cannot see.
+
+    Subscribed to an engine, it follows every event and keeps the unseen
+    cards (the other hands and the deck), the size of every hand and what
+    each opponent cannot be holding. An opponent who draws instead of
+    playing holds none of the faces that were playable then: drawing on a
+    red 5 rules out every red card, every 5 and the wild cards. That only
+    holds for the cards they had at the time, so each opponent's hand is
+    kept as groups of cards with the same excluded faces ({mask: count}),
+    and cards drawn later start a group with no exclusions.
+
+    A wild card's chosen color is a hint rather than a rule: cards of that
+    color become twice as likely in the opponent's sampled hands (up to
+    MAX_BIAS), until they draw on that color.
+
+    It assumes players only draw when they cannot play, as the AIs do;
+    draws of the seats in draws_freely (a human, who may draw anyway) teach
+    nothing. If an opponent plays a card it was thought not to hold, their
+    exclusions are dropped.
+    """
+    def __init__(self, player, num_players=3, draws_freely=()):
+        self.player = player
+        self.draws_freely = frozenset(draws_freely)
+        self.num_players = num_players
+        self.unseen = []
+        self.discards = []
+        self.sizes = [0] * num_players
+        self.groups = [{} for _ in range(num_players)]
+        self.bias = [[1.0] * (len(COLORS) + 1) for _ in range(num_players)]
+        self.top = None
+        self.color = None
+
+    def sync(self, engine):
+        """Start over from engine's current state, with no exclusions"""
+        self.num_players = engine.num_players
+        own = engine.hands[self.player]
+        seen = {card.id for card in own}
+        seen.update(card.id for card in engine.discard_pile)
+        self.unseen = [card for card in CARDS if card.id not in seen]
+        self.discards = list(engine.discard_pile)
+        self._reset_hands([len(hand) for hand in engine.hands])
+        top = engine.top_card
+        self.top = None if top is None else top.face
+        self.color = engine.active_color
+        return self
+
+    def _reset_hands(self, sizes):
+        self.sizes = sizes
+        self.groups = [{0: size} if seat != self.player and size else {} for seat, size in enumerate(sizes)]
+        self.bias = [[1.0] * (len(COLORS) + 1) for _ in sizes]
+
+    def attach(self, engine):
+        """sync() with engine and follow its events from now on"""
+        self.sync(engine)
+        engine.subscribe(self)
+        return self
+
+    def copy(self):
+        other = BeliefTracker.__new__(BeliefTracker)
+        other.__dict__.update(self.__dict__)
+        other.unseen = list(self.unseen)
+        other.discards = list(self.discards)
+        other.sizes = list(self.sizes)
+        other.groups = [dict(groups) for groups in self.groups]
+        other.bias = [list(bias) for bias in self.bias]
+        return other
+
+    def in_sync(self, engine):
+        """Whether the counts agree with engine (they do unless an event was missed)"""
+        return (self.sizes == [len(hand) for hand in engine.hands]
+                and len(self.unseen) == len(engine.deck) + sum(
+                    self.sizes[seat] for seat in range(self.num_players) if seat != self.player))
+
+    def playable_mask(self):
+        if self.top is None:
+            return 0  # Nothing to learn from a draw before the first card
+        return PLAYABLE[top_state(self.top, self.color)]
+
+    def __call__(self, event, data):
+        handler = getattr(self, "_on_" + event, None)
+        if handler is not None:
+            handler(**data)
+
+    def _on_deal(self, hands, top):
+        seen = {card.id for card in hands[self.player]}
+        seen.add(top.id)
+        self.unseen = [card for card in CARDS if card.id not in seen]
+        self.discards = [top]
+        self._reset_hands([len(hand) for hand in hands])
+        self.top = top.face
+        self.color = FACE_COLOR[top.face]
+
+    def _on_play(self, player, card, color):
+        face = card.face
+        self.discards.append(card)
+        self.top = face
+        if FACE_COLOR[face] != BLACK:
+            self.color = FACE_COLOR[face]
+        self.sizes[player] -= 1
+        if player == self.player:
+            return
+        self.unseen.remove(card)
+        groups = self.groups[player]
+        # Take the card from the most constrained group that allows it: if it
+        # really came from a less constrained one, what is left is only
+        # constrained less than it could be, never wrongly
+        allowed = [mask for mask in groups if not mask >> face & 1]
+        if not allowed:
+            # It held a card it was thought not to: forget the exclusions
+            groups = self.groups[player] = {0: sum(groups.values())}
+            allowed = [0]
+        mask = max(allowed, key=int.bit_count)
+        if groups[mask] == 1:
+            del groups[mask]
+        else:
+            groups[mask] -= 1
+
+    def _on_color(self, player, color):
+        self.color = COLORS.index(color)
+        if player != self.player:
+            bias = self.bias[player]
+            bias[self.color] = min(bias[self.color] * 2, MAX_BIAS)
+
+    def _on_draw(self, player, cards, forced):
+        if not forced and player != self.player and player not in self.draws_freely:
+            # It had nothing playable, and the drawn card was never looked at
+            playable = self.playable_mask()
+            merged = {}
+            for mask, count in self.groups[player].items():
+                merged[mask | playable] = merged.get(mask | playable, 0) + count
+            self.groups[player] = merged
+            if self.color is not None:
+                self.bias[player][self.color] = 1.0
+        self._gained(player, cards)
+
+    def _on_penalty(self, player, cards):
+        self._gained(player, cards)
+
+    def _gained(self, player, cards):
+        self.sizes[player] += len(cards)
+        if player == self.player:
+            for card in cards:
+                self.unseen.remove(card)
+        elif cards:
+            groups = self.groups[player]
+            groups[0] = groups.get(0, 0) + len(cards)
+
+    def _on_reshuffle(self, size):
+        # Everything under the top card goes back into the deck, unseen again
+        self.unseen.extend(self.discards[:-1])
+        del self.discards[:-1]
+
+    def consistent(self, seat, cards):
+        """Whether seat could be holding cards, given its exclusions"""
+        if len(cards) != self.sizes[seat]:
+            return False
+        # Every group's mask contains those of the groups started after it,
+        # so checking the groups from the most constrained one is enough
+        needed = 0
+        for mask in sorted(self.groups[seat], key=int.bit_count, reverse=True):
+            needed += self.groups[seat][mask]
+            if sum(1 for card in cards if not mask >> card.face & 1) < needed:
+                return False
+        return True
+
+    def sample(self, rng, tries=16):
+        """Deal the unseen cards at random, consistently with the exclusions
+        and weighted by the color hints.
+
+        Returns (hands, deck): hands[seat] is the list of cards dealt to each
+        opponent (None for the player) and deck the cards left. The most
+        constrained groups are dealt first, each card picked at random and
+        rejected if excluded (or, with a hint, with the hint's odds), so it
+        costs a few random numbers per opponent card. After `tries`
+        rejections the card is picked among every allowed one.
+        """
+        pool = list(self.unseen)
+        hands = [None if seat == self.player else [] for seat in range(self.num_players)]
+        groups = [(mask.bit_count(), mask, seat, count)
+                  for seat, seat_groups in enumerate(self.groups) for mask, count in seat_groups.items()]
+        groups.sort(reverse=True)
+        random = rng.random
+        for _, excluded, seat, count in groups:
+            bias = self.bias[seat]
+            most = max(bias)
+            hand = hands[seat]
+            for _ in range(count):
+                for _ in range(tries):
+                    i = int(random() * len(pool))
+                    face = pool[i].face
+                    if excluded >> face & 1:
+                        continue
+                    if most > 1.0 and random() * most >= bias[FACE_COLOR[face]]:
+                        continue
+                    break
+                else:
+                    allowed = [i for i, card in enumerate(pool) if not excluded >> card.face & 1]
+                    if not allowed:
+                        allowed = range(len(pool))  # Out of sync: ignore the exclusions
+                    i = rng.choices(allowed, [bias[FACE_COLOR[pool[i].face]] for i in allowed])[0]
+                hand.append(pool[i])
+                pool[i] = pool[-1]
+                pool.pop()
+        return hands, pool
@@ -0,0 +1,74 @@
+"""Cost of one AI decision as the hand grows, with and without the hand index.
+
+For hand sizes from 7 to 50 cards, times greedy_move and random_move
+(which use the counts and face bitmask kept by Hand) against the previous
+versions that scanned the whole hand and recounted its colors. Each size
+uses 200 game states with a random top card, so both "can play" and
+"must draw" decisions are included.
+
+    python benchmarks/bench_ai_decision.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai import greedy_move, random_move
+from card import BLACK, COLORS, FACE_COLOR
+from engine import UnoEngine
+
+def scan_dominant_color(hand):
+    counts = [0] * (len(COLORS) + 1)
+    for card in hand:
+        counts[FACE_COLOR[card.face]] += 1
+    return COLORS[max(range(len(COLORS)), key=lambda c: counts[c])]
+
+def scan_greedy_move(engine, player):
+    hand = engine.hands[player]
+    mask = engine.playable_mask()
+    for card in hand:
+        if mask >> card.face & 1:
+            if FACE_COLOR[card.face] == BLACK:
+                return card, scan_dominant_color(hand)
+            return card, None
+    return None
+
+def scan_random_move(engine, player):
+    mask = engine.playable_mask()
+    valid = [card for card in engine.hands[player] if mask >> card.face & 1]
+    if not valid:
+        return None
+    card = engine.rng.choice(valid)
+    if FACE_COLOR[card.face] == BLACK:
+        return card, scan_dominant_color(engine.hands[player])
+    return card, None
+
+def states(hand_size, count=200):
+    result = []
+    for seed in range(count):
+        engine = UnoEngine(num_players=3, rng=random.Random(seed), uno_seats=())
+        engine.deal()
+        engine.draw_cards(0, hand_size - 7)
+        result.append(engine)
+    return result
+
+def time_strategy(strategy, engines, repeat=20):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for engine in engines:
+            strategy(engine, 0)
+        best = min(best, time.perf_counter() - start)
+    return best / len(engines) * 1e6
+
+def main():
+    print(f"{'hand':>4}  {'greedy scan':>11} {'indexed':>8}  {'random scan':>11} {'indexed':>8}   (us per decision)")
+    for hand_size in (7, 15, 25, 35, 50):
+        engines = states(hand_size)
+        row = [time_strategy(s, engines) for s in (scan_greedy_move, greedy_move, scan_random_move, random_move)]
+        print(f"{hand_size:>4}  {row[0]:>11.2f} {row[1]:>8.2f}  {row[2]:>11.2f} {row[3]:>8.2f}")
+
+if __name__ == "__main__":
+    main()
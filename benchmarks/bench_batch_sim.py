@@ -0,0 +1,63 @@
+"""Compare the NumPy batch simulator with the scalar engine.
+
+Both play random_move in every seat. Prints games per second for each and
+checks that the win rate of every seat agrees within 99% confidence.
+
+    python benchmarks/bench_batch_sim.py [scalar games] [batch games]
+"""
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from ai import random_move
+from batch_sim import BatchSimulator
+from engine import UnoEngine, play_game
+
+PLAYERS = 3
+
+def run_scalar(games):
+    wins = np.zeros(PLAYERS + 1, dtype=np.int64)  # Last slot: no winner
+    start = time.perf_counter()
+    for seed in range(games):
+        engine = UnoEngine(num_players=PLAYERS, rng=random.Random(seed), uno_seats=())
+        engine.deal()
+        winner = play_game(engine, [random_move] * PLAYERS)
+        wins[PLAYERS if winner is None else winner] += 1
+    return wins, time.perf_counter() - start
+
+def run_batch(games, batch_size=10000):
+    wins = np.zeros(PLAYERS + 1, dtype=np.int64)
+    start = time.perf_counter()
+    for seed, first in enumerate(range(0, games, batch_size)):
+        sim = BatchSimulator(min(batch_size, games - first), num_players=PLAYERS, seed=seed)
+        winners = sim.run()
+        assert sim.check_conservation()
+        wins += np.bincount(np.where(winners < 0, PLAYERS, winners), minlength=PLAYERS + 1)
+    return wins, time.perf_counter() - start
+
+def main(scalar_games=5000, batch_games=50000):
+    scalar_wins, scalar_time = run_scalar(scalar_games)
+    batch_wins, batch_time = run_batch(batch_games)
+    print(f"scalar: {scalar_games / scalar_time:10.0f} games/s")
+    print(f"batch:  {batch_games / batch_time:10.0f} games/s "
+          f"({scalar_time / scalar_games / (batch_time / batch_games):.1f}x)")
+
+    agree = True
+    for seat in range(PLAYERS):
+        p1, p2 = scalar_wins[seat] / scalar_games, batch_wins[seat] / batch_games
+        pooled = (scalar_wins[seat] + batch_wins[seat]) / (scalar_games + batch_games)
+        se = math.sqrt(pooled * (1 - pooled) * (1 / scalar_games + 1 / batch_games))
+        z = (p1 - p2) / se if se else 0.0
+        agree &= abs(z) < 2.576
+        print(f"seat {seat}: scalar {p1:.3f}  batch {p2:.3f}  z = {z:+.2f}")
+    print("win rates agree" if agree else "WIN RATES DIFFER")
+    return agree
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    sys.exit(0 if main(*args) else 1)
@@ -0,0 +1,88 @@
+"""Cost of card counting with BeliefTracker, and what it rules out.
+
+Plays 200 games of 3 and 6 players (greedy and random AIs), with a tracker
+on every seat, and prints:
+
+* the cost of the trackers following the game, per engine event;
+* samples per second of BeliefTracker.sample, and the microseconds of a
+  determinization for ISMCTS with and without it, on states taken every
+  few turns from seat 0's point of view;
+* how often a uniform determinization deals some opponent a hand that
+  contradicts what seat 0 saw them do, which the tracker never does.
+
+    python benchmarks/bench_beliefs.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai import greedy_move, random_move
+from beliefs import BeliefTracker
+from engine import UnoEngine
+from ismcts import determinize
+
+def play(players, seed, tracked, states=None):
+    """Play one game; returns the number of events. With states, appends
+    (engine copy, seat 0's tracker copy) every 5 turns"""
+    engine = UnoEngine(num_players=players, rng=random.Random(seed), uno_seats=())
+    trackers = [BeliefTracker(seat, players).attach(engine) for seat in range(players)] if tracked else []
+    events = []
+    engine.subscribe(lambda event, data: events.append(event))
+    engine.deal()
+    strategies = [greedy_move if (seed + seat) % 2 else random_move for seat in range(players)]
+    for turn in range(2000):
+        if engine.winner is not None:
+            break
+        player = engine.current_player
+        move = strategies[player](engine, player)
+        if move is not None:
+            engine.play(player, *move)
+        elif engine.draw_turn(player) is None:
+            break
+        if states is not None and turn % 5 == 4 and engine.winner is None:
+            states.append((engine.copy(), trackers[0].copy()))
+    return len(events)
+
+def best_of(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main(games=200):
+    for players in (3, 6):
+        print(f"{players} players")
+        events = sum(play(players, seed, False) for seed in range(games))
+        plain = best_of(lambda: [play(players, seed, False) for seed in range(games)], 3)
+        tracked = best_of(lambda: [play(players, seed, True) for seed in range(games)], 3)
+        print(f"  following the game   {(tracked - plain) / events / players * 1e6:7.2f} us per event per tracker")
+
+        states = []
+        for seed in range(games):
+            play(players, seed, True, states)
+        rng = random.Random(0)
+        sampling = best_of(lambda: [tracker.sample(rng) for _, tracker in states])
+        print(f"  sample()             {len(states) / sampling:7.0f} samples/s "
+              f"({sampling / len(states) * 1e6:.1f} us, {len(states)} states)")
+        uniform = best_of(lambda: [determinize(engine, 0, rng) for engine, _ in states])
+        counted = best_of(lambda: [determinize(engine, 0, rng, tracker) for engine, tracker in states])
+        print(f"  determinize          {uniform / len(states) * 1e6:7.1f} us uniform, "
+              f"{counted / len(states) * 1e6:.1f} us counting cards")
+
+        contradicted = constrained = 0
+        for engine, tracker in states:
+            if any(mask for seat in range(1, players) for mask in tracker.groups[seat]):
+                constrained += 1
+            state = determinize(engine, 0, rng)
+            if not all(tracker.consistent(seat, list(state.hands[seat])) for seat in range(1, players)):
+                contradicted += 1
+        print(f"  {constrained / len(states):.0%} of states exclude cards from some opponent; "
+              f"{contradicted / len(states):.0%} of uniform deals contradict them")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Per-draw cost of DrawPile over long games, with card conservation checks.
+
+Plays long games where players hold on to 8 to 12 cards, drawing below
+that and playing above it, so nobody wins and the deck is refilled from
+the discard pile many times. Reports the
+cost of a draw in each tenth of the game. A constant figure means draws
+don't get slower as the game goes on. Every 100 turns the game is checked
+to still hold all 108 cards exactly once.
+
+    python benchmarks/bench_draw_pile.py [games] [turns]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai import random_move
+from engine import UnoEngine
+
+def cycling_move(engine, player):
+    # Keep the cards moving between hands, discard pile and deck forever
+    if len(engine.hands[player]) < 8 + engine.rng.randrange(5):
+        return None
+    return random_move(engine, player)
+
+def main(games=20, turns=20000):
+    segments = 10
+    draw_time = [0.0] * segments
+    draws = [0] * segments
+    reshuffles = 0
+    for seed in range(games):
+        engine = UnoEngine(num_players=3, rng=random.Random(seed), uno_seats=())
+        engine.deal()
+        events = []
+        engine.subscribe(lambda event, data: event == "reshuffle" and events.append(1))
+        for turn in range(turns):
+            if engine.winner is not None:
+                break
+            player = engine.current_player
+            move = cycling_move(engine, player)
+            segment = turn * segments // turns
+            if move is None:
+                start = time.perf_counter()
+                drawn = engine.draw_turn(player)
+                draw_time[segment] += time.perf_counter() - start
+                draws[segment] += 1
+                if drawn is None:
+                    break
+            else:
+                engine.play(player, *move)
+            if turn % 100 == 0:
+                assert engine.check_conservation(), f"cards lost in game {seed}, turn {turn}"
+        assert engine.check_conservation()
+        reshuffles += len(events)
+
+    print(f"{games} games, {reshuffles} refills from the discard pile, all 108 cards conserved")
+    for segment in range(segments):
+        if draws[segment]:
+            print(f"turns {segment * 10:>3}-{segment * 10 + 10:>3}%: "
+                  f"{draw_time[segment] / draws[segment] * 1e6:6.2f} us/draw ({draws[segment]} draws)")
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
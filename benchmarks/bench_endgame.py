@@ -0,0 +1,80 @@
+"""Speed and transposition table use of the endgame solver.
+
+Plays greedy 3 player games until every hand has 3 cards or fewer, then
+asks EndgameSolver for the move of the player to move in each of these
+positions, with node budgets of 5000 and 20000 per decision and
+transposition tables of 2**12 and 2**16 slots. Prints the time per
+decision, nodes per second, the table's hit rate and evictions, and the
+mean depth searched.
+
+With a number of games, also plays each position to the end twice with
+the solver in the mover's seat and twice with greedy_move, and compares
+how often that seat wins:
+
+    python benchmarks/bench_endgame.py [games]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai import greedy_move
+from endgame import EndgameSolver, in_endgame
+from engine import UnoEngine, play_game
+
+def endgames(count, threshold=3):
+    positions = []
+    seed = 0
+    while len(positions) < count:
+        engine = UnoEngine(num_players=3, rng=random.Random(seed), uno_seats=())
+        engine.deal()
+        seed += 1
+        for _ in range(2000):
+            if engine.winner is not None:
+                break
+            if in_endgame(engine, threshold):
+                positions.append(engine)
+                break
+            player = engine.current_player
+            move = greedy_move(engine, player)
+            if move is not None:
+                engine.play(player, *move)
+            elif engine.draw_turn(player) is None:
+                break
+    return positions
+
+def main(games=0):
+    positions = endgames(60)
+    print(f"{'nodes':>6} {'table':>6} {'ms/decision':>12} {'nodes/s':>9} {'hit rate':>9} "
+          f"{'evictions':>10} {'depth':>6}")
+    for max_nodes in (5000, 20000):
+        for bits in (12, 16):
+            solver = EndgameSolver(max_nodes=max_nodes, table_bits=bits, seed=0)
+            start = time.perf_counter()
+            for engine in positions:
+                solver(engine, engine.current_player)
+            elapsed = time.perf_counter() - start
+            stats = solver.stats()
+            print(f"{max_nodes:>6} {2 ** bits:>6} {elapsed / len(positions) * 1000:>12.1f} "
+                  f"{stats['nodes_per_s']:>9.0f} {stats['hit_rate']:>9.1%} "
+                  f"{stats['evictions']:>10} {stats['mean_depth']:>6.1f}")
+
+    if games:
+        solver = EndgameSolver(seed=0)
+        for name in ("greedy", "solver"):
+            wins = played = 0
+            for index, position in enumerate(endgames(games)):
+                for game in range(2):
+                    engine = position.copy(rng=random.Random(f"{index}:{game}"))
+                    seat = engine.current_player
+                    strategies = [greedy_move] * 3
+                    if name == "solver":
+                        strategies[seat] = solver
+                    wins += play_game(engine, strategies) == seat
+                    played += 1
+            print(f"{name} in the mover's seat wins {wins / played:.1%} of {played} endgames")
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,39 @@
+"""Play headless games with the greedy AI in every seat.
+
+    python benchmarks/bench_engine.py [games]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai import greedy_move
+from engine import UnoEngine, play_game
+
+def main(games=2000):
+    turns = 0
+    wins = [0, 0, 0]
+    start = time.perf_counter()
+    for seed in range(games):
+        engine = UnoEngine(num_players=3, rng=random.Random(seed), uno_seats=())
+        moves = []
+
+        def count_moves(event, data):
+            if event == "play" or (event == "draw" and not data["forced"]):
+                moves.append(event)
+
+        engine.subscribe(count_moves)
+        engine.deal()
+        winner = play_game(engine, [greedy_move] * 3)
+        if winner is not None:
+            wins[winner] += 1
+        turns += len(moves)
+    elapsed = time.perf_counter() - start
+    print(f"{games} games, {turns} moves in {elapsed:.2f} s")
+    print(f"{games / elapsed:.0f} games/s, {elapsed / turns * 1e6:.1f} us/move")
+    print("wins per seat:", wins)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
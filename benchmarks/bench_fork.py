@@ -0,0 +1,54 @@
+"""Cost of cloning a game state and making one move on the clone.
+
+For 200 mid-game states of 3 and 6 players, times UnoEngine.copy() and
+the copy-on-write fork() alone, then each followed by apply() of the
+greedy move (a play or a draw), which is what a search does for every
+node it visits.
+
+    python benchmarks/bench_fork.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai import greedy_move
+from engine import UnoEngine, play_game
+
+def states(players, count=200):
+    result = []
+    for seed in range(count):
+        engine = UnoEngine(num_players=players, rng=random.Random(seed), uno_seats=())
+        engine.deal()
+        play_game(engine, [greedy_move] * players, max_turns=20)
+        if engine.winner is None:
+            result.append((engine, greedy_move(engine, engine.current_player)))
+    return result
+
+def time_us(func, pairs, repeat=30):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for engine, move in pairs:
+            func(engine, move)
+        best = min(best, time.perf_counter() - start)
+    return best / len(pairs) * 1e6
+
+def main():
+    rng = random.Random(0)
+    cases = {
+        "copy": lambda engine, move: engine.copy(rng),
+        "fork": lambda engine, move: engine.fork(),
+        "copy + apply": lambda engine, move: engine.copy(rng).apply(move),
+        "fork + apply": lambda engine, move: engine.fork().apply(move),
+    }
+    for players in (3, 6):
+        pairs = states(players)
+        print(f"{players} players ({len(pairs)} states)")
+        for name, func in cases.items():
+            print(f"  {name:<14} {time_us(func, pairs):6.2f} us")
+
+if __name__ == "__main__":
+    main()
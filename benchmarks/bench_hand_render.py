@@ -0,0 +1,109 @@
+"""Compare full hand rebuilds with HandView's virtualized rendering, and
+time scrolling HandView across a long hand.
+
+Needs customtkinter and a display (a virtual one such as Xvfb works):
+
+    python benchmarks/bench_hand_render.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import customtkinter as ctk
+from card import CARDS, Card
+from hand_view import HandView
+
+HAND_SIZES = [7, 15, 30, 60, 120]
+SCROLL_STEPS = 50
+UPDATES = 30
+
+class FullRebuild:
+    """The old update_player_hand: destroy every button and build them again"""
+    def __init__(self, card_holder):
+        self.card_holder = card_holder
+        self.created = 0
+
+    def render(self, cards):
+        for widget in self.card_holder.winfo_children():
+            widget.destroy()
+        for card in cards:
+            ctk.CTkButton(
+                self.card_holder,
+                image=card.get_image((100, 150)),
+                text="",
+                width=100,
+            ).pack(side="left", padx=5)
+            self.created += 1
+
+def distinct_cards(count):
+    """count cards, each a different object as in a real game. Past the 108
+    interned cards they are extra Card objects with the same faces, as if
+    several decks were in play."""
+    return [CARDS[i] if i < len(CARDS) else Card(i % len(CARDS)) for i in range(count)]
+
+def next_hand(hand, spare, rng):
+    """Alternate between playing a card from the hand and drawing one"""
+    hand = list(hand)
+    if rng.random() < 0.5 and hand:
+        spare.append(hand.pop(rng.randrange(len(hand))))
+    else:
+        hand.append(spare.pop())
+    return hand
+
+def run(renderer, root, hand_size, seed):
+    rng = random.Random(seed)
+    cards = distinct_cards(hand_size + UPDATES)
+    rng.shuffle(cards)
+    hand, spare = cards[:hand_size], cards[hand_size:]
+
+    renderer.render(hand)
+    root.update()
+    created_before = renderer.created
+    start = time.perf_counter()
+    for _ in range(UPDATES):
+        hand = next_hand(hand, spare, rng)
+        renderer.render(hand)
+        root.update()
+    elapsed = time.perf_counter() - start
+    return (renderer.created - created_before) / UPDATES, elapsed / UPDATES * 1000
+
+def scroll(root, hand_size):
+    """Milliseconds per step scrolling HandView from one end of the hand to the other"""
+    holder = ctk.CTkScrollableFrame(root, width=700, height=120, orientation="horizontal")
+    holder.pack()
+    view = HandView(holder, lambda c: None)
+    view.render(distinct_cards(hand_size))
+    root.update()
+    canvas = holder._parent_canvas
+    start = time.perf_counter()
+    for step in range(1, SCROLL_STEPS + 1):
+        canvas.xview_moveto(step / SCROLL_STEPS)
+        root.update()
+    elapsed = time.perf_counter() - start
+    stats = view.stats()
+    holder.destroy()
+    return elapsed / SCROLL_STEPS * 1000, stats
+
+def main():
+    root = ctk.CTk()
+    root.geometry("1000x600")
+    print(f"{'hand':>5} {'mode':>12} {'created/update':>15} {'ms/update':>10}")
+    for hand_size in HAND_SIZES:
+        for name, factory in (("rebuild", FullRebuild),
+                              ("virtualized", lambda h: HandView(h, lambda c: None))):
+            holder = ctk.CTkScrollableFrame(root, width=700, height=120, orientation="horizontal")
+            holder.pack()
+            created, ms = run(factory(holder), root, hand_size, seed=hand_size)
+            print(f"{hand_size:>5} {name:>12} {created:>15.1f} {ms:>10.2f}")
+            holder.destroy()
+    ms, stats = scroll(root, HAND_SIZES[-1])
+    print(f"scrolling {HAND_SIZES[-1]} cards: {ms:.2f} ms/step, "
+          f"{stats['created']} buttons created, {stats['live']} alive")
+    root.destroy()
+
+if __name__ == "__main__":
+    main()
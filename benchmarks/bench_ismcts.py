@@ -0,0 +1,37 @@
+"""Win rate and rollouts per second of the ISMCTS AI for several budgets.
+
+The ISMCTS player takes turns in every seat against two greedy AIs, which
+win a third of the games between themselves.
+
+    python benchmarks/bench_ismcts.py [games per budget] [workers]
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai import greedy_move
+from engine import UnoEngine, play_game
+from ismcts import ISMCTSPlayer
+
+BUDGETS = [0.01, 0.05, 0.2]
+
+def main(games=60, workers=0):
+    print(f"{'budget':>8} {'win rate':>9} {'rollouts/s':>11}")
+    for budget in BUDGETS:
+        player = ISMCTSPlayer(budget=budget, workers=workers, seed=1)
+        wins = 0
+        for game in range(games):
+            seat = game % 3
+            strategies = [greedy_move] * 3
+            strategies[seat] = player
+            engine = UnoEngine(num_players=3, rng=random.Random(game), uno_seats=())
+            engine.deal()
+            wins += play_game(engine, strategies) == seat
+        player.close()
+        print(f"{budget:>7.2f}s {wins / games:>9.1%} {player.rollouts_per_second:>11.0f}")
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*args)
@@ -0,0 +1,53 @@
+"""Cost of a turn for every table size from 2 to 10 players.
+
+Plays headless games with the greedy AI in every seat and prints the
+microseconds per turn (a play or a draw, with its card effect) for each
+player count. Turn order comes from the ring tables built once per table
+size, so the cost should stay flat as players are added.
+
+    python benchmarks/bench_players.py [games per size]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai import greedy_move
+from engine import MAX_PLAYERS, MIN_PLAYERS, UnoEngine, play_game
+
+def time_turns(players, games, repeat=3):
+    """Best microseconds per turn over repeat runs, and the turns of a run"""
+    best = float("inf")
+    for _ in range(repeat):
+        engines = []
+        for seed in range(games):
+            engine = UnoEngine(num_players=players, rng=random.Random(seed), uno_seats=())
+            engine.deal()
+            engines.append(engine)
+        turns = [0]
+
+        def count_turn(event, data):
+            if event == "play" or (event == "draw" and not data["forced"]):
+                turns[0] += 1
+
+        for engine in engines:
+            engine.subscribe(count_turn)
+        strategies = [greedy_move] * players
+        start = time.perf_counter()
+        for engine in engines:
+            play_game(engine, strategies)
+        best = min(best, (time.perf_counter() - start) / turns[0] * 1e6)
+    return best, turns[0]
+
+def main(games=500):
+    print(f"{'players':>7} {'turns':>8} {'us/turn':>8} {'vs 2':>6}")
+    first = None
+    for players in range(MIN_PLAYERS, MAX_PLAYERS + 1):
+        per_turn, turns = time_turns(players, games)
+        first = first or per_turn
+        print(f"{players:>7} {turns:>8} {per_turn:>8.2f} {per_turn / first:>5.2f}x")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,77 @@
+"""Load time, decision time and strength of the lookup-table AI.
+
+Needs a trained table (python policy.py). Prints the time to open it,
+microseconds per decision of PolicyPlayer and greedy_move on mid-game
+states, and the win rate of PolicyPlayer taking turns in every seat
+against two greedy AIs (a third of the games if it were no better), with
+how often its table had an entry when it had a choice.
+
+    python benchmarks/bench_policy.py [games] [table]
+"""
+import math
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ai import greedy_move
+from engine import UnoEngine, play_game
+from policy import POLICY_PATH, PolicyPlayer, PolicyTable
+
+def mid_game_states(count=300):
+    states = []
+    for seed in range(count):
+        engine = UnoEngine(num_players=3, rng=random.Random(seed), uno_seats=())
+        engine.deal()
+        play_game(engine, [greedy_move] * 3, max_turns=15)
+        if engine.winner is None:
+            states.append(engine)
+    return states
+
+def decision_us(strategy, states, repeat=20):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for engine in states:
+            strategy(engine, engine.current_player)
+        best = min(best, time.perf_counter() - start)
+    return best / len(states) * 1e6
+
+def main(games=3000, path=None):
+    os.chdir(ROOT)  # The default table path is relative
+    path = path or POLICY_PATH
+    start = time.perf_counter()
+    table = PolicyTable.load(path)
+    if table is None:
+        print(f"No policy table at {path}; train one with python policy.py")
+        return 1
+    print(f"open table          {(time.perf_counter() - start) * 1e6:8.1f} us")
+    player = PolicyPlayer(table)
+
+    states = mid_game_states()
+    print(f"greedy_move         {decision_us(greedy_move, states):8.2f} us per decision")
+    print(f"PolicyPlayer        {decision_us(player, states):8.2f} us per decision")
+
+    player.hits = player.misses = 0
+    wins = 0
+    for game in range(games):
+        seat = game % 3
+        strategies = [greedy_move] * 3
+        strategies[seat] = player
+        engine = UnoEngine(num_players=3, rng=random.Random(f"eval:{game}"), uno_seats=())
+        engine.deal()
+        wins += play_game(engine, strategies) == seat
+    rate = wins / games
+    margin = 1.96 * math.sqrt(rate * (1 - rate) / games)
+    choices = player.hits + player.misses
+    print(f"win rate vs 2 greedy {rate:7.1%} +/- {margin:.1%} over {games} games "
+          f"(table entry for {player.hits / choices:.0%} of {choices} choices)")
+    table.close()
+    return 0
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    sys.exit(main(int(args[0]) if args else 3000, args[1] if len(args) > 1 else None))
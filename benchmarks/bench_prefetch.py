@@ -0,0 +1,62 @@
+"""Time a drawn card's image costs the Tk thread, with and without prefetch.
+
+For every face at the hand size, measures on the main thread what a draw
+does: ImageCache.get plus the scaling CTkImage does when the button is
+drawn. "cold" starts from an empty cache; "prefetched" first lets
+ImageCache.prefetch prepare every face on its background thread (as
+main.py does while the player is on the menus). Both are run decoding
+the PNG files and with the atlas, each in a fresh process.
+
+    python benchmarks/bench_prefetch.py
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def child(mode, prefetch):
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)  # Card image paths are relative
+    from atlas import Atlas
+    from card import FACE_IMAGES
+    from images import ImageCache
+
+    cache = ImageCache(atlas=Atlas.load() if mode == "atlas" else None)
+    size = (100, 150)
+    background_ms = 0.0
+    if prefetch:
+        begin = time.perf_counter()
+        cache.prefetch([(path, size) for path in FACE_IMAGES]).join()
+        background_ms = (time.perf_counter() - begin) * 1000
+
+    times = []
+    for path in FACE_IMAGES:
+        begin = time.perf_counter()
+        image = cache.get(path, size)
+        source = image.cget("light_image")
+        if source.size != size:
+            source = source.resize(size)  # CTkImage does this when drawing
+        source.load()
+        times.append((time.perf_counter() - begin) * 1000)
+    times.sort()
+    print(json.dumps({"p50": times[len(times) // 2], "max": times[-1], "total": sum(times),
+                      "background": background_ms, "prefetch_hits": cache.prefetch_hits}))
+
+def main():
+    print(f"{'mode':<18} {'p50 ms':>7} {'max ms':>7} {'total ms':>9}   {'background ms':>13}")
+    for mode in ("files", "atlas"):
+        for prefetch in (False, True):
+            out = subprocess.run([sys.executable, __file__, "--child", mode, str(int(prefetch))],
+                                 capture_output=True, text=True, check=True).stdout
+            r = json.loads(out.splitlines()[-1])
+            name = f"{mode} {'prefetched' if prefetch else 'cold'}"
+            print(f"{name:<18} {r['p50']:>7.3f} {r['max']:>7.3f} {r['total']:>9.1f}   {r['background']:>13.1f}")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3] == "1")
+    else:
+        main()
@@ -0,0 +1,69 @@
+"""Replay speed of game logs, checked against the games that wrote them.
+
+Plays seeded games with a GameLogger attached, replays every log and
+checks that the replay ends with the same hands, discard pile and winner.
+Reports the log size, replays per second and the time to seek to a
+random turn with snapshots.
+
+    python benchmarks/bench_replay.py [games]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai import greedy_move, random_move
+from engine import UnoEngine, play_game
+from game_log import GameLogger, Replayer, replay_many
+
+def human(engine, player):
+    # Forgets to call UNO half the time, so logs hold penalties too
+    if len(engine.hands[player]) == 2 and engine.rng.random() < 0.5:
+        engine.call_uno(player)
+    return random_move(engine, player)
+
+def main(games=2000):
+    directory = tempfile.mkdtemp()
+    paths, finals = [], []
+    for seed in range(games):
+        engine = UnoEngine(num_players=3, seed=seed)
+        path = os.path.join(directory, f"{seed}.unolog")
+        logger = GameLogger(path, engine)
+        engine.deal()
+        play_game(engine, [human, random_move, greedy_move])
+        logger.close()
+        paths.append(path)
+        finals.append(engine)
+
+    size = sum(os.path.getsize(path) for path in paths) / games
+    print(f"{games} games logged, {size:.0f} bytes per log")
+
+    for path, original in zip(paths, finals):
+        replayed = Replayer.from_file(path).run()
+        assert replayed.winner == original.winner, path
+        assert replayed.hands == original.hands, path
+        assert replayed.discard_pile == original.discard_pile, path
+        assert replayed.check_conservation(), path
+    print("every replay matches its game")
+
+    start = time.perf_counter()
+    replay_many(paths)
+    elapsed = time.perf_counter() - start
+    print(f"replay_many: {games / elapsed:8.0f} logs/s")
+
+    rng = random.Random(0)
+    replayers = [Replayer.from_file(path) for path in paths[:50]]
+    seeks = 0
+    start = time.perf_counter()
+    for _ in range(20):
+        for replayer in replayers:
+            replayer.seek(rng.randrange(replayer.turns + 1))
+            seeks += 1
+    elapsed = time.perf_counter() - start
+    print(f"seek:        {elapsed / seeks * 1e6:8.1f} us per random seek (snapshots every 16 turns)")
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
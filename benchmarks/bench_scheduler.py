@@ -0,0 +1,70 @@
+"""Frame lag of the Tk loop while the AI thinks for a long time.
+
+Runs the ISMCTS AI with a 1 s budget per move three ways: inside a Tk
+callback (the old blocking loop), on a TurnScheduler thread and on a
+TurnScheduler process pool, and prints the lag percentiles measured by
+FrameMonitor. Needs a display (a virtual one such as Xvfb works).
+
+    python benchmarks/bench_scheduler.py [moves]
+"""
+import os
+import random
+import sys
+import tkinter
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import UnoEngine
+from ismcts import ISMCTSPlayer
+from scheduler import FrameMonitor, TurnScheduler
+
+BUDGET = 1.0
+
+def game():
+    engine = UnoEngine(num_players=3, rng=random.Random(0))
+    engine.deal()
+    engine.current_player = 1
+    return engine
+
+def run(root, mode, moves):
+    monitor = FrameMonitor(root)
+    monitor.start()
+    strategy = ISMCTSPlayer(budget=BUDGET, seed=1)
+    engine = game()
+    remaining = [moves]
+
+    def next_move(_move=None):
+        if remaining[0] == 0:
+            root.quit()
+            return
+        remaining[0] -= 1
+        if mode == "blocking":
+            strategy(engine.copy(), 1)
+            root.after(1, next_move)
+        else:
+            scheduler.request(strategy, engine.copy(), 1, next_move)
+
+    scheduler = None
+    if mode == "thread":
+        scheduler = TurnScheduler(root)
+    elif mode == "process":
+        scheduler = TurnScheduler(root, executor=ProcessPoolExecutor(1))
+    root.after(50, next_move)
+    root.mainloop()
+    monitor.stop()
+    if scheduler is not None:
+        scheduler.shutdown()
+    return monitor.stats()
+
+def main(moves=3):
+    root = tkinter.Tk()
+    print(f"{'mode':>9} {'frames':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for mode in ("blocking", "thread", "process"):
+        stats = run(root, mode, moves)
+        print(f"{mode:>9} {stats['frames']:>7} {stats['p50_ms']:>8.1f} "
+              f"{stats['p99_ms']:>8.1f} {stats['max_ms']:>8.1f}")
+    root.destroy()
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,91 @@
+"""Startup and first-frame cost of the card images, with and without the atlas.
+
+Each mode runs in a fresh process so nothing is cached in memory. Reports:
+
+* images: getting the 9 images of the first frame ready to display (the
+  deck, the top card and a 7 card hand), scaled to their sizes;
+* all cards: the same for every card at both sizes, as a long game ends up
+  doing;
+* first frame: with a display, the time from creating the window to the
+  first drawn game frame.
+
+"files" is how the game loaded images before the atlas: decode each PNG
+at full size, then scale it. Build the atlas first with python atlas.py.
+
+    python benchmarks/bench_startup.py
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def child(mode):
+    start = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)  # Card image paths are relative
+    from PIL import Image
+    from atlas import Atlas, SIZES
+    from card import CARDS
+    from images import ImageCache
+    imported = time.perf_counter()
+
+    def ready(cache, path, size):
+        image = cache.source(path, size)
+        if image.size != tuple(size):
+            image = image.resize(size)  # CTkImage would do this when drawing
+        image.load()
+
+    back = "./media/cards/pyUNO Retro.png"
+    first_frame = [(back, (150, 225)), (CARDS[0].image_path, (150, 225))]
+    first_frame += [(card.image_path, (100, 150)) for card in CARDS[10:80:10]]
+    every_card = [(path, size) for path in {card.image_path for card in CARDS} | {back} for size in SIZES]
+
+    results = {"import_ms": (imported - start) * 1000}
+    for name, images in (("images_ms", first_frame), ("all_cards_ms", every_card)):
+        cache = ImageCache(atlas=Atlas.load() if mode == "atlas" else None)
+        begin = time.perf_counter()
+        for path, size in images:
+            ready(cache, path, size)
+        results[name] = (time.perf_counter() - begin) * 1000
+
+    try:
+        import customtkinter as ctk
+        begin = time.perf_counter()
+        root = ctk.CTk()
+    except Exception:  # No display
+        results["first_frame_ms"] = None
+    else:
+        import images
+        sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+        from suite import render_setup
+        root.destroy()
+        images.image_cache.atlas = Atlas.load() if mode == "atlas" else None
+        images.image_cache.clear()
+        root, _ = render_setup()
+        root.update()
+        results["first_frame_ms"] = (time.perf_counter() - begin) * 1000
+        root.destroy()
+    print(json.dumps(results))
+
+def main():
+    from atlas import Atlas
+    if Atlas.load(os.path.join(ROOT, "media", "cards", "atlas")) is None:
+        print("No atlas; run python atlas.py first")
+        return
+    for mode in ("files", "atlas"):
+        out = subprocess.run([sys.executable, __file__, "--child", mode],
+                             capture_output=True, text=True, check=True).stdout
+        r = json.loads(out.splitlines()[-1])
+        frame = "no display" if r["first_frame_ms"] is None else f"{r['first_frame_ms']:7.1f} ms"
+        print(f"{mode:<6} import {r['import_ms']:6.1f} ms   images {r['images_ms']:6.1f} ms   "
+              f"all cards {r['all_cards_ms']:7.1f} ms   first frame {frame}")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        child(sys.argv[2])
+    else:
+        sys.path.insert(0, ROOT)
+        main()
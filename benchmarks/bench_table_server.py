@@ -0,0 +1,119 @@
+"""Load test of table_server.py: many bot clients playing at once.
+
+The server runs in its own process with no AI delay. Bot processes open
+--tables connections between them; each bot joins a table of 3 (itself
+and 2 server AIs), plays greedy moves as fast as the server answers and
+joins a new table when a game ends. Reports:
+
+* move latency: from a bot sending its move to the TURN message of the
+  next turn it plays, so it includes the AI moves in between (p50/p99);
+* server CPU: CPU seconds the server used per wall second;
+* tables per core: the number of tables played at this pace that one
+  fully used core could serve (tables / server CPU share).
+
+    python benchmarks/bench_table_server.py --tables 200 --seconds 10
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import protocol
+from ai import greedy_move
+from table_client import TableClient, TableView
+from table_server import TableServer
+
+def run_server(pipe):
+    async def main():
+        server = TableServer(ai_delay=0, seed=1)
+        listener = await server.start("127.0.0.1", 0)
+        pipe.send(listener.sockets[0].getsockname()[1])
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, pipe.recv)  # Started
+        cpu, games, moves = time.process_time(), server.games, server.moves
+        await loop.run_in_executor(None, pipe.recv)  # Stopped
+        pipe.send((time.process_time() - cpu, server.games - games, server.moves - moves))
+    asyncio.run(main())
+
+async def bot(port, stop_at, latencies):
+    client = await TableClient.open("127.0.0.1", port)
+    client.send(protocol.join(3, 1))
+    view = TableView()
+    sent = None
+    async for message in client:
+        event, data = view.apply(message)
+        if event == "hands":
+            if time.perf_counter() >= stop_at:
+                break
+            client.send(protocol.join(3, 1))
+            view = TableView()
+            sent = None
+        elif event == "turn" and view.current_player == 0 and not view.over:
+            now = time.perf_counter()
+            if sent is not None:
+                latencies.append(now - sent)
+            if len(view.hands[0]) == 2:
+                client.send(protocol.UNO_MESSAGE)
+            move = greedy_move(view, 0)
+            client.send(protocol.play(*move) if move is not None else protocol.DRAW_MESSAGE)
+            sent = now
+    client.close()
+
+def run_bots(port, count, start_at, seconds, pipe):
+    async def main():
+        await asyncio.sleep(max(0.0, start_at - time.time()))
+        latencies = []
+        stop_at = time.perf_counter() + seconds
+        await asyncio.gather(*(bot(port, stop_at, latencies) for _ in range(count)))
+        return latencies
+    pipe.send(asyncio.run(main()))
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tables", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--bot-processes", type=int, default=2)
+    args = parser.parse_args()
+
+    server_pipe, child_pipe = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=run_server, args=(child_pipe,))
+    server.start()
+    port = server_pipe.recv()
+
+    start_at = time.time() + 0.5
+    bots = []
+    for i in range(args.bot_processes):
+        count = args.tables // args.bot_processes + (i < args.tables % args.bot_processes)
+        parent, child = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=run_bots, args=(port, count, start_at, args.seconds, child))
+        process.start()
+        bots.append((process, parent))
+
+    time.sleep(max(0.0, start_at - time.time()))
+    server_pipe.send("start")
+    wall = time.perf_counter()
+    latencies = []
+    for process, pipe in bots:
+        latencies += pipe.recv()
+        process.join()
+    wall = time.perf_counter() - wall
+    server_pipe.send("stop")
+    cpu, games, moves = server_pipe.recv()
+    server.join()
+
+    share = cpu / wall
+    print(f"tables: {args.tables}  games: {games}  moves: {moves}  ({wall:.1f} s)")
+    print(f"move latency: p50 {percentile(latencies, 0.5) * 1e3:.2f} ms  p99 {percentile(latencies, 0.99) * 1e3:.2f} ms")
+    print(f"server CPU: {share:.2f} cores  ({moves / cpu:,.0f} moves and {games / cpu:,.1f} games per CPU second)")
+    print(f"tables per core at this pace: {args.tables / share:,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Check that AI announcements keep the widget count and memory flat.
+
+Plays 500 AI turns (greedy moves for every seat, rematching when a game
+ends) through a GameManager, so every play, draw and color choice goes
+through show_message and its ToastPool, pumping the Tk loop after each
+turn. Prints the widget count and resident memory every 100 turns and
+exits with status 1 if the widgets (other than the hand's cards) grew
+after the first 100 turns or memory grew by more than 8 MB.
+
+Needs customtkinter and a display (a virtual one such as Xvfb works):
+
+    python benchmarks/bench_toasts.py [turns]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from suite import Skip, render_setup
+
+def widget_count(widget, skip):
+    """Widgets under widget, not counting skip (the hand, whose size varies)"""
+    return 1 + sum(widget_count(child, skip) for child in widget.winfo_children() if child is not skip)
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+def main(turns=500):
+    try:
+        root, manager = render_setup()
+    except Skip as e:
+        print(f"skipped: {e}")
+        return 0
+    from ai import greedy_move
+    hand = manager.ui_elements['card_holder']
+
+    samples = []
+    for turn in range(1, turns + 1):
+        engine = manager.engine
+        if engine.winner is not None:
+            manager.rematch()
+            engine = manager.engine
+        player = engine.current_player
+        move = greedy_move(engine, player)
+        if move is not None:
+            engine.play(player, *move)
+        elif engine.draw_turn(player) is None:
+            manager.rematch()
+        manager.update_game_state()
+        root.update()
+        if turn % 100 == 0:
+            samples.append((turn, widget_count(root, hand), rss_mb()))
+            print(f"turn {turn:>4}: {samples[-1][1]} widgets, {samples[-1][2]:.1f} MB, toasts {manager.toasts.stats()}")
+
+    # Let the last messages expire
+    end = time.perf_counter() + 2
+    while time.perf_counter() < end:
+        root.update()
+        time.sleep(0.01)
+    print(f"after 2 s idle: {widget_count(root, hand)} widgets, toasts {manager.toasts.stats()}")
+    root.destroy()
+
+    widgets = [count for _, count, _ in samples]
+    growth = samples[-1][2] - samples[0][2]
+    flat = max(widgets) == min(widgets) and growth < 8
+    print("flat" if flat else f"NOT flat: widgets {min(widgets)}-{max(widgets)}, memory +{growth:.1f} MB")
+    return 0 if flat else 1
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
@@ -0,0 +1,38 @@
+"""How the tournament runner scales with the number of worker processes.
+
+Plays the same seeded tournament with 1 worker and with every core, prints
+games per second and the speedup, and checks that both give the same
+totals (exit status 1 if not).
+
+    python benchmarks/bench_tournament.py [games] [workers]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tournament import run_tournament
+
+LINEUP = ["greedy", "random", "greedy"]
+
+def run(games, workers):
+    start = time.perf_counter()
+    for totals in run_tournament(LINEUP, games, workers=workers, seed=0):
+        pass
+    return totals, time.perf_counter() - start
+
+def main(games=4000, workers=None):
+    workers = workers or os.cpu_count()
+    single, single_time = run(games, 1)
+    print(f"1 worker:   {games / single_time:8.0f} games/s")
+    multi, multi_time = run(games, workers)
+    print(f"{workers} workers: {games / multi_time:8.0f} games/s "
+          f"({single_time / multi_time:.2f}x, {single_time / multi_time / workers:.0%} of linear)")
+    same = single == multi
+    print("same totals" if same else "TOTALS DIFFER")
+    return same
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    sys.exit(0 if main(*args) else 1)
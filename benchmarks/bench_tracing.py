@@ -0,0 +1,87 @@
+"""Cost of the tracing spans, off and on.
+
+Times an empty span with tracing off and on, then headless greedy games
+whose AI decisions and engine steps are wrapped in spans guarded by
+tracer.enabled, as GameManager does, against the same games without
+spans. Finally writes the trace of
+the traced run and prints its summary.
+
+    python benchmarks/bench_tracing.py [trace.json]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai import greedy_move
+from engine import UnoEngine
+from tracing import Tracer
+
+def span_cost(tracer, count=200_000):
+    start = time.perf_counter()
+    for _ in range(count):
+        with tracer.span("empty"):
+            pass
+    return (time.perf_counter() - start) / count * 1e9
+
+def guarded_cost(tracer, count=200_000):
+    start = time.perf_counter()
+    for _ in range(count):
+        if tracer.enabled:
+            with tracer.span("empty"):
+                pass
+    return (time.perf_counter() - start) / count * 1e9
+
+def play(tracer, games=300):
+    """Seconds for games played with (tracer given) or without spans"""
+    engines = []
+    for seed in range(games):
+        engine = UnoEngine(num_players=3, rng=random.Random(seed), uno_seats=())
+        engine.deal()
+        engines.append(engine)
+    start = time.perf_counter()
+    for engine in engines:
+        for _ in range(10000):
+            if engine.winner is not None:
+                break
+            player = engine.current_player
+            if tracer is None:
+                move = greedy_move(engine, player)
+                drawn = engine.play(player, *move) if move is not None else engine.draw_turn(player)
+            elif tracer.enabled:
+                # Guarded like GameManager's engine steps
+                with tracer.span("ai.decision"):
+                    move = greedy_move(engine, player)
+                with tracer.span("engine.step"):
+                    drawn = engine.play(player, *move) if move is not None else engine.draw_turn(player)
+            else:
+                move = greedy_move(engine, player)
+                drawn = engine.play(player, *move) if move is not None else engine.draw_turn(player)
+            if drawn is None:
+                break
+    return time.perf_counter() - start
+
+def main(trace_path=None):
+    off, on = Tracer(), Tracer(enabled=True)
+    print(f"empty span: {span_cost(off):.0f} ns off, {span_cost(on):.0f} ns on, "
+          f"{guarded_cost(off):.0f} ns off when guarded")
+    on.clear()
+
+    best = {}
+    for _ in range(5):
+        for name, tracer in (("no spans", None), ("spans off", off), ("spans on", on)):
+            on.clear()
+            best[name] = min(best.get(name, float("inf")), play(tracer))
+    for name, seconds in best.items():
+        print(f"{name:<10} {seconds * 1e3:8.1f} ms  ({seconds / best['no spans'] - 1:+.1%})")
+
+    print()
+    print(on.summary())
+    if trace_path:
+        on.save(trace_path)
+        print(f"{len(on.spans)} spans written to {trace_path}")
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,289 @@
+"""Benchmark suite for the engine, AI and rendering hot paths.
+
+Results are written as JSON and compared with a stored baseline; any
+benchmark slower than the baseline by more than the threshold is reported
+as a regression and makes the script exit with status 1.
+
+Each benchmark is timed next to a fixed pure-Python calibration loop, and
+the comparison is of its time in calibration loops, so a faster or slower
+(or busier) machine than the baseline's does not read as a change in the
+code. That only cancels the machine's overall speed: for a gate that is
+reliable to a few percent, store a baseline on the machine that runs the
+suite, before the change under test:
+
+    git stash                                       # or check out the base commit
+    python benchmarks/suite.py --save-baseline      # store a new baseline
+    git stash pop
+    python benchmarks/suite.py                      # run and compare
+    python benchmarks/suite.py --only engine.       # run a subset
+
+The render benchmarks need customtkinter and a display (a virtual one such
+as Xvfb works); without them they are skipped.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ai import greedy_move
+from card import CARDS
+from draw_pile import DrawPile
+from engine import UnoEngine, play_game
+from scoring import Scoreboard
+
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+BENCHMARKS = {}
+
+class Skip(Exception):
+    """Raised by a benchmark that cannot run here"""
+
+def benchmark(name):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+def measure(func, number, repeat=5):
+    """Microseconds per call of func: median and best of repeat runs of number calls"""
+    func()  # Warm up caches before timing
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        runs.append((time.perf_counter() - start) / number)
+    return {"median_us": statistics.median(runs) * 1e6, "min_us": min(runs) * 1e6, "number": number}
+
+def calibration():
+    """A fixed mix of calls, attribute reads, list and dict work, standing
+    in for the interpreter speed the benchmarks depend on"""
+    class Point:
+        __slots__ = ("x", "y")
+
+        def __init__(self, x, y):
+            self.x = x
+            self.y = y
+
+    def total(points):
+        return sum(point.x * point.y for point in points)
+    counts = {}
+    points = [Point(i, i % 7) for i in range(200)]
+    for point in points:
+        counts[point.y] = counts.get(point.y, 0) + 1
+    return total(points) + len(counts)
+
+def mid_game(seed, turns=15):
+    """A game after a few greedy turns, so hands and piles look realistic"""
+    engine = UnoEngine(num_players=3, rng=random.Random(seed), uno_seats=())
+    engine.deal()
+    play_game(engine, [greedy_move] * 3, max_turns=turns)
+    return engine
+
+@benchmark("engine.new_game")
+def bench_new_game():
+    # What starting a game costs: the engine builds its deck and deals
+    rng = random.Random(0)
+
+    def new_game():
+        UnoEngine(num_players=3, rng=rng, uno_seats=()).deal()
+    return measure(new_game, 2000)
+
+@benchmark("deck.draw_pile")
+def bench_draw_pile():
+    # Building the engine's deck and drawing it all, which replaced the
+    # shuffle of GameManager._create_deck
+    rng = random.Random(0)
+    return measure(lambda: DrawPile(CARDS, rng).draw(len(CARDS)), 2000)
+
+@benchmark("engine.is_valid_play")
+def bench_is_valid_play():
+    engine = mid_game(1)
+    cards = [card for hand in engine.hands for card in hand]
+
+    def check_all():
+        for card in cards:
+            engine.is_valid_play(card)
+    result = measure(check_all, 2000)
+    result["per_card_us"] = result["median_us"] / len(cards)
+    return result
+
+@benchmark("ai.turn")
+def bench_ai_turn():
+    # The work of one AI turn without the popups and delays
+    states = [mid_game(seed) for seed in range(50)]
+    copies = []
+
+    def setup():
+        copies[:] = [state.copy(rng=random.Random(0)) for state in states]
+
+    def turns():
+        for engine in copies:
+            player = engine.current_player
+            move = greedy_move(engine, player)
+            if move is not None:
+                engine.play(player, *move)
+            else:
+                engine.draw_turn(player)
+
+    runs = []
+    for _ in range(200):
+        setup()
+        start = time.perf_counter()
+        turns()
+        runs.append((time.perf_counter() - start) / len(states))
+    return {"median_us": statistics.median(runs) * 1e6, "min_us": min(runs) * 1e6, "number": len(runs)}
+
+@benchmark("engine.full_game")
+def bench_full_game():
+    seeds = iter(range(10 ** 9))
+
+    def game():
+        engine = UnoEngine(num_players=3, rng=random.Random(next(seeds)), uno_seats=())
+        engine.deal()
+        play_game(engine, [greedy_move] * 3)
+    result = measure(game, 200)
+    result["games_per_s"] = 1e6 / result["median_us"]
+    return result
+
+@benchmark("scoring.record")
+def bench_scoring_record():
+    # Scoring a game reads each hand's running point total
+    states = [mid_game(seed, turns=40) for seed in range(50)]
+    scoreboard = Scoreboard(["a", "b", "c"])
+
+    def score_all():
+        for engine in states:
+            scoreboard.record(engine)
+        scoreboard.reset()
+    result = measure(score_all, 2000)
+    result["per_game_us"] = result["median_us"] / len(states)
+    return result
+
+def render_setup():
+    """A GameManager with the widgets main.start_game creates"""
+    try:
+        import customtkinter as ctk
+        root = ctk.CTk()
+    except Exception as e:  # No customtkinter or no display
+        raise Skip(str(e))
+    from game_manager import GameManager
+
+    os.chdir(ROOT)  # Card image paths are relative
+    root.geometry("1000x600")
+    game_frame = ctk.CTkFrame(root)
+    game_frame.place(relx=0, rely=0, relwidth=1, relheight=1)
+    ui_elements = {
+        'card_holder': ctk.CTkScrollableFrame(game_frame, width=700, height=120, orientation="horizontal"),
+        'uno_button': ctk.CTkButton(game_frame, text="UNO!"),
+        'deck_label': ctk.CTkLabel(game_frame, text=""),
+        'last_card': ctk.CTkLabel(game_frame, text=""),
+        'turn_label': ctk.CTkLabel(game_frame, text=""),
+        'ai_labels': [ctk.CTkLabel(game_frame, text="") for _ in range(2)],
+    }
+    ui_elements['card_holder'].place(relx=0.5, rely=0.85, anchor="center")
+    manager = GameManager(game_frame, ui_elements, log_dir=None)
+    manager.engine.rng.seed(0)
+    manager.initialize_game()
+    return root, manager
+
+@benchmark("render.update_player_hand")
+def bench_update_player_hand():
+    root, manager = render_setup()
+    try:
+        def draw_and_render():
+            # Alternate drawing and discarding so the hand size stays put
+            hand = manager.player_hand
+            if len(hand) < 15:
+                manager.engine.draw_cards(0, 1)
+            else:
+                manager.deck.put_back(hand.pop(0))
+            manager.update_player_hand()
+            root.update()
+        return measure(draw_and_render, 50)
+    finally:
+        root.destroy()
+
+@benchmark("render.update_game_state")
+def bench_update_game_state():
+    root, manager = render_setup()
+    try:
+        return measure(manager.update_game_state, 50)
+    finally:
+        root.destroy()
+
+def run(names):
+    results = {}
+    for name in names:
+        try:
+            result = BENCHMARKS[name]()
+            # Timed right after the benchmark, so both see the same machine load
+            result["calibration_us"] = measure(calibration, 500)["min_us"]
+            results[name] = result
+            print(f"{name:<28} {result['median_us']:>12.2f} us")
+        except Skip as e:
+            print(f"{name:<28} {'skipped':>12}  ({e})")
+    return results
+
+def compare(results, baseline, threshold):
+    """Names of the benchmarks slower than baseline by more than threshold"""
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            print(f"{name:<28} {'no baseline':>17}")
+            continue
+        # The best run is the least noisy figure to compare, in calibration
+        # loops so that the machine's speed cancels out
+        if "calibration_us" not in old:
+            print(f"{name:<28} {'old baseline':>17}  (save it again)")
+            continue
+        ratio = (result["min_us"] / result["calibration_us"]) / (old["min_us"] / old["calibration_us"])
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<28} {ratio:>8.2f}x baseline{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", default="", help="run benchmarks whose name starts with this")
+    parser.add_argument("--output", default=os.path.join(ROOT, "bench_results.json"))
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown before a regression is reported (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    names = [name for name in BENCHMARKS if name.startswith(args.only)]
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": run(names),
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare with; run with --save-baseline first")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    return 1 if compare(report["results"], baseline, args.threshold) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
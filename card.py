@@ -1,119 +1,127 @@
 import random
-from PIL import Image
-import customtkinter as ctk
+
+# Every card is one of 54 faces: 13 per color plus the two wild cards.
+# face = color index * 13 + value index for colored cards.
+COLORS = ("Red", "Blue", "Green", "Yellow")
+VALUES = ("0", "1", "2", "3", "4", "5", "6", "7", "8", "9", "Skip", "Reverse", "+2", "Wild", "+4")
+BLACK = len(COLORS)    # Color index of the wild cards
+SKIP, REVERSE, DRAW_TWO, WILD_VALUE, DRAW_FOUR = range(10, 15)  # Value indexes
+WILD = 52              # Face of the Wild card
+WILD_DRAW_FOUR = 53    # Face of the +4 card
+NUM_FACES = 54
+NUM_CARDS = 108
+
+FACE_COLOR = tuple(f // 13 for f in range(52)) + (BLACK, BLACK)
+FACE_VALUE = tuple(f % 13 for f in range(52)) + (WILD_VALUE, DRAW_FOUR)
+FACE_NAMES = tuple(
+    ((COLORS + ("Black",))[FACE_COLOR[f]], VALUES[FACE_VALUE[f]]) for f in range(NUM_FACES)
+)
+# Points a card left in a hand is worth to the winner: numbers their value,
+# Skip/Reverse/+2 20, wild cards 50
+FACE_POINTS = tuple(v if v < SKIP else 20 if v <= DRAW_TWO else 50 for v in FACE_VALUE)
+
+def _build_card_faces():
+    faces = []
+    for color in range(len(COLORS)):
+        for num in list(range(10)) + list(range(1, 10)):  # One zero, two of each 1-9
+            faces.append(color * 13 + num)
+        for _ in range(2):  # Two of each special card
+            for special in (SKIP, REVERSE, DRAW_TWO):
+                faces.append(color * 13 + special)
+    for _ in range(4):  # Four of each wild card
+        faces.append(WILD)
+        faces.append(WILD_DRAW_FOUR)
+    return tuple(faces)
+
+CARD_FACE = _build_card_faces()  # card id (0-107) -> face
+
+def _build_playable():
+    # PLAYABLE[color * 15 + value] is the bitmask of faces that may be played
+    # when the top card has that value and the active color is color
+    table = []
+    for color in range(len(COLORS)):
+        for value in range(len(VALUES)):
+            mask = 0
+            for face in range(NUM_FACES):
+                if (FACE_COLOR[face] in (color, BLACK) or FACE_VALUE[face] == value):
+                    mask |= 1 << face
+            table.append(mask)
+    return tuple(table)
+
+PLAYABLE = _build_playable()
+
+def top_state(top_face, active_color):
+    """Index into PLAYABLE for a top card and the color in play"""
+    return active_color * len(VALUES) + FACE_VALUE[top_face]
+
+def face_mask(cards):
+    """Bitmask of the faces present in cards"""
+    mask = 0
+    for card in cards:
+        mask |= 1 << card.face
+    return mask
 
 class Card:
-    def __init__(self, color, value):
-        self.color = color   # ex. 'red', 'blue', 'green', 'yellow', 'jolly'
-        self.value = value   # ex. '0', '1', '2', '3', '4', '5', '6', '7', '8', '9', '+2', 'reverse', 'skip', 'wild', '+4'
-        self.image_path = f"./media/cards/{color}_{value}.png"
-        
+    """One of the 108 physical cards, interned in CARDS.
+
+    A card only stores its id and face; color, value and image path are
+    looked up in the face tables, so cards never change once created.
+    """
+    __slots__ = ("id", "face")
+
+    def __init__(self, card_id):
+        self.id = card_id
+        self.face = CARD_FACE[card_id]
+
+    @property
+    def color(self):
+        return FACE_NAMES[self.face][0]   # ex. 'Red', 'Blue', 'Green', 'Yellow', 'Black'
+
+    @property
+    def value(self):
+        return FACE_NAMES[self.face][1]   # ex. '0', ..., '9', 'Skip', 'Reverse', '+2', 'Wild', '+4'
+
+    @property
+    def image_path(self):
+        return FACE_IMAGES[self.face]
+
     def __str__(self):
         return f"{self.color}_{self.value}"
-    
+
+    def __repr__(self):
+        return f"Card({self.id}: {self})"
+
+    def __reduce__(self):
+        # Unpickled cards (e.g. in worker processes) stay the interned ones
+        return (card_from_id, (self.id,))
+
     def get_image(self, size=(150, 225)):
-        return ctk.CTkImage(
-            light_image=Image.open(self.image_path),
-            dark_image=Image.open(self.image_path),
-            size=size
-        )
+        from images import image_cache  # Imported here so the rules never need a display
+        return image_cache.get(self.image_path, size)
+
+FACE_IMAGES = tuple(f"./media/cards/{color}_{value}.png".lower() for color, value in FACE_NAMES)
+CARDS = tuple(Card(card_id) for card_id in range(NUM_CARDS))
+
+# The interned cards of each face: one for a 0, two for other colored
+# faces, four for each wild card
+FACE_CARDS = tuple(tuple(card for card in CARDS if card.face == face) for face in range(NUM_FACES))
+
+def card_from_id(card_id):
+    return CARDS[card_id]
 
 class Deck:
     def __init__(self):
         self.cards = []
         self.build()
-        
+
     def build(self):
-        colors = ['red', 'blue', 'green', 'yellow']
-        numbers = [str(n) for n in range(10)]
-        actions = ['+2', 'reverse', 'skip']
-        
-        # Add number cards (0-9)
-        for color in colors:
-            self.cards.append(Card(color, '0'))  # One zero per color
-            for num in numbers[1:]:  # Two of each 1-9
-                self.cards.extend([Card(color, num) for _ in range(2)])
-                
-        # Add action cards (two of each per color)
-        for color in colors:
-            for action in actions:
-                self.cards.extend([Card(color, action) for _ in range(2)])
-                
-        # Add wild cards
-        for _ in range(4):
-            self.cards.append(Card('black', 'wild'))
-            self.cards.append(Card('black', '+4'))
-            
-    def shuffle(self):
-        random.shuffle(self.cards)
-        
+        # Number, action and wild cards are interned, so building is a copy
+        self.cards = list(CARDS)
+
+    def shuffle(self, rng=random):
+        rng.shuffle(self.cards)
+
     def draw(self):
         if not self.cards:
             return None
         return self.cards.pop()
-
-class Game:
-    def __init__(self, num_players=4):
-        self.deck = Deck()
-        self.deck.shuffle()
-        self.players = [[] for _ in range(num_players)]
-        self.current_player = 0
-        self.direction = 1  # 1 for clockwise, -1 for counter-clockwise
-        self.discard_pile = []
-        self.deal_initial_cards()
-        
-    def deal_initial_cards(self):
-        # Deal 7 cards to ALL players (including human player)
-        for _ in range(7):
-            for player in self.players:
-                card = self.deck.draw()
-                if card:
-                    player.append(card)
-                    
-        # Draw first card for discard pile (skip special cards)
-        while True:
-            card = self.deck.draw()
-            if card and card.color != 'black' and card.value not in ['+2', '+4', 'reverse', 'skip']:
-                self.discard_pile.append(card)
-                break
-            elif card:
-                self.deck.cards.append(card)  # Put special card back in deck
-                self.deck.shuffle()
-        
-    def is_valid_play(self, card):
-        top_card = self.discard_pile[-1]
-        return (card.color == top_card.color or 
-                card.value == top_card.value or 
-                card.color == 'black')
-    
-    def play_card(self, player_idx, card_idx):
-        if player_idx != self.current_player:
-            return False
-            
-        card = self.players[player_idx][card_idx]
-        if not self.is_valid_play(card):
-            return False
-            
-        self.discard_pile.append(self.players[player_idx].pop(card_idx))
-        self.handle_special_card(card)
-        return True
-        
-    def handle_special_card(self, card):
-        if card.value == 'reverse':
-            self.direction *= -1
-        elif card.value == 'skip':
-            self.next_turn()
-        elif card.value == '+2':
-            next_player = (self.current_player + self.direction) % len(self.players)
-            for _ in range(2):
-                self.players[next_player].append(self.deck.draw())
-        elif card.value == '+4':
-            next_player = (self.current_player + self.direction) % len(self.players)
-            for _ in range(4):
-                self.players[next_player].append(self.deck.draw())
-                
-        self.next_turn()
-        
-    def next_turn(self):
-        """Advance to next player's turn"""
-        self.current_player = (self.current_player + self.direction) % len(self.players)
\ No newline at end of file
@@ -0,0 +1,71 @@
+import random
+
+class DrawPile:
+    """The deck, shuffled lazily one draw at a time.
+
+    Cards are kept in no particular order; each draw picks a random card
+    among those left and swaps it with the last one before popping it,
+    which is one step of a Fisher-Yates shuffle. A draw is O(1) and there is
+    never a full shuffle. When the pile runs out, refill() is called for
+    new cards (the engine hands over its discard pile list, without a copy).
+
+    fork() makes a pile sharing the card list; whichever pile changes
+    first copies it.
+    """
+    __slots__ = ("cards", "rng", "refill", "shared")
+
+    def __init__(self, cards=(), rng=None, refill=None):
+        self.cards = list(cards)
+        self.rng = rng or random.Random()
+        self.refill = refill
+        self.shared = False  # cards is also used by a fork
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def draw(self, count=1):
+        """Draw up to count cards, refilling once the pile is empty"""
+        drawn = []
+        if self.shared:
+            self.cards = list(self.cards)
+            self.shared = False
+        cards = self.cards
+        randrange = self.rng.randrange
+        for _ in range(count):
+            if not cards:
+                if self.refill is not None:
+                    self.cards = cards = self.refill()
+                if not cards:
+                    break
+            last = len(cards) - 1
+            j = randrange(last + 1)
+            cards[j], cards[last] = cards[last], cards[j]
+            drawn.append(cards.pop())
+        return drawn
+
+    def draw_one(self):
+        drawn = self.draw(1)
+        return drawn[0] if drawn else None
+
+    def put_back(self, card):
+        # Draws are random, so where the card goes doesn't matter
+        if self.shared:
+            self.cards = list(self.cards)
+            self.shared = False
+        self.cards.append(card)
+
+    def copy(self, rng=None, refill=None):
+        return DrawPile(self.cards, rng or self.rng, refill)
+
+    def fork(self, rng=None, refill=None):
+        """Pile with the same cards that shares their list until one of the
+        two piles draws or takes a card back"""
+        other = DrawPile.__new__(DrawPile)
+        other.cards = self.cards
+        other.rng = rng or self.rng
+        other.refill = refill
+        other.shared = self.shared = True
+        return other
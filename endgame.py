@@ -0,0 +1,313 @@
+import random
+import time
+from card import BLACK, COLORS, FACE_COLOR, FACE_VALUE, NUM_FACES, PLAYABLE, VALUES
+from engine import MAX_PLAYERS
+from ismcts import determinize, legal_moves
+
+# Zobrist keys: a position's key is the XOR of one random number per fact
+# about it, so a move updates the key with a few XORs. A hand or the deck
+# holding c cards of a face contributes the key of (face, c).
+_rng = random.Random(20240)
+_MAX_COUNT = 16  # Deepest count of one face in a hand the keys cover
+HAND_KEYS = tuple(tuple(tuple(_rng.getrandbits(64) if c else 0 for c in range(_MAX_COUNT))
+                        for _ in range(NUM_FACES)) for _ in range(MAX_PLAYERS))
+DECK_KEYS = tuple(tuple(_rng.getrandbits(64) if c else 0 for c in range(5)) for _ in range(NUM_FACES))
+TOP_KEYS = tuple(_rng.getrandbits(64) for _ in range(len(PLAYABLE)))
+TURN_KEYS = tuple(_rng.getrandbits(64) for _ in range(MAX_PLAYERS))
+REVERSED_KEY = _rng.getrandbits(64)
+del _rng
+
+def in_endgame(engine, threshold):
+    """Whether every hand is down to threshold cards or fewer"""
+    return all(len(hand) <= threshold for hand in engine.hands)
+
+class TranspositionTable:
+    """Values of solved positions, in a fixed array of 2**bits slots.
+
+    A position goes to the slot of the low bits of its key, with the full
+    key kept to tell collisions apart. A slot is overwritten by a search at
+    least as deep or by a newer search (see new_search), so the table never
+    grows and old entries make way for the current decision's.
+    """
+    def __init__(self, bits=16):
+        self.mask = (1 << bits) - 1
+        self.slots = [None] * (1 << bits)
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def new_search(self):
+        self.generation += 1
+
+    def get(self, key, depth):
+        """The value stored for key if it was searched at least depth plies deep"""
+        self.probes += 1
+        entry = self.slots[key & self.mask]
+        if entry is not None and entry[0] == key and entry[1] >= depth:
+            self.hits += 1
+            return entry[2]
+        return None
+
+    def put(self, key, depth, value):
+        index = key & self.mask
+        entry = self.slots[index]
+        if entry is not None:
+            if entry[0] != key and entry[1] > depth and entry[3] == self.generation:
+                return  # Keep the deeper entry of this search
+            if entry[0] != key:
+                self.evictions += 1
+        self.slots[index] = (key, depth, value, self.generation)
+        self.stores += 1
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+class _OutOfNodes(Exception):
+    pass
+
+class EndgameSolver:
+    """AI strategy for the last cards of a game, searched nearly exactly.
+
+    Each decision deals the unseen cards `samples` times (determinize(),
+    with the BeliefTracker when given one) and searches every deal with
+    expectimax: each player picks the move best for their own chance of
+    winning (max^n), and a draw averages over the faces left in the deck,
+    weighted by their counts. Searches deepen one ply at a time until the
+    node budget of the deal is spent. Below the depth reached, and after a
+    +2 or +4 (whose 2 or 4 drawn cards would be too many outcomes to list),
+    a position is scored from the hand sizes. A TranspositionTable only
+    pays off for positions a deal reaches by more than one move order: the
+    deals hold different hidden hands, so they seldom share a position, and
+    bench_endgame.py measures a hit rate of 1 to 3%.
+    """
+    def __init__(self, max_nodes=20000, samples=8, max_depth=16, table_bits=16, seed=None):
+        self.max_nodes = max_nodes
+        self.samples = samples
+        self.max_depth = max_depth
+        self.table = TranspositionTable(table_bits)
+        self.rng = random.Random(seed)
+        self.nodes = 0
+        self.search_time = 0.0
+        self.deals = 0
+        self.depth_total = 0  # Sum of the depth completed in each deal
+
+    def __call__(self, engine, player, beliefs=None):
+        moves = legal_moves(engine, player)
+        if len(moves) == 1:
+            move = moves[0]  # Nothing to search
+        else:
+            values = self.solve(engine, player, beliefs)
+            move = max(values, key=values.get)
+        if move is None:
+            return None
+        face, color = move
+        card = engine.hands[player].card_of(face)
+        return card, None if color is None else COLORS[color]
+
+    def solve(self, engine, player, beliefs=None):
+        """{(face, color index or None): chance of winning} of player's moves,
+        or {None: chance} when player can only draw"""
+        start = time.perf_counter()
+        self.table.new_search()
+        totals = {}
+        for _ in range(self.samples):
+            state = determinize(engine, player, self.rng, beliefs)
+            self._load(state)
+            values = self._root(self.max_nodes // self.samples)
+            for move, value in values.items():
+                totals[move] = totals.get(move, 0.0) + value[player] / self.samples
+        self.search_time += time.perf_counter() - start
+        return totals
+
+    def _load(self, state):
+        """Take the position of an engine whose hands are all known"""
+        n = self.n = state.num_players
+        self.ring = state.ring
+        self.effects = state.effects
+        self.counts = [[0] * NUM_FACES for _ in range(n)]
+        self.masks = [hand.mask for hand in state.hands]
+        self.sizes = [len(hand) for hand in state.hands]
+        self.deck = [0] * NUM_FACES
+        for card in state.deck:
+            self.deck[card.face] += 1
+        self.deck_size = len(state.deck)
+        self.top = state.active_color * len(VALUES) + FACE_VALUE[state.top_card.face]
+        self.player = state.current_player
+        self.direction = state.direction
+        self.wins = [tuple(1.0 if seat == winner else 0.0 for seat in range(n)) for winner in range(n)]
+
+        key = TOP_KEYS[self.top] ^ TURN_KEYS[self.player]
+        if self.direction == -1:
+            key ^= REVERSED_KEY
+        for seat, hand in enumerate(state.hands):
+            counts = self.counts[seat]
+            for card in hand:
+                counts[card.face] += 1
+            for face in range(NUM_FACES):
+                key ^= HAND_KEYS[seat][face][min(counts[face], _MAX_COUNT - 1)]
+        for face in range(NUM_FACES):
+            key ^= DECK_KEYS[face][self.deck[face]]
+        self.key = key
+
+    def _root(self, budget):
+        """Iterative deepening of the current position within budget nodes.
+        Returns {move: value} of the deepest search completed."""
+        self.budget = self.nodes + budget
+        values = None
+        completed = 0
+        for depth in range(1, self.max_depth + 1):
+            # Depth 1 only scores the moves, so it always completes. A search
+            # cut short leaves the position half changed, but the next deal
+            # loads its own.
+            try:
+                values = {move: self._child(move, depth) for move in self._moves()}
+            except _OutOfNodes:
+                break
+            completed = depth
+        self.deals += 1
+        self.depth_total += completed
+        return values
+
+    def _moves(self):
+        """Moves of the player to move, as in ismcts.legal_moves"""
+        bits = self.masks[self.player] & PLAYABLE[self.top]
+        moves = []
+        while bits:
+            low = bits & -bits
+            face = low.bit_length() - 1
+            bits ^= low
+            if FACE_COLOR[face] == BLACK:
+                moves.extend((face, color) for color in range(len(COLORS)))
+            else:
+                moves.append((face, None))
+        return moves or [None]
+
+    def _node(self, depth):
+        """Values (one chance of winning per seat) of the current position"""
+        self.nodes += 1
+        if self.nodes > self.budget:
+            raise _OutOfNodes
+        key = self.key
+        value = self.table.get(key, depth)
+        if value is not None:
+            return value
+        if depth == 0:
+            value = self._estimate()
+        else:
+            player = self.player
+            value = None
+            for move in self._moves():
+                child = self._child(move, depth)
+                if value is None or child[player] > value[player]:
+                    value = child
+        self.table.put(key, depth, value)
+        return value
+
+    def _estimate(self, victim=None, extra=0):
+        """Chances of winning guessed from the hand sizes: a seat's chance
+        goes with 1 / cards**2"""
+        weights = [1.0 / (size * size) for size in self.sizes]
+        if victim is not None:
+            size = self.sizes[victim] + extra
+            weights[victim] = 1.0 / (size * size)
+        total = sum(weights)
+        return tuple(weight / total for weight in weights)
+
+    def _add(self, seat, face, change):
+        """Add change (1 or -1) cards of face to seat's hand"""
+        counts = self.counts[seat]
+        old = counts[face]
+        new = counts[face] = old + change
+        keys = HAND_KEYS[seat][face]
+        self.key ^= keys[min(old, _MAX_COUNT - 1)] ^ keys[min(new, _MAX_COUNT - 1)]
+        self.sizes[seat] += change
+        if new:
+            self.masks[seat] |= 1 << face
+        else:
+            self.masks[seat] &= ~(1 << face)
+
+    def _set_turn(self, player):
+        self.key ^= TURN_KEYS[self.player] ^ TURN_KEYS[player]
+        self.player = player
+
+    def _child(self, move, depth):
+        """Values after the player to move makes move, searched depth - 1 plies deeper"""
+        player = self.player
+        if move is None:
+            return self._draw(depth)
+        face, color = move
+        self._add(player, face, -1)
+        if not self.sizes[player]:
+            self._add(player, face, 1)
+            return self.wins[player]
+
+        top, direction = self.top, self.direction
+        value_index = FACE_VALUE[face]
+        self.top = (FACE_COLOR[face] if color is None else color) * len(VALUES) + value_index
+        self.key ^= TOP_KEYS[top] ^ TOP_KEYS[self.top]
+        reverses, draw, skips, steps = self.effects[value_index]
+        victim = self.ring[direction][player][1]
+        if reverses:
+            self.direction = -direction
+            self.key ^= REVERSED_KEY
+        if draw:
+            value = self._estimate(victim, draw)
+        elif depth <= 1:
+            value = self._estimate()
+        else:
+            self._set_turn(self.ring[self.direction][player][steps])
+            value = self._node(depth - 1)
+            self._set_turn(player)
+
+        if reverses:
+            self.direction = direction
+            self.key ^= REVERSED_KEY
+        self.key ^= TOP_KEYS[top] ^ TOP_KEYS[self.top]
+        self.top = top
+        self._add(player, face, 1)
+        return value
+
+    def _draw(self, depth):
+        """Expected values after the player to move draws a card"""
+        if not self.deck_size or depth <= 1:
+            return self._estimate(self.player, 1)
+        player = self.player
+        deck = self.deck
+        total = [0.0] * self.n
+        self._set_turn(self.ring[self.direction][player][1])
+        for face in range(NUM_FACES):
+            count = deck[face]
+            if not count:
+                continue
+            deck[face] = count - 1
+            self.deck_size -= 1
+            self.key ^= DECK_KEYS[face][count] ^ DECK_KEYS[face][count - 1]
+            self._add(player, face, 1)
+            value = self._node(depth - 1)
+            self._add(player, face, -1)
+            self.key ^= DECK_KEYS[face][count] ^ DECK_KEYS[face][count - 1]
+            self.deck_size += 1
+            deck[face] = count
+            chance = count / self.deck_size
+            for seat in range(self.n):
+                total[seat] += chance * value[seat]
+        self._set_turn(player)
+        return tuple(total)
+
+    @property
+    def nodes_per_second(self):
+        return self.nodes / self.search_time if self.search_time else 0.0
+
+    def stats(self):
+        table = self.table
+        return {
+            "nodes": self.nodes,
+            "nodes_per_s": self.nodes_per_second,
+            "hit_rate": table.hit_rate,
+            "stores": table.stores,
+            "evictions": table.evictions,
+            "mean_depth": self.depth_total / self.deals if self.deals else 0.0,
+        }
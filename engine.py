@@ -0,0 +1,338 @@
+import random
+from card import (BLACK, CARDS, COLORS, DRAW_FOUR, DRAW_TWO, FACE_COLOR, FACE_VALUE,
+                  PLAYABLE, REVERSE, SKIP, VALUES, top_state)
+from draw_pile import DrawPile
+from hand import Hand
+
+MIN_PLAYERS, MAX_PLAYERS = 2, 10
+
+def _build_ring(num_players):
+    """ring[direction][seat][steps]: the seat steps places after seat.
+
+    Indexed by the direction itself, so ring[1] goes clockwise and
+    ring[-1] (the last entry) counterclockwise.
+    """
+    ring = [None, None, None]
+    for direction in (1, -1):
+        ring[direction] = tuple(
+            tuple((seat + steps * direction) % num_players for steps in range(3))
+            for seat in range(num_players)
+        )
+    return tuple(ring)
+
+def _build_effects(num_players):
+    """effects[value]: (reverses, cards the next player draws, whether the
+    next player is skipped, seats the turn moves on) of a card value"""
+    effects = [(False, 0, False, 1)] * len(VALUES)
+    effects[SKIP] = (False, 0, True, 2)
+    effects[DRAW_TWO] = (False, 2, True, 2)
+    effects[DRAW_FOUR] = (False, 4, True, 2)
+    if num_players == 2:
+        # Reverse acts as Skip: the player who played it goes again
+        effects[REVERSE] = (True, 0, True, 2)
+    else:
+        effects[REVERSE] = (True, 0, False, 1)
+    return tuple(effects)
+
+# Turn order of every table size, so a card's effect is a couple of lookups
+RINGS = {n: _build_ring(n) for n in range(MIN_PLAYERS, MAX_PLAYERS + 1)}
+EFFECTS = {n: _build_effects(n) for n in range(MIN_PLAYERS, MAX_PLAYERS + 1)}
+
+# Bits of UnoEngine._owned: the parts of the state an engine may change in
+# place. Bits 0 to MAX_PLAYERS - 1 stand for the hands of those seats.
+OWN_HANDS = 1 << MAX_PLAYERS        # The list of hands
+OWN_DISCARDS = OWN_HANDS << 1
+OWN_UNO = OWN_HANDS << 2            # uno_called
+OWN_ALL = (OWN_UNO << 1) - 1
+
+class UnoEngine:
+    """The rules of UNO, with no GUI code.
+
+    2 to 10 players sit in a ring; seat 0 is the human player in the UI,
+    and turns go clockwise until a Reverse. Callers drive the game with
+    play() and draw_turn(); every change of state is reported to the
+    listeners registered with subscribe() as listener(event, data).
+    """
+    def __init__(self, num_players=3, rng=None, uno_seats=(0,), seed=None):
+        if not MIN_PLAYERS <= num_players <= MAX_PLAYERS:
+            raise ValueError(f"UNO is played by {MIN_PLAYERS} to {MAX_PLAYERS} players, not {num_players}")
+        if rng is None:
+            # Without an rng the game is seeded, so a log can name its seed
+            if seed is None:
+                seed = random.randrange(2 ** 63)
+            rng = random.Random(seed)
+        self.seed = seed
+        self.rng = rng
+        self.num_players = num_players
+        self.ring = RINGS[num_players]
+        self.effects = EFFECTS[num_players]
+        self.hands = [Hand() for _ in range(num_players)]
+        self.deck = DrawPile(CARDS, self.rng, refill=self._recycle_discards)
+        self.discard_pile = []
+        self.current_player = 0
+        self.direction = 1
+        self.active_color = None  # Color index in play, set by the top card or a wild
+        self.winner = None
+        self.uno_seats = set(uno_seats)  # Seats that must press UNO before their last card
+        self.uno_called = [False] * num_players
+        self.listeners = []
+        self._owned = OWN_ALL  # Nothing is shared with a fork yet
+
+    def copy(self, rng=None):
+        """Copy of the game state without listeners, for AI search"""
+        other = UnoEngine.__new__(UnoEngine)
+        other.__dict__.update(self.__dict__)
+        other.rng = rng or random.Random()
+        other.hands = [hand.copy() for hand in self.hands]
+        other.deck = self.deck.copy(other.rng, refill=other._recycle_discards)
+        other.discard_pile = list(self.discard_pile)
+        other.uno_seats = set(self.uno_seats)
+        other.uno_called = list(self.uno_called)
+        other.listeners = []
+        other._owned = OWN_ALL
+        return other
+
+    def fork(self, rng=None):
+        """Copy-on-write copy of the game state without listeners.
+
+        The fork shares the hands, deck, discard pile and UNO calls with
+        this engine. Whichever of the two engines changes one of them first
+        copies that one, so a fork costs O(1) and a move only copies what it
+        touches: usually the mover's hand and the discard pile. It shares
+        the rng unless one is given.
+        """
+        other = UnoEngine.__new__(UnoEngine)
+        other.__dict__ = self.__dict__.copy()
+        other.rng = rng or self.rng
+        other.deck = self.deck.fork(other.rng, refill=other._recycle_discards)
+        other.listeners = []
+        other._owned = self._owned = 0
+        return other
+
+    def _own_hand(self, player):
+        """The player's hand, copied first if it is shared with a fork"""
+        if not self._owned & OWN_HANDS:
+            self.hands = list(self.hands)
+            self._owned |= OWN_HANDS
+        self.hands[player] = self.hands[player].copy()
+        self._owned |= 1 << player
+        return self.hands[player]
+
+    def _own(self, part):
+        """Copy the discard pile (OWN_DISCARDS) or uno_called (OWN_UNO) if it
+        is shared with a fork"""
+        if part == OWN_DISCARDS:
+            self.discard_pile = list(self.discard_pile)
+        else:
+            self.uno_called = list(self.uno_called)
+        self._owned |= part
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def emit(self, event, **data):
+        for listener in self.listeners:
+            listener(event, data)
+
+    def deal(self, hand_size=7):
+        """Deal the starting hands and turn up the first card"""
+        hands = [self._own_hand(player) for player in range(self.num_players)]
+        if not self._owned & OWN_DISCARDS:
+            self._own(OWN_DISCARDS)
+        for _ in range(hand_size):
+            for hand in hands:
+                hand.append(self.deck.draw_one())
+
+        # Initial card (not wild)
+        while True:
+            card = self.deck.draw_one()
+            if FACE_COLOR[card.face] != BLACK:
+                self.discard_pile.append(card)
+                self.active_color = FACE_COLOR[card.face]
+                break
+            self.deck.put_back(card)
+
+        self.emit("deal", hands=[list(hand) for hand in self.hands], top=card)
+
+    @property
+    def top_card(self):
+        return self.discard_pile[-1] if self.discard_pile else None
+
+    def next_player(self, steps=1):
+        """The seat steps turns after the current player (0 to 2 steps)"""
+        return self.ring[self.direction][self.current_player][steps]
+
+    def playable_mask(self):
+        """Bitmask of the faces that can be played on the discard pile"""
+        top_card = self.top_card
+        if top_card is None:
+            return -1
+        return PLAYABLE[top_state(top_card.face, self.active_color)]
+
+    def is_valid_play(self, card):
+        """Check if a card can be played on the discard pile"""
+        return self.playable_mask() >> card.face & 1 == 1
+
+    def valid_cards(self, player):
+        hand = self.hands[player]
+        mask = self.playable_mask() & hand.mask
+        if not mask:
+            return []
+        return [card for card in hand if mask >> card.face & 1]
+
+    def _recycle_discards(self):
+        """Hand the discard pile, except its top card, to the empty deck.
+
+        The deck draws at random, so the cards need no shuffle.
+        """
+        if len(self.discard_pile) < 2:
+            return []
+        if not self._owned & OWN_DISCARDS:
+            self._own(OWN_DISCARDS)
+        top_card = self.discard_pile.pop()
+        cards = self.discard_pile
+        self.discard_pile = [top_card]
+        self.emit("reshuffle", size=len(cards))
+        return cards
+
+    def draw_cards(self, player, count):
+        """Move up to count cards from the deck to a player's hand,
+        refilling the deck from the discard pile when it runs out"""
+        drawn = self.deck.draw(count)
+        hand = self.hands[player] if self._owned >> player & 1 else self._own_hand(player)
+        hand.extend(drawn)
+        return drawn
+
+    def card_count(self):
+        return len(self.deck) + len(self.discard_pile) + sum(len(hand) for hand in self.hands)
+
+    def check_conservation(self):
+        """Check that every one of the 108 cards is in exactly one place"""
+        ids = [card.id for card in self.deck]
+        ids.extend(card.id for card in self.discard_pile)
+        for hand in self.hands:
+            ids.extend(card.id for card in hand)
+        return sorted(ids) == list(range(len(CARDS)))
+
+    def call_uno(self, player):
+        if len(self.hands[player]) == 2:
+            if not self._owned & OWN_UNO:
+                self._own(OWN_UNO)
+            self.uno_called[player] = True
+            self.emit("uno", player=player)
+            return True
+        return False
+
+    def check_uno(self, player):
+        """Give a 2 card penalty to a player about to play their
+        second-to-last card without calling UNO. Returns False if so."""
+        if (player in self.uno_seats and len(self.hands[player]) == 2
+                and not self.uno_called[player]):
+            drawn = self.draw_cards(player, 2)
+            self.emit("penalty", player=player, cards=drawn)
+            return False
+        return True
+
+    def play(self, player, card, chosen_color=None):
+        """Play a card from a player's hand. Wild cards need chosen_color.
+
+        Returns False if the play is not allowed (or was refused with an
+        UNO penalty), True otherwise.
+        """
+        if self.winner is not None or player != self.current_player:
+            return False
+        if card not in self.hands[player] or not self.is_valid_play(card):
+            return False
+        if FACE_COLOR[card.face] == BLACK and chosen_color not in COLORS:
+            return False
+        if not self.check_uno(player):
+            return False
+
+        owned = self._owned
+        hand = self.hands[player] if owned >> player & 1 else self._own_hand(player)
+        hand.remove(card)
+        if self.uno_called[player]:
+            if not owned & OWN_UNO:
+                self._own(OWN_UNO)
+            self.uno_called[player] = False
+        self.emit("play", player=player, card=card, color=card.color)
+        if not owned & OWN_DISCARDS:
+            self._own(OWN_DISCARDS)
+        self.discard_pile.append(card)
+        if FACE_COLOR[card.face] == BLACK:
+            # The chosen color lives in the game state, not on the card
+            self.active_color = COLORS.index(chosen_color)
+            self.emit("color", player=player, color=chosen_color)
+        else:
+            self.active_color = FACE_COLOR[card.face]
+
+        if not self.hands[player]:
+            self.winner = player
+            self.emit("win", player=player)
+            return True
+
+        self.handle_special_card(card)
+        return True
+
+    def handle_special_card(self, card):
+        """Apply the card's effect and move the turn on"""
+        reverses, draw, skips, steps = self.effects[FACE_VALUE[card.face]]
+        seats = self.ring[self.direction][self.current_player]
+        next_player = seats[1]
+
+        if reverses:
+            self.direction = -self.direction
+            self.emit("direction", direction=self.direction)
+            seats = self.ring[self.direction][self.current_player]
+        if draw:
+            drawn = self.draw_cards(next_player, draw)
+            self.emit("draw", player=next_player, cards=drawn, forced=True)
+        elif skips:
+            self.emit("skip", player=next_player)
+        self.current_player = seats[steps]
+
+    def draw_turn(self, player):
+        """Draw a card instead of playing and pass the turn.
+
+        Returns the drawn card, or None if no card is left to draw.
+        """
+        if self.winner is not None or player != self.current_player:
+            return None
+        drawn = self.draw_cards(player, 1)
+        if not drawn:
+            self.emit("stalled", player=player)
+            return None
+        self.emit("draw", player=player, cards=drawn, forced=False)
+        self.current_player = self.next_player()
+        return drawn[0]
+
+    def apply(self, move):
+        """Make move for the current player: (card, chosen_color) to play, or
+        None to draw. Returns False if it was not allowed or nothing was
+        left to draw. With fork(), for search:
+
+            child = state.fork()
+            child.apply(move)
+        """
+        player = self.current_player
+        if move is None:
+            return self.draw_turn(player) is not None
+        return self.play(player, *move)
+
+def play_game(engine, strategies, max_turns=10000):
+    """Play a dealt game to the end without any delay.
+
+    strategies[i](engine, player) returns (card, chosen_color) or None to
+    draw. Returns the winner, or None if no card was left to draw or
+    max_turns was reached.
+    """
+    for _ in range(max_turns):
+        if engine.winner is not None:
+            break
+        player = engine.current_player
+        move = strategies[player](engine, player)
+        if move is not None:
+            engine.play(player, *move)
+        elif engine.draw_turn(player) is None:
+            break
+    return engine.winner
@@ -0,0 +1,290 @@
+import os
+import struct
+from card import CARDS, COLORS
+from engine import UnoEngine
+from hand import Hand
+
+# File layout: a header, then one record per engine event. A record is an
+# opcode byte followed by its fields, all single bytes except card lists,
+# which are a count byte and one byte per card id.
+MAGIC = b"UNOL"
+VERSION = 1
+HEADER = struct.Struct("<4sBBHQ")  # magic, version, players, UNO seats bitmask, seed
+
+DEAL, PLAY, COLOR, DRAW, PENALTY, UNO, DIRECTION, SKIP, RESHUFFLE, STALLED, WIN = range(1, 12)
+OPCODES = {
+    "deal": DEAL, "play": PLAY, "color": COLOR, "draw": DRAW, "penalty": PENALTY,
+    "uno": UNO, "direction": DIRECTION, "skip": SKIP, "reshuffle": RESHUFFLE,
+    "stalled": STALLED, "win": WIN,
+}
+
+def encode_event(event, data):
+    """Bytes of one engine event"""
+    op = OPCODES[event]
+    if op == DEAL:
+        hands = data["hands"]
+        out = bytearray((op, len(hands), len(hands[0])))
+        for hand in hands:
+            out.extend(card.id for card in hand)
+        out.append(data["top"].id)
+        return bytes(out)
+    if op == PLAY:
+        return bytes((op, data["player"], data["card"].id))
+    if op == COLOR:
+        return bytes((op, data["player"], COLORS.index(data["color"])))
+    if op == DRAW:
+        cards = data["cards"]
+        return bytes((op, data["player"], data["forced"], len(cards), *(card.id for card in cards)))
+    if op == PENALTY:
+        cards = data["cards"]
+        return bytes((op, data["player"], len(cards), *(card.id for card in cards)))
+    if op == DIRECTION:
+        return bytes((op, data["direction"] > 0))
+    if op == RESHUFFLE:
+        return bytes((op, data["size"]))
+    return bytes((op, data["player"]))  # UNO, SKIP, STALLED, WIN
+
+class GameLogger:
+    """Appends every event of an engine to a binary log file.
+
+    The header records the seed, player count and UNO seats. Records are
+    flushed at every turn boundary (before a play, whose color and forced
+    draws follow it, after a draw and at the end of the game), so a crash
+    or kill loses at most the turn in progress and Replayer still reads
+    what was written.
+    """
+    def __init__(self, path, engine):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            seats = sum(1 << seat for seat in engine.uno_seats)
+            self.file.write(HEADER.pack(MAGIC, VERSION, engine.num_players, seats, engine.seed or 0))
+            self.file.flush()
+        engine.subscribe(self.record)
+
+    def record(self, event, data):
+        if self.file.closed:
+            return
+        if event == "play":
+            self.file.flush()  # The previous turn is complete
+        self.file.write(encode_event(event, data))
+        if event in ("deal", "win", "stalled") or event == "draw" and not data["forced"]:
+            self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+# Byte -> card; any byte that is not a card id (such as the 255 the table
+# server sends for cards a player may not see) reads as None
+BYTE_CARDS = CARDS + (None,) * (256 - len(CARDS))
+EVENT_NAMES = {op: name for name, op in OPCODES.items()}
+
+def parse_event(data, i):
+    """The event tuple of the record at data[i] and the index after it"""
+    op = data[i]
+    if op == DEAL:
+        count, size = data[i + 1], data[i + 2]
+        i += 3
+        hands = [[BYTE_CARDS[c] for c in data[i + p * size:i + (p + 1) * size]] for p in range(count)]
+        i += count * size
+        return ("deal", hands, BYTE_CARDS[data[i]]), i + 1
+    if op == PLAY:
+        return ("play", data[i + 1], BYTE_CARDS[data[i + 2]]), i + 3
+    if op == COLOR:
+        return ("color", data[i + 1], COLORS[data[i + 2]]), i + 3
+    if op == DRAW:
+        n = data[i + 3]
+        return ("draw", data[i + 1], [BYTE_CARDS[c] for c in data[i + 4:i + 4 + n]], bool(data[i + 2])), i + 4 + n
+    if op == PENALTY:
+        n = data[i + 2]
+        return ("penalty", data[i + 1], [BYTE_CARDS[c] for c in data[i + 3:i + 3 + n]]), i + 3 + n
+    if op == DIRECTION:
+        return ("direction", 1 if data[i + 1] else -1), i + 2
+    if op == RESHUFFLE:
+        return ("reshuffle", data[i + 1]), i + 2
+    if op in (UNO, SKIP, STALLED, WIN):
+        return (EVENT_NAMES[op], data[i + 1]), i + 2
+    raise ValueError(f"Unknown opcode {op} at byte {i}")
+
+def parse_log(data):
+    """Header fields and event tuples of a log given as bytes.
+
+    A log cut off by a crash is read up to its last whole record: the
+    header is None if even the header is incomplete, and a record cut
+    short at the end is dropped.
+    """
+    if len(data) < HEADER.size:
+        if not MAGIC.startswith(bytes(data[:len(MAGIC)])):
+            raise ValueError("Not a pyUNO game log")
+        return None, []
+    magic, version, players, seats, seed = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a pyUNO game log")
+    header = {"players": players, "uno_seats": [p for p in range(players) if seats >> p & 1], "seed": seed}
+    events = []
+    i = HEADER.size
+    end = len(data)
+    while i < end:
+        try:
+            event, following = parse_event(data, i)
+        except IndexError:
+            break  # Fixed fields cut off
+        if following > end:
+            break  # Card list cut off
+        events.append(event)
+        i = following
+    return header, events
+
+def read_log(path):
+    with open(path, "rb") as f:
+        return parse_log(f.read())
+
+class ScriptedPile:
+    """Draw pile of a replay: it hands out the cards the log says were drawn"""
+    __slots__ = ("cards", "script", "position", "refill")
+
+    def __init__(self, cards, script, position=0, refill=None):
+        self.cards = set(cards)
+        self.script = script      # Every card drawn after the deal, in order
+        self.position = position
+        self.refill = refill
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def draw(self, count=1):
+        drawn = []
+        for _ in range(count):
+            if self.position >= len(self.script):
+                break
+            card = self.script[self.position]
+            if card not in self.cards and self.refill is not None:
+                self.cards.update(self.refill())  # The deck was refilled here
+            self.cards.remove(card)
+            self.position += 1
+            drawn.append(card)
+        return drawn
+
+    def draw_one(self):
+        drawn = self.draw(1)
+        return drawn[0] if drawn else None
+
+    def put_back(self, card):
+        self.cards.add(card)
+
+    def copy(self, rng=None, refill=None):
+        return ScriptedPile(self.cards, self.script, self.position, refill)
+
+    fork = copy
+
+class Replayer:
+    """Replays a logged game through the engine's own rules.
+
+    Only the decisions are re-applied (plays with their color, draws, UNO
+    calls and penalties); the drawn cards come from the log. A copy of the
+    engine is kept every snapshot_every turns, so seek() only replays the
+    turns since the nearest snapshot. A log cut off by a crash replays up
+    to its last whole record; one cut off before the deal has no game
+    (dealt is False) and seek() raises ValueError.
+    """
+    def __init__(self, data, snapshot_every=16):
+        self.header, self.events = parse_log(data)
+        self.snapshot_every = snapshot_every
+        self.actions = []
+        script = []
+        for index, event in enumerate(self.events):
+            kind = event[0]
+            if kind == "play":
+                following = self.events[index + 1] if index + 1 < len(self.events) else None
+                color = following[2] if following and following[0] == "color" else None
+                self.actions.append(("play", event[1], event[2], color))
+            elif kind == "draw":
+                script.extend(event[2])
+                if not event[3]:
+                    self.actions.append(("draw", event[1]))
+            elif kind == "penalty":
+                script.extend(event[2])
+                self.actions.append(("penalty", event[1]))
+            elif kind == "uno":
+                self.actions.append(("uno", event[1]))
+        self.script = script
+        # turn_starts[t] is the index of the first action after t turns
+        self.turn_starts = [0]
+        for index, action in enumerate(self.actions):
+            if action[0] in ("play", "draw"):
+                self.turn_starts.append(index + 1)
+        self.snapshot_points = set(self.turn_starts[::snapshot_every])
+        self.snapshots = {}  # action index -> engine copy
+
+    @classmethod
+    def from_file(cls, path, snapshot_every=16):
+        with open(path, "rb") as f:
+            return cls(f.read(), snapshot_every)
+
+    @property
+    def dealt(self):
+        return bool(self.events)  # The first record of a log is the deal
+
+    @property
+    def turns(self):
+        return len(self.turn_starts) - 1
+
+    def _dealt_engine(self):
+        engine = UnoEngine(self.header["players"], uno_seats=self.header["uno_seats"], seed=self.header["seed"])
+        _, hands, top = self.events[0]
+        engine.hands = [Hand(hand) for hand in hands]
+        engine.discard_pile = [top]
+        engine.active_color = COLORS.index(top.color)
+        dealt = {card.id for hand in hands for card in hand} | {top.id}
+        engine.deck = ScriptedPile([c for c in CARDS if c.id not in dealt], self.script,
+                                   refill=engine._recycle_discards)
+        self.snapshots[0] = engine.copy()
+        return engine
+
+    def _apply(self, engine, action):
+        kind, player = action[0], action[1]
+        if kind == "play":
+            engine.play(player, action[2], action[3])
+        elif kind == "draw":
+            engine.draw_turn(player)
+        elif kind == "penalty":
+            engine.check_uno(player)
+        elif kind == "uno":
+            engine.call_uno(player)
+
+    def seek(self, turn):
+        """Engine state after the given number of turns"""
+        if not self.dealt:
+            raise ValueError("The log ends before the deal")
+        turn = max(0, min(turn, self.turns))
+        target = self.turn_starts[turn]
+        start = max((i for i in self.snapshots if i <= target), default=None)
+        if start is None:
+            engine, start = self._dealt_engine(), 0
+        else:
+            engine = self.snapshots[start].copy()
+        for index in range(start, target):
+            self._apply(engine, self.actions[index])
+            if index + 1 in self.snapshot_points and index + 1 not in self.snapshots:
+                self.snapshots[index + 1] = engine.copy()
+        return engine
+
+    def run(self):
+        """Engine state at the end of the game"""
+        return self.seek(self.turns)
+
+def replay_many(paths):
+    """Replay every log to its end; returns the winners, None for a game
+    without one (including logs cut off before the deal)"""
+    winners = []
+    for path in paths:
+        replayer = Replayer.from_file(path)
+        winners.append(replayer.run().winner if replayer.dealt else None)
+    return winners
@@ -1,61 +1,128 @@
+import functools
+import os
+import time
 import customtkinter as ctk
-from PIL import Image
-import random
-from card import Card
+from ai import greedy_move
+from beliefs import BeliefTracker
+from endgame import EndgameSolver, in_endgame
+from engine import UnoEngine
+from game_log import GameLogger
+from hand_view import HandView
+from scoring import Scoreboard
+from toasts import ToastPool
+from scheduler import FrameMonitor, TurnScheduler
+from tracing import tracer
 
 class GameManager:
-    def __init__(self, game_frame, ui_elements):
-        self.player_hand = []
-        self.ai_hands = [[], []]  # AI1 and AI2 hands
-        self.deck = self._create_deck()
-        self.discard_pile = []
-        self.current_player = 0
-        self.direction = 1
-        self.uno_called = False
+    def __init__(self, game_frame, ui_elements, ai_strategy=greedy_move, ai_executor=None,
+                 log_dir="game_logs", on_quit=None, target_score=500, server=None, num_players=3,
+                 endgame_threshold=0):
+        self.on_quit = on_quit  # Called by quit_to_menu to show the main menu
+        self.log_dir = log_dir  # None turns game logs off
+        self.logger = None
+        # (host, port) of a table_server.py to play on; the server then runs
+        # the game and the AI players, and this only shows it
+        self.server = server
+        self.num_players = num_players  # The human and num_players - 1 AIs
+        self.game_frame = game_frame
+        self.toasts = ToastPool(game_frame)  # Reused widgets for show_message
+        self.ai_strategy = ai_strategy
+        self.beliefs = {}  # AI seat -> BeliefTracker, for strategies that count cards
+        # Once every hand is down to endgame_threshold cards, an EndgameSolver
+        # makes the AI decisions instead of ai_strategy (0 turns it off)
+        self.endgame_threshold = endgame_threshold
+        self.endgame = EndgameSolver() if endgame_threshold else None
+        self.engine = self._create_engine()
+        # Kept across rematches until someone reaches target_score
+        self.scoreboard = Scoreboard(["You"] + [f"AI {i}" for i in range(1, num_players)], target_score)
         self.waiting_for_color = False
+        self.end_frame = None  # Panel shown when a game ends
         self.ai_delay = 2000  # Increased to 2 seconds for better visibility
-        self.game_frame = game_frame
         self.ui_elements = ui_elements
+        self.hand_view = HandView(ui_elements['card_holder'], self.play_card)
+        # AI moves are computed off the Tk thread so slow strategies don't freeze the UI
+        self.scheduler = TurnScheduler(game_frame, executor=ai_executor)
+        self.frame_monitor = FrameMonitor(game_frame)
 
-    def _create_deck(self):
-        deck = []
-        colors = ["Red", "Blue", "Green", "Yellow"]
-        numbers = [str(n) for n in list(range(10)) + list(range(1, 10))]
-        specials = ["Skip", "Reverse", "+2"]
-        
-        for color in colors:
-            for num in numbers:
-                deck.append(Card(color, num))
-            
-            for _ in range(2):  # Two of each special card
-                for special in specials:
-                    deck.append(Card(color, special))
-        
-        for _ in range(4):  # Four of each wild card
-            deck.append(Card("Black", "Wild"))
-            deck.append(Card("Black", "+4"))
-        
-        random.shuffle(deck)
-        return deck
+    def _create_engine(self):
+        if self.server is not None:
+            from table_client import RemoteEngine
+            engine = RemoteEngine(*self.server, widget=self.game_frame, players=self.num_players)
+            engine.subscribe(self.on_engine_event)
+            engine.subscribe(self.on_server_event)
+            return engine
+        engine = UnoEngine(num_players=self.num_players)
+        engine.subscribe(self.on_engine_event)
+        if getattr(self.ai_strategy, "card_counting", False):
+            # The human may draw while holding a playable card
+            self.beliefs = {seat: BeliefTracker(seat, draws_freely=(0,)).attach(engine)
+                            for seat in range(1, self.num_players)}
+        if self.log_dir is not None:
+            # Every game is logged so it can be replayed with game_log.Replayer
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{engine.seed}.unolog"
+            self.logger = GameLogger(os.path.join(self.log_dir, name), engine)
+        return engine
+
+    # The game state lives in the engine; these keep the UI code readable
+    @property
+    def player_hand(self):
+        return self.engine.hands[0]
+
+    @property
+    def ai_hands(self):
+        return self.engine.hands[1:]
+
+    @property
+    def deck(self):
+        return self.engine.deck
+
+    @property
+    def discard_pile(self):
+        return self.engine.discard_pile
+
+    @property
+    def current_player(self):
+        return self.engine.current_player
+
+    @property
+    def direction(self):
+        return self.engine.direction
 
     def initialize_game(self):
-        # Deal initial cards
-        for _ in range(7):
-            self.player_hand.append(self.deck.pop())
-            self.ai_hands[0].append(self.deck.pop())
-            self.ai_hands[1].append(self.deck.pop())
-        
-        # Initial card (not wild)
-        while True:
-            card = self.deck.pop()
-            if card.color != "Black":
-                self.discard_pile.append(card)
-                break
-            self.deck.append(card)
-            random.shuffle(self.deck)
-        
+        self.engine.deal()
+        self.frame_monitor.start()
         self.update_game_state()
 
+    def on_engine_event(self, event, data):
+        """Show what the AI players do"""
+        player = data.get("player")
+        if not player:  # Only AI moves are announced
+            return
+        if event == "play":
+            self.show_message(f"AI {player} plays {data['color']} {data['card'].value}", 1500)
+        elif event == "color":
+            self.show_message(f"AI {player} chose {data['color']}", 1500)
+        elif event == "draw" and not data["forced"]:
+            self.show_message(f"AI {player} draws a card", 1000)
+
+    def on_server_event(self, event, data):
+        """Follow a game played on a table server"""
+        if event == "turn":
+            self.update_game_state()
+        elif event == "hands":  # Game over, with every hand shown
+            winner = data["winner"]
+            if winner == 0:
+                self.game_won()
+            elif winner is not None:
+                self.ai_won(winner)
+            else:
+                self.game_draw()
+        elif event == "closed" and not self.engine.over:
+            self.show_message("Lost the connection to the server", 3000)
+
+    def show_message(self, text, duration):
+        self.toasts.show(text, duration)
+
     def handle_wild_card(self, card):
         """Handle wild card color selection"""
         self.waiting_for_color = True
@@ -83,44 +150,33 @@ class GameManager:
             )
             btn.pack(pady=5, padx=20)
 
-    def complete_wild_card_play(self, card, chosen_color, popup, win_pending=False):
+    def complete_wild_card_play(self, card, chosen_color, popup):
         """Complete playing a wild card after color is chosen"""
-        card.color = chosen_color
-        self.discard_pile.append(card)
         popup.destroy()
         self.waiting_for_color = False
-        
-        if win_pending:
+        with tracer.span("engine.step"):
+            self.engine.play(0, card, chosen_color)
+        self.after_player_move()
+
+    def after_player_move(self):
+        """End the human's move: declare the win or hand over to the AIs"""
+        if self.engine.winner == 0:
+            self.update_game_state()
             self.game_won()
             return
-            
-        if card.value == "+4":
-            self.handle_special_card(card)
-        else:
-            self.current_player = (self.current_player + self.direction) % 3
-        
-        self.game_frame.after(500, self.handle_ai_turn)
         self.update_game_state()
+        self.handle_ai_turn(500)
 
     def is_valid_play(self, card):
         """Check if a card can be played"""
-        if not self.discard_pile:
-            return True
-            
-        top_card = self.discard_pile[-1]
-        
-        # Wild cards can always be played
-        if card.color == "Black":
-            return True
-            
-        # If top card is wild, match its chosen color
-        if top_card.color != "Black":
-            return card.color == top_card.color or card.value == top_card.value
-            
-        return False  # Shouldn't reach here
+        return self.engine.is_valid_play(card)
 
     def update_game_state(self):
         """Update all UI elements"""
+        with tracer.span("render"):
+            self._update_widgets()
+
+    def _update_widgets(self):
         try:
             # Update player's hand
             self.update_player_hand()
@@ -136,7 +192,12 @@ class GameManager:
             self.update_ai_labels()
             
             # Update turn indicator
-            turn_text = "Your Turn" if self.current_player == 0 else f"AI {self.current_player}'s Turn"
+            if self.current_player is None:  # A table server has not said whose turn it is
+                turn_text = "Waiting..."
+            elif self.current_player == 0:
+                turn_text = "Your Turn"
+            else:
+                turn_text = f"AI {self.current_player}'s Turn"
             self.ui_elements['turn_label'].configure(text=turn_text)
             
             # Update UNO button state
@@ -144,9 +205,6 @@ class GameManager:
                 state="normal" if len(self.player_hand) == 2 else "disabled"
             )
             
-            # Force update
-            self.game_frame.update()
-            
         except Exception as e:
             print(f"Error updating game state: {str(e)}")
 
@@ -154,239 +212,89 @@ class GameManager:
         """Handle playing a card"""
         if self.current_player == 0 and not self.waiting_for_color:
             if self.is_valid_play(card):
-                # Check for UNO button violation
-                if len(self.player_hand) == 2 and not self.uno_called:
-                    # Player should have called UNO - add 2 cards as penalty
-                    for _ in range(2):
-                        if self.deck:
-                            self.player_hand.append(self.deck.pop())
+                # Playing the second-to-last card without UNO costs 2 cards
+                if not self.engine.check_uno(0):
                     self.update_game_state()
                     return
-                
-                self.player_hand.remove(card)
-                
-                # Add card to discard pile before checking win
-                if card.color != "Black":
-                    self.discard_pile.append(card)
-                
-                # Check win condition immediately
-                if len(self.player_hand) == 0:
-                    if card.color == "Black":
-                        # For black cards, wait for color selection before winning
-                        self.waiting_for_color = True
-                        self.show_color_picker(card, win_pending=True)
-                    else:
-                        self.game_won()
-                    return
-                
-                # Normal card play logic continues...
+
                 if card.color == "Black":
-                    self.waiting_for_color = True
-                    self.handle_wild_card(card)  # Changed from show_color_picker to handle_wild_card
+                    # The card stays in the hand until a color is chosen
+                    self.handle_wild_card(card)
                 else:
-                    self.discard_pile.append(card)
-                    if card.value in ["Skip", "Reverse", "+2", "+4"]:
-                        self.handle_special_card(card)
-                    else:
-                        self.current_player = (self.current_player + self.direction) % 3
-                    self.game_frame.after(500, self.handle_ai_turn)
-            
+                    with tracer.span("engine.step"):
+                        self.engine.play(0, card)
+                    self.after_player_move()
+                    return
+
             self.update_game_state()
 
     def update_player_hand(self):
-        card_holder = self.ui_elements['card_holder']
-        
-        # Clear existing cards
-        for widget in card_holder.winfo_children():
-            widget.destroy()
-            
-        # Add current cards
-        for card in self.player_hand:
-            card_btn = ctk.CTkButton(
-                card_holder,
-                image=card.get_image((100, 150)),
-                text="",
-                width=100,
-                command=lambda c=card: self.play_card(c)
-            )
-            card_btn.pack(side="left", padx=5)
+        # Only the buttons of cards that changed are created or destroyed
+        with tracer.span("render.hand"):
+            self.hand_view.render(self.player_hand)
 
     def update_ai_labels(self):
-        self.ui_elements['ai1_label'].configure(
-            text=f"AI 1\n{len(self.ai_hands[0])} Cards"
-        )
-        self.ui_elements['ai2_label'].configure(
-            text=f"AI 2\n{len(self.ai_hands[1])} Cards"
-        )
+        # One label per AI seat, in seat order
+        for number, (label, hand) in enumerate(zip(self.ui_elements['ai_labels'], self.ai_hands), 1):
+            label.configure(text=f"AI {number}\n{len(hand)} Cards")
 
     def draw_card(self):
-        if self.current_player == 0:  # Only allow drawing on player's turn
-            if self.deck:
-                new_card = self.deck.pop()
-                self.player_hand.append(new_card)
+        if self.current_player == 0 and not self.waiting_for_color:  # Only allow drawing on player's turn
+            with tracer.span("engine.step"):
+                drawn = self.engine.draw_turn(0)
+            if drawn is not None:
                 self.update_game_state()
-                self.current_player = (self.current_player + self.direction) % 3
-                self.game_frame.after(500, self.handle_ai_turn)
+                self.handle_ai_turn(500)
 
     def call_uno(self):
-        if len(self.player_hand) == 2:
-            self.uno_called = True
+        if self.engine.call_uno(0):
             self.ui_elements['uno_button'].configure(state="disabled")
-            
-    def handle_special_card(self, card):
-        """Handle special card effects (+2, Skip, Reverse, +4)"""
-        next_player = (self.current_player + self.direction) % 3
-        
-        if card.value == "Skip":
-            self.current_player = (next_player + self.direction) % 3
-        elif card.value == "Reverse":
-            self.direction *= -1
-            self.current_player = (self.current_player + self.direction) % 3
-        elif card.value == "+2":
-            # Make next player draw 2 cards
-            if next_player == 0:
-                for _ in range(2):
-                    if self.deck:
-                        self.player_hand.append(self.deck.pop())
-            else:
-                for _ in range(2):
-                    if self.deck:
-                        self.ai_hands[next_player-1].append(self.deck.pop())
-            self.current_player = (next_player + self.direction) % 3
-        elif card.value == "+4":  # Add this section
-            # Make next player draw 4 cards
-            if next_player == 0:
-                for _ in range(4):
-                    if self.deck:
-                        self.player_hand.append(self.deck.pop())
-            else:
-                for _ in range(4):
-                    if self.deck:
-                        self.ai_hands[next_player-1].append(self.deck.pop())
-            self.current_player = (next_player + self.direction) % 3
-        else:
-            self.current_player = next_player
 
-    def handle_ai_turn(self):
-        """Handle AI turns"""
-        while self.current_player != 0:
-            current_ai = self.current_player - 1  # Convert to 0-based index for ai_hands
-            ai_hand = self.ai_hands[current_ai]
-            
-            # Check for win condition first
-            if len(ai_hand) == 0:
-                self.ai_won(current_ai + 1)
+    def handle_ai_turn(self, delay=0):
+        """Start one AI turn: the move is chosen in the background on a copy
+        of the game and played no sooner than delay ms from now"""
+        player = self.current_player
+        if player == 0 or self.engine.winner is not None or self.server is not None:
+            return  # A table server plays its own AI seats
+
+        strategy = self.ai_strategy
+        if self.endgame is not None and in_endgame(self.engine, self.endgame_threshold):
+            strategy = self.endgame
+        if player in self.beliefs:
+            # The strategy only sees a copy of the game, so it gets a copy of
+            # what its seat has seen too
+            strategy = functools.partial(strategy, beliefs=self.beliefs[player].copy())
+        self.scheduler.request(
+            strategy, self.engine.copy(), player,
+            lambda move: self.finish_ai_turn(player, move),
+            min_delay=delay
+        )
+
+    def finish_ai_turn(self, player, move):
+        """Play the chosen AI move, then schedule the next AI turn until it is
+        the human's turn again"""
+        if move is not None:
+            with tracer.span("engine.step"):
+                self.engine.play(player, *move)
+            if self.engine.winner == player:
+                self.update_game_state()
+                self.ai_won(player)
                 return
-                
-            # Check if deck needs reshuffling
-            if not self.deck and self.discard_pile:
-                last_card = self.discard_pile.pop()
-                self.deck = self.discard_pile[:-1]
-                self.discard_pile = [last_card]
-                random.shuffle(self.deck)
-            
-            # Find valid card to play
-            valid_card = None
-            for card in ai_hand:
-                if self.is_valid_play(card):
-                    valid_card = card
-                    break
-            
-            if valid_card:
-                # AI plays the card
-                ai_hand.remove(valid_card)
-                
-                # Show what card AI played
-                play_popup = ctk.CTkFrame(self.game_frame, fg_color="#553D24")
-                play_popup.place(relx=0.5, rely=0.5, anchor="center")
-                ctk.CTkLabel(
-                    play_popup,
-                    text=f"AI {current_ai + 1} plays {valid_card.color} {valid_card.value}",
-                    font=("Arial", 20)
-                ).pack(pady=20, padx=40)
-                self.game_frame.after(1500, play_popup.destroy)
-                
-                # Handle special cards
-                if valid_card.color == "Black":
-                    colors = {"Red": 0, "Blue": 0, "Green": 0, "Yellow": 0}
-                    for card in ai_hand:
-                        if card.color in colors:
-                            colors[card.color] += 1
-                    chosen_color = max(colors.items(), key=lambda x: x[1])[0]
-                    
-                    # Show color choice
-                    popup = ctk.CTkFrame(self.game_frame, fg_color="#553D24")
-                    popup.place(relx=0.5, rely=0.5, anchor="center")
-                    ctk.CTkLabel(
-                        popup,
-                        text=f"AI {current_ai + 1} chose {chosen_color}",
-                        font=("Arial", 20)
-                    ).pack(pady=20, padx=40)
-                    self.game_frame.after(1500, popup.destroy)
-                    
-                    valid_card.color = chosen_color
-                
-                self.discard_pile.append(valid_card)
-                
-                # Check win condition after playing card
-                if len(ai_hand) == 0:
-                    self.ai_won(current_ai + 1)
-                    return
-                
-                # Handle special card effects
-                if valid_card.value in ["Skip", "Reverse", "+2", "+4"]:
-                    self.handle_special_card(valid_card)
-                else:
-                    self.current_player = (self.current_player + self.direction) % 3
-            else:
-                # AI must draw a card
-                if self.deck:
-                    new_card = self.deck.pop()
-                    ai_hand.append(new_card)
-                    # Show draw message
-                    draw_popup = ctk.CTkFrame(self.game_frame, fg_color="#553D24")
-                    draw_popup.place(relx=0.5, rely=0.5, anchor="center")
-                    ctk.CTkLabel(
-                        draw_popup,
-                        text=f"AI {current_ai + 1} draws a card",
-                        font=("Arial", 20)
-                    ).pack(pady=20, padx=40)
-                    self.game_frame.after(1000, draw_popup.destroy)
-                else:
-                    self.game_draw()
-                    return
-                self.current_player = (self.current_player + self.direction) % 3
-            
-            self.update_game_state()
-            
-            if self.current_player != 0:
-                self.game_frame.after(self.ai_delay, self.handle_ai_turn)
+        else:
+            with tracer.span("engine.step"):
+                drawn = self.engine.draw_turn(player)
+            if drawn is None:
+                self.game_draw()
                 return
 
-    def calculate_score(self, winner):
-        """Calculate score based on remaining cards"""
-        points = 0
-        # Count points from player's hand
-        for card in self.player_hand:
-            if card.value in ["+4", "Wild"]:
-                points += 50
-            elif card.value in ["+2", "Skip", "Reverse"]:
-                points += 20
-            else:
-                points += int(card.value) if card.value.isdigit() else 0
-
-        # Count points from AI hands
-        for i, hand in enumerate(self.ai_hands):
-            for card in hand:
-                if card.value in ["+4", "Wild"]:
-                    points += 50
-                elif card.value in ["+2", "Skip", "Reverse"]:
-                    points += 20
-                else:
-                    points += int(card.value) if card.value.isdigit() else 0
+        self.update_game_state()
+
+        # The AI thinks during the delay, so slow strategies don't add to it
+        self.handle_ai_turn(self.ai_delay)
 
-        # Add points to winner's score
-        self.scores[winner] += points
+    def calculate_score(self):
+        """Add the points of the finished game to the scoreboard"""
+        return self.scoreboard.record(self.engine)
 
     def game_won(self):
         """Handle player win condition"""
@@ -398,6 +306,9 @@ class GameManager:
             text="You Won!",
             font=("Impact", 40)
         ).pack(pady=20)
+        self.end_frame = win_frame
+        self.calculate_score()
+        self.add_rematch_button(win_frame)
         
         ctk.CTkButton(
             win_frame,
@@ -416,6 +327,9 @@ class GameManager:
             text=f"AI {ai_number} Won!",
             font=("Impact", 40)
         ).pack(pady=20)
+        self.end_frame = win_frame
+        self.calculate_score()
+        self.add_rematch_button(win_frame)
         
         ctk.CTkButton(
             win_frame,
@@ -424,6 +338,27 @@ class GameManager:
             command=lambda: self.game_frame.winfo_toplevel().destroy()
         ).pack(pady=20)
 
+    def game_draw(self):
+        """Handle the game ending with no cards left to draw"""
+        draw_frame = ctk.CTkFrame(self.game_frame, fg_color="#553D24")
+        draw_frame.place(relx=0.5, rely=0.5, anchor="center")
+        
+        ctk.CTkLabel(
+            draw_frame,
+            text="No cards left - Draw!",
+            font=("Impact", 40)
+        ).pack(pady=20)
+        self.end_frame = draw_frame
+        self.calculate_score()
+        self.add_rematch_button(draw_frame)
+        
+        ctk.CTkButton(
+            draw_frame,
+            text="Exit Game",
+            font=("Arial", 20),
+            command=lambda: self.game_frame.winfo_toplevel().destroy()
+        ).pack(pady=20)
+
     def add_rematch_button(self, frame):
         """Add rematch and quit buttons to win/lose screen"""
         buttons_frame = ctk.CTkFrame(frame, fg_color="transparent")
@@ -443,34 +378,53 @@ class GameManager:
             command=lambda: self.quit_to_menu()
         ).pack(side="left", padx=10)
         
-        # Show all scores
-        scores_text = "\n".join([f"{player}: {score}" 
-                                for player, score in self.scores.items()])
+        # Show the match scores
+        points = self.scoreboard.history[-1][1]
+        text = f"+{points} points\n\nScores (first to {self.scoreboard.target}):\n"
+        text += "\n".join(self.scoreboard.lines())
+        match_winner = self.scoreboard.match_winner
+        if match_winner is not None:
+            text += f"\n\n{self.scoreboard.names[match_winner]} won the match!"
         ctk.CTkLabel(
             frame,
-            text=f"\nTotal Scores:\n{scores_text}",
+            text=text,
             font=("Arial", 20)
         ).pack(pady=10)
 
     def rematch(self):
         """Reset the game for a rematch"""
-        # Clear hands
-        self.player_hand.clear()
-        self.ai_hands[0].clear()
-        self.ai_hands[1].clear()
-        self.discard_pile.clear()
-        
-        # Reset deck
-        self.deck = self._create_deck()
+        self.scheduler.cancel()
+        if self.scoreboard.match_winner is not None:
+            self.scoreboard.reset()  # The match is over: start a new one
+        if self.logger is not None:
+            self.logger.close()
+        if self.server is not None:
+            self.engine.close()
+        self.engine = self._create_engine()
+        self.waiting_for_color = False
         
-        # Clear game frame
-        for widget in self.game_frame.winfo_children():
-            widget.destroy()
+        # Clear the hand and the end of game panel; the other widgets are reused
+        self.hand_view.clear()
+        self.toasts.clear()
+        if self.end_frame is not None:
+            self.end_frame.destroy()
+            self.end_frame = None
             
         # Reinitialize game
         self.initialize_game()
 
     def quit_to_menu(self):
         """Return to main menu"""
-        from main import show_frame, home_frame
-        show_frame(home_frame)
\ No newline at end of file
+        self.scheduler.shutdown()  # This game's worker thread is done with
+        # The next game gets a new strategy, so this one's workers go now
+        close = getattr(self.ai_strategy, "close", None)
+        if close is not None:
+            close()
+        self.frame_monitor.stop()
+        self.toasts.clear()
+        if self.logger is not None:
+            self.logger.close()  # Flushes the log of an unfinished game
+        if self.server is not None:
+            self.engine.close()
+        if self.on_quit is not None:
+            self.on_quit()
\ No newline at end of file
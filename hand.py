@@ -0,0 +1,123 @@
+from card import COLORS, FACE_CARDS, FACE_COLOR, FACE_POINTS, FACE_VALUE, NUM_FACES, VALUES
+
+class Hand:
+    """The cards of one player, with their point total and counts kept up to date.
+
+    Cards are added and removed through the methods below, which adjust
+    the index as they go: the point total, counts by face, color and value,
+    and `mask`, the bitmask of faces present (same layout as PLAYABLE). AI
+    questions such as "can I play?" or "which color do I hold most of?" are
+    then answered without a rescan. Otherwise it reads like a list.
+    """
+    __slots__ = ("cards", "points", "face_counts", "color_counts", "value_counts", "mask")
+
+    def __init__(self, cards=()):
+        self.cards = []
+        self.points = 0
+        self.face_counts = [0] * NUM_FACES
+        self.color_counts = [0] * (len(COLORS) + 1)  # Last one counts the wild cards
+        self.value_counts = [0] * len(VALUES)
+        self.mask = 0
+        self.extend(cards)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def __getitem__(self, index):
+        return self.cards[index]
+
+    def __contains__(self, card):
+        return self.face_counts[card.face] > 0 and card in self.cards
+
+    def __eq__(self, other):
+        if isinstance(other, Hand):
+            return self.cards == other.cards
+        return self.cards == other
+
+    def __repr__(self):
+        return f"Hand({self.cards!r})"
+
+    def _added(self, face):
+        self.points += FACE_POINTS[face]
+        self.face_counts[face] += 1
+        self.color_counts[FACE_COLOR[face]] += 1
+        self.value_counts[FACE_VALUE[face]] += 1
+        self.mask |= 1 << face
+
+    def _removed(self, face):
+        self.points -= FACE_POINTS[face]
+        self.face_counts[face] -= 1
+        self.color_counts[FACE_COLOR[face]] -= 1
+        self.value_counts[FACE_VALUE[face]] -= 1
+        if not self.face_counts[face]:
+            self.mask &= ~(1 << face)
+
+    def append(self, card):
+        # _added inlined: this and remove() run on every draw and play
+        self.cards.append(card)
+        face = card.face
+        self.points += FACE_POINTS[face]
+        self.face_counts[face] += 1
+        self.color_counts[FACE_COLOR[face]] += 1
+        self.value_counts[FACE_VALUE[face]] += 1
+        self.mask |= 1 << face
+
+    def extend(self, cards):
+        for card in cards:
+            self.cards.append(card)
+            self._added(card.face)
+
+    def remove(self, card):
+        self.cards.remove(card)
+        face = card.face
+        self.points -= FACE_POINTS[face]
+        self.face_counts[face] -= 1
+        self.color_counts[FACE_COLOR[face]] -= 1
+        self.value_counts[FACE_VALUE[face]] -= 1
+        if not self.face_counts[face]:
+            self.mask &= ~(1 << face)
+
+    def pop(self, index=-1):
+        card = self.cards.pop(index)
+        self._removed(card.face)
+        return card
+
+    def copy(self):
+        other = Hand.__new__(Hand)
+        other.cards = list(self.cards)
+        other.points = self.points
+        other.face_counts = list(self.face_counts)
+        other.color_counts = list(self.color_counts)
+        other.value_counts = list(self.value_counts)
+        other.mask = self.mask
+        return other
+
+    def can_play(self, playable):
+        """Whether any card matches the playable bitmask (see UnoEngine.playable_mask)"""
+        return self.mask & playable != 0
+
+    def playable_faces(self, playable):
+        """Faces in the hand matching the playable bitmask, lowest first"""
+        bits = self.mask & playable
+        faces = []
+        while bits:
+            low = bits & -bits
+            faces.append(low.bit_length() - 1)
+            bits ^= low
+        return faces
+
+    def card_of(self, face):
+        """A card of the hand with that face, or None"""
+        if self.face_counts[face]:
+            for card in FACE_CARDS[face]:
+                if card in self.cards:
+                    return card
+        return None
+
+    def dominant_color(self):
+        """Index of the color held most; the first color wins ties"""
+        counts = self.color_counts
+        return max(range(len(COLORS)), key=counts.__getitem__)
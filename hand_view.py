@@ -0,0 +1,144 @@
+import math
+import customtkinter as ctk
+
+class HandView:
+    """Shows the player's hand in a horizontal CTkScrollableFrame, with
+    buttons only for the cards in view.
+
+    The scrollable frame holds a track as wide as the whole hand, so its
+    scrollbar behaves as if every card had a button. Only the cards in the
+    visible window plus `overscan` on each side get one: a small pool of
+    CTkButtons placed on the track. A card keeps its button while it stays
+    in view, only moved when a play or draw shifts it; the buttons of cards
+    leaving the view are given the image and command of the cards entering
+    it. The number of buttons depends on the frame's width, not the hand's
+    size, so a 100 card hand renders and scrolls as fast as a 7 card one.
+
+    The window is read from the canvas itself (its scroll offset and
+    width), refreshed from its xscrollcommand, which fires for the
+    scrollbar and the mouse wheel, and on its resizes. A card_holder that
+    is not a CTkScrollableFrame gets a button for every card.
+    """
+    def __init__(self, card_holder, on_click, image_size=(100, 150), overscan=2, padx=5):
+        self.card_holder = card_holder
+        self.on_click = on_click
+        self.image_size = image_size
+        self.overscan = overscan
+        self.padx = padx
+        self.cards = []
+        self.track = None
+        self.slot = None        # Width of a card and its padding, in CTk units
+        self.height = None
+        self.scaling = 1.0      # Pixels per CTk unit
+        self.shown = {}         # card -> (button, x) for the cards in view
+        self.idle = []          # Buttons not showing a card
+        self.created = 0
+        self.reassigned = 0
+
+        self.canvas = getattr(card_holder, "_parent_canvas", None)
+        self.scrollbar = getattr(card_holder, "_scrollbar", None)
+        if self.canvas is not None and self.scrollbar is not None:
+            self.canvas.configure(xscrollcommand=self._on_scroll)
+            self.canvas.bind("<Configure>", self._on_resize, add="+")
+        else:
+            self.canvas = None
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._refresh()
+
+    def _on_resize(self, event):
+        self._refresh()
+
+    def _refresh(self):
+        if self.track is not None and self.slot is not None:
+            self._fill()
+
+    def _create_button(self):
+        self.created += 1
+        return ctk.CTkButton(self.track, text="", width=self.image_size[0])
+
+    def _create_track(self):
+        self.track = ctk.CTkFrame(self.card_holder, fg_color="transparent",
+                                  width=1, height=self.height or 1)
+        self.track.pack(side="left")
+        if self.slot is None:
+            # Measured once on a first button showing a card, which grows
+            # it from the default button size to the image plus its border
+            button = self._create_button()
+            button.configure(image=self.cards[0].get_image(self.image_size))
+            self.card_holder.update_idletasks()
+            self.scaling = ctk.ScalingTracker.get_widget_scaling(self.card_holder)
+            self.slot = button.winfo_reqwidth() / self.scaling + 2 * self.padx
+            self.height = button.winfo_reqheight() / self.scaling
+            self.track.configure(height=self.height)
+            self.idle.append(button)
+
+    def render(self, cards):
+        """Show cards, reusing the buttons of the cards still in view"""
+        self.cards = list(cards)
+        if self.track is None:
+            if not self.cards:
+                return
+            self._create_track()
+        self.track.configure(width=max(1, len(self.cards) * self.slot))
+        self._fill()
+
+    def _window(self):
+        """Indexes of the cards to give buttons, for the current view"""
+        count = len(self.cards)
+        if self.canvas is None:
+            return range(count)
+        slot = self.slot * self.scaling  # In pixels, like the canvas
+        left = self.canvas.canvasx(0)
+        start = max(0, math.floor(left / slot) - self.overscan)
+        end = min(count, math.ceil((left + self.canvas.winfo_width()) / slot) + self.overscan)
+        return range(start, end)
+
+    def _fill(self):
+        window = self._window()
+        cards = self.cards
+        # Buttons are keyed by card (every card is in one place only), so a
+        # card keeps its button while it stays in view even when a play or
+        # draw shifts its place in the hand
+        wanted = {cards[index]: index for index in window}
+        for key, (button, _) in list(self.shown.items()):
+            if key not in wanted:
+                del self.shown[key]
+                self.idle.append(button)
+        placed = 0
+        for key, index in wanted.items():
+            x = index * self.slot + self.padx
+            if key in self.shown:
+                button, shown_x = self.shown[key]
+                if shown_x != x:
+                    button.place(x=x, y=0)
+                    self.shown[key] = (button, x)
+                continue
+            card = cards[index]
+            button = self.idle.pop() if self.idle else self._create_button()
+            button.configure(image=card.get_image(self.image_size),
+                             command=lambda c=card: self.on_click(c))
+            button.place(x=x, y=0)
+            self.shown[key] = (button, x)
+            placed += 1
+        self.reassigned += placed
+        for button in self.idle:
+            button.place_forget()
+
+    def clear(self):
+        """Destroy every button, e.g. before the card holder is destroyed"""
+        if self.track is not None:
+            self.track.destroy()  # And the buttons on it
+            self.track = None
+        self.shown = {}
+        self.idle = []
+        self.cards = []
+
+    def stats(self):
+        return {
+            "created": self.created,
+            "reassigned": self.reassigned,
+            "live": len(self.shown) + len(self.idle),
+            "shown": len(self.shown),
+        }
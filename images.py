@@ -0,0 +1,153 @@
+import queue
+import threading
+from collections import OrderedDict
+from PIL import Image
+import customtkinter as ctk
+from atlas import Atlas
+from tracing import tracer
+
+class ImageCache:
+    """Shared cache of decoded card PNGs and resized CTkImages.
+
+    Every PNG is decoded once and every (path, size) pair gets a single
+    CTkImage, so re-rendering a hand never touches the disk. Entries are
+    evicted least-recently-used first once the estimated memory use goes
+    over max_bytes. Cards found in the atlas are sliced out of it already
+    scaled, and their files are never opened.
+
+    prefetch() prepares images on a background thread, which only reads
+    files and runs PIL and never touches the cache: finished images are
+    put on a queue that the Tk thread drains into the cache in get().
+    """
+    def __init__(self, max_bytes=64 * 1024 * 1024, atlas=None):
+        self.max_bytes = max_bytes
+        self.atlas = atlas
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.decodes = 0
+        self.atlas_hits = 0
+        self.evictions = 0
+        self.prefetched = 0
+        self.prefetch_hits = 0
+        self._entries = OrderedDict()  # key -> (object, estimated bytes)
+        self._ready = queue.SimpleQueue()  # (path, size, image) from the prefetch thread
+        self._prefetch_thread = None
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def _store(self, key, value, nbytes):
+        self._entries[key] = (value, nbytes)
+        self.current_bytes += nbytes
+        # Never evict the entry we just stored, even if it alone is too big
+        while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, old_bytes) = self._entries.popitem(last=False)
+            self.current_bytes -= old_bytes
+            self.evictions += 1
+
+    def decoded(self, path):
+        """Return the decoded PIL image for path, reading the file only once"""
+        key = ("decoded", path)
+        image = self._lookup(key)
+        if image is None:
+            with tracer.span("image.decode"):
+                image = Image.open(path)
+                image.load()  # Decode now and release the file handle
+            self.decodes += 1
+            width, height = image.size
+            self._store(key, image, width * height * len(image.getbands()))
+        return image
+
+    def prepare(self, path, size):
+        """PIL image of path already scaled to size, made without the cache
+        so any thread can call it"""
+        if self.atlas is not None:
+            image = self.atlas.image(path, size)
+            if image is not None:
+                return image.copy()  # Reads the pages of the memory-mapped sheet now
+        with Image.open(path) as image:
+            return image.resize(tuple(size), Image.LANCZOS)
+
+    def prefetch(self, items):
+        """Prepare the (path, size) pairs not cached yet on a background
+        thread, in order; get() then finds them ready"""
+        items = [(path, tuple(size)) for path, size in items
+                 if ("ctk", path, tuple(size)) not in self._entries]
+        thread = threading.Thread(target=self._prefetch, args=(items,), daemon=True)
+        self._prefetch_thread = thread
+        thread.start()
+        return thread
+
+    def _prefetch(self, items):  # Background thread: no cache or Tk access
+        for path, size in items:
+            try:
+                self._ready.put((path, size, self.prepare(path, size)))
+            except OSError:
+                pass  # get() reports the missing file when it is asked for
+
+    def collect(self):
+        """Move the images prepared so far into the cache (Tk thread)"""
+        while True:
+            try:
+                path, size, image = self._ready.get_nowait()
+            except queue.Empty:
+                return
+            self.prefetched += 1
+            self._store(("prepared", path, size), image, size[0] * size[1] * len(image.getbands()))
+
+    def source(self, path, size):
+        """PIL image to show path at size: the prefetched or atlas image
+        when there is one, otherwise the decoded file, which CTkImage scales"""
+        entry = self._entries.pop(("prepared", path, tuple(size)), None)
+        if entry is not None:
+            # The CTkImage made from it takes its place in the cache
+            self.current_bytes -= entry[1]
+            self.prefetch_hits += 1
+            return entry[0]
+        if self.atlas is not None:
+            image = self.atlas.image(path, size)
+            if image is not None:
+                self.atlas_hits += 1
+                return image
+        return self.decoded(path)
+
+    def get(self, path, size):
+        """Return the shared CTkImage of path at size"""
+        key = ("ctk", path, tuple(size))
+        image = self._lookup(key)
+        if image is not None:
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        self.collect()
+        with tracer.span("image.load"):
+            source = self.source(path, size)
+            image = ctk.CTkImage(light_image=source, dark_image=source, size=size)
+        # CTkImage keeps an RGBA photo image of the scaled size
+        self._store(key, image, size[0] * size[1] * 4)
+        return image
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "decodes": self.decodes,
+            "atlas_hits": self.atlas_hits,
+            "prefetched": self.prefetched,
+            "prefetch_hits": self.prefetch_hits,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+        }
+
+image_cache = ImageCache(atlas=Atlas.load())  # None until atlas.py has been run
@@ -0,0 +1,216 @@
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from ai import random_move
+from beliefs import BeliefTracker
+from card import BLACK, CARDS, COLORS, FACE_COLOR
+from hand import Hand
+
+def legal_moves(engine, player):
+    """Moves as (face, color index) pairs, one per face; None means draw"""
+    moves = []
+    for face in engine.hands[player].playable_faces(engine.playable_mask()):
+        if FACE_COLOR[face] == BLACK:
+            moves.extend((face, color) for color in range(len(COLORS)))
+        else:
+            moves.append((face, None))
+    return moves or [None]
+
+def apply_move(engine, player, move):
+    if move is None:
+        return engine.draw_turn(player) is not None
+    face, color = move
+    card = engine.hands[player].card_of(face)
+    return engine.play(player, card, None if color is None else COLORS[color])
+
+def determinize(engine, player, rng, beliefs=None):
+    """Copy of the game where the cards player cannot see are dealt at random.
+
+    Opponents keep their hand sizes; the rest of the unseen cards become
+    the deck. With beliefs (player's BeliefTracker) the deal also respects
+    what player has seen the opponents do.
+    """
+    state = engine.copy(rng=rng)
+    state.uno_seats = set()
+    if beliefs is not None:
+        hands, state.deck.cards = beliefs.sample(rng)
+        for other, cards in enumerate(hands):
+            if cards is not None:
+                state.hands[other] = Hand(cards)
+        return state
+    seen = {card.id for card in engine.hands[player]}
+    seen.update(card.id for card in engine.discard_pile)
+    unseen = [card for card in CARDS if card.id not in seen]
+    rng.shuffle(unseen)
+    for other, hand in enumerate(engine.hands):
+        if other != player:
+            state.hands[other] = Hand(unseen[:len(hand)])
+            unseen = unseen[len(hand):]
+    state.deck.cards = unseen
+    return state
+
+class Node:
+    __slots__ = ("parent", "move", "player", "children", "visits", "wins", "avails")
+
+    def __init__(self, parent=None, move=None, player=None):
+        self.parent = parent
+        self.move = move        # Move that led here
+        self.player = player    # Player who made that move
+        self.children = {}      # move -> Node
+        self.visits = 0
+        self.wins = 0.0
+        self.avails = 0         # How often this move was legal when its parent was visited
+
+    def select(self, moves, exploration):
+        best, best_score = None, -1.0
+        for move in moves:
+            child = self.children[move]
+            score = (child.wins / child.visits
+                     + exploration * math.sqrt(math.log(child.avails) / child.visits))
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+def search(engine, player, budget, seed=None, exploration=0.7, max_depth=200, beliefs=None):
+    """Single-observer ISMCTS from player's point of view for budget seconds.
+    beliefs, player's BeliefTracker, makes the determinizations count cards.
+
+    Returns ({move: (visits, wins)} for the root, number of rollouts).
+    """
+    rng = random.Random(seed)
+    root = Node()
+    deadline = time.perf_counter() + budget
+    rollouts = 0
+    while rollouts == 0 or time.perf_counter() < deadline:
+        state = determinize(engine, player, rng, beliefs)
+        node = root
+
+        # Selection, among the moves legal in this determinization
+        while state.winner is None:
+            mover = state.current_player
+            moves = legal_moves(state, mover)
+            for move in moves:
+                child = node.children.get(move)
+                if child is not None:
+                    child.avails += 1
+            untried = [m for m in moves if m not in node.children]
+            if untried:
+                # Expansion
+                move = rng.choice(untried)
+                child = node.children[move] = Node(node, move, mover)
+                child.avails = 1
+                apply_move(state, mover, move)
+                node = child
+                break
+            node = node.select(moves, exploration)
+            if not apply_move(state, mover, node.move):
+                break  # The deck ran dry
+
+        # Rollout
+        for _ in range(max_depth):
+            if state.winner is not None:
+                break
+            mover = state.current_player
+            move = random_move(state, mover)
+            if move is not None:
+                state.play(mover, *move)
+            elif state.draw_turn(mover) is None:
+                break
+
+        # Backpropagation, from the point of view of each node's mover
+        while node is not None:
+            node.visits += 1
+            if node.player is not None and state.winner == node.player:
+                node.wins += 1
+            node = node.parent
+        rollouts += 1
+
+    stats = {move: (child.visits, child.wins) for move, child in root.children.items()}
+    return stats, rollouts
+
+def _search_task(args):
+    engine, player, budget, seed, beliefs = args
+    return search(engine, player, budget, seed, beliefs=beliefs)
+
+class ISMCTSPlayer:
+    """AI strategy choosing moves with information-set Monte Carlo tree search.
+
+    Every move gets budget seconds. With workers > 0 the search runs in that
+    many processes at once (root parallelization) and their root statistics
+    are added up.
+
+    With card_counting, opponents' hands are sampled from a BeliefTracker.
+    The caller can pass one kept up to date on the real game (GameManager
+    does, since the strategy only ever sees copies); otherwise the player
+    attaches its own to the engine it is called with.
+    """
+    def __init__(self, budget=0.2, workers=0, seed=None, card_counting=True):
+        self.budget = budget
+        self.workers = workers
+        self.card_counting = card_counting
+        self.trackers = {}  # player -> (engine, BeliefTracker attached to it)
+        self.rng = random.Random(seed)
+        self.executor = None
+        self.rollouts = 0
+        self.think_time = 0.0
+
+    def __call__(self, engine, player, beliefs=None):
+        if self.card_counting and beliefs is None:
+            beliefs = self._tracker(engine, player)
+        moves = legal_moves(engine, player)
+        if len(moves) == 1:
+            return self._to_engine_move(engine, player, moves[0])
+
+        start = time.perf_counter()
+        snapshot = engine.copy()
+        if beliefs is not None and not beliefs.in_sync(engine):
+            beliefs = None  # Missed an event: deal uniformly rather than wrongly
+        if self.workers:
+            self.start()
+            tasks = [(snapshot, player, self.budget, self.rng.random(), beliefs) for _ in range(self.workers)]
+            results = list(self.executor.map(_search_task, tasks))
+        else:
+            results = [search(snapshot, player, self.budget, self.rng.random(), beliefs=beliefs)]
+
+        totals = {}
+        for stats, rollouts in results:
+            self.rollouts += rollouts
+            for move, (visits, wins) in stats.items():
+                old = totals.get(move, (0, 0.0))
+                totals[move] = (old[0] + visits, old[1] + wins)
+        self.think_time += time.perf_counter() - start
+
+        best = max(moves, key=lambda m: totals.get(m, (0, 0.0)))
+        return self._to_engine_move(engine, player, best)
+
+    def _tracker(self, engine, player):
+        """The BeliefTracker of player following engine, attached on first use"""
+        attached = self.trackers.get(player)
+        if attached is None or attached[0] is not engine:
+            attached = self.trackers[player] = (engine, BeliefTracker(player).attach(engine))
+        return attached[1]
+
+    def _to_engine_move(self, engine, player, move):
+        if move is None:
+            return None
+        face, color = move
+        card = engine.hands[player].card_of(face)
+        return card, None if color is None else COLORS[color]
+
+    @property
+    def rollouts_per_second(self):
+        return self.rollouts / self.think_time if self.think_time else 0.0
+
+    def start(self):
+        """Start the worker processes now, from the calling thread, rather
+        than on the first move (GameManager calls strategies on a worker
+        thread, a bad place to fork from)"""
+        if self.workers and self.executor is None:
+            self.executor = ProcessPoolExecutor(self.workers)
+            self.executor.submit(int).result()  # Forks every worker
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
@@ -1,17 +1,108 @@
-import customtkinter as ctk
-from PIL import Image
+import math
+import sys
+import time
+from contextlib import contextmanager
+from tracing import tracer
+
+class StartupProfile:
+    """Time spent in each startup phase, for python main.py --profile-startup.
+
+    Phases can nest; each one only counts the time not spent in the phases
+    inside it.
+    """
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.totals = {}
+        self.stack = []
+        self.mark = self.started
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        self._switch()
+        self.stack.append(name)
+        try:
+            yield
+        finally:
+            self._switch()
+            self.stack.pop()
+
+    def _switch(self):
+        now = time.perf_counter()
+        if self.stack:
+            top = self.stack[-1]
+            self.totals[top] = self.totals.get(top, 0.0) + now - self.mark
+        self.mark = now
+
+    def report(self, title):
+        if self.enabled:
+            parts = ", ".join(f"{name} {seconds * 1000:.1f}" for name, seconds in self.totals.items())
+            print(f"{title} after {(time.perf_counter() - self.started) * 1000:.1f} ms: {parts} (ms)")
+
+profile = StartupProfile("--profile-startup" in sys.argv)
+
+with profile.phase("import customtkinter"):
+    import customtkinter as ctk
+with profile.phase("import PIL"):
+    from PIL import Image
 import webbrowser  
 
-homescreen = ctk.CTk()
+def load_image(path, size):
+    with profile.phase("decode images"):
+        image = Image.open(path)
+        image.load()
+    return ctk.CTkImage(light_image=image, dark_image=image, size=size)
+
+with profile.phase("create window"):
+    homescreen = ctk.CTk()
 homescreen.geometry("1000x600")
 ctk.set_default_color_theme("dark-blue")
 homescreen.resizable(False, False)
 homescreen.configure(fg_color="#094c7d")
 homescreen.title("pyUNO")
 
+def option(argv, name):
+    """Value following name on the command line, or None"""
+    if name not in argv or argv.index(name) + 1 >= len(argv):
+        return None
+    return argv[argv.index(name) + 1]
+
+def server_address(argv):
+    """(host, port) given as --server host:port, to play on a table_server.py"""
+    value = option(argv, "--server")
+    if value is None:
+        return None
+    host, _, port = value.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+server = server_address(sys.argv)
+trace_path = option(sys.argv, "--trace")  # Chrome trace of the session, written on exit
+policy_ai = "--policy-ai" in sys.argv  # Classic Mode against the lookup-table AI of policy.py
+tracer.enabled = trace_path is not None
+num_players = 3  # Chosen on the game mode screen
+
+def set_num_players(value):
+    global num_players
+    num_players = int(value)
+
+frames = {}  # Built by get_frame the first time they are shown
+
+def get_frame(name):
+    frame = frames.get(name)
+    if frame is None:
+        with profile.phase("create widgets"):
+            frame = frames[name] = FRAME_BUILDERS[name]()
+    return frame
+
 def show_frame(frame): 
+    if isinstance(frame, str):
+        frame = get_frame(frame)
     frame.tkraise()
-    frame.update()  # Force update to show frame immediately
+    with tracer.span("tk.update"):
+        frame.update()  # Force update to show frame immediately
 
 for i in range(4): 
     homescreen.grid_columnconfigure(i, weight=1)
@@ -19,8 +110,20 @@ for i in range(4):
 def close_program():
     homescreen.destroy()
     
-def start_game():
+def ai_seat_position(number, count):
+    """(relx, rely) of the label of AI number (1 to count): up to 4 AIs sit
+    on an arc from the left of the table, over the top, to the right; more
+    sit in a row along the top"""
+    if count == 1:
+        return 0.1, 0.4
+    if count > 4:
+        return (number - 0.5) / count, 0.1
+    angle = math.pi * (number - 1) / (count - 1)
+    return 0.5 - 0.4 * math.cos(angle), 0.4 - 0.24 * math.sin(angle)
+
+def start_game(ai_strategy=None, endgame_threshold=0, notice=None):
     from game_manager import GameManager  # Move import here
+    from images import image_cache
     game_frame = ctk.CTkFrame(homescreen, fg_color="#92663E")
     game_frame.place(relx=0, rely=0, relwidth=1, relheight=1)
     
@@ -43,9 +146,7 @@ def start_game():
     ui_elements['uno_button'].place(relx=0.9, rely=0.85, anchor="center")
 
     # Deck and last card
-    deck_img = ctk.CTkImage(light_image=Image.open("./media/cards/pyUNO Retro.png"),
-                           dark_image=Image.open("./media/cards/pyUNO Retro.png"),
-                           size=(150, 225))
+    deck_img = image_cache.get("./media/cards/pyUNO Retro.png", (150, 225))
 
     ui_elements['deck_label'] = ctk.CTkLabel(game_frame, image=deck_img, text="")
     ui_elements['deck_label'].place(relx=0.4, rely=0.4, anchor="center")
@@ -57,126 +158,178 @@ def start_game():
     ui_elements['turn_label'] = ctk.CTkLabel(
         game_frame, text="Your Turn", font=("Impact", 30), text_color="white"
     )
-    ui_elements['turn_label'].place(relx=0.5, rely=0.15, anchor="center")
-
-    # AI info
-    ai1_frame = ctk.CTkFrame(game_frame, fg_color="#553D24")
-    ai1_frame.place(relx=0.1, rely=0.4, anchor="center")
-    ui_elements['ai1_label'] = ctk.CTkLabel(
-        ai1_frame, text="AI 1\n7 Cards", font=("Arial", 24), text_color="white"
-    )
-    ui_elements['ai1_label'].pack(pady=10, padx=20)
-
-    ai2_frame = ctk.CTkFrame(game_frame, fg_color="#553D24")
-    ai2_frame.place(relx=0.9, rely=0.4, anchor="center")
-    ui_elements['ai2_label'] = ctk.CTkLabel(
-        ai2_frame, text="AI 2\n7 Cards", font=("Arial", 24), text_color="white"
-    )
-    ui_elements['ai2_label'].pack(pady=10, padx=20)
+    # With more than 2 AIs their labels take the top of the table
+    ui_elements['turn_label'].place(relx=0.5, rely=0.15 if num_players <= 3 else 0.67, anchor="center")
+
+    # AI info, one label per AI seat
+    ai_count = num_players - 1
+    small = ai_count > 4
+    ui_elements['ai_labels'] = []
+    for number in range(1, ai_count + 1):
+        relx, rely = ai_seat_position(number, ai_count)
+        ai_frame = ctk.CTkFrame(game_frame, fg_color="#553D24")
+        ai_frame.place(relx=relx, rely=rely, anchor="center")
+        label = ctk.CTkLabel(
+            ai_frame, text=f"AI {number}\n7 Cards", font=("Arial", 16 if small else 24), text_color="white"
+        )
+        label.pack(pady=10, padx=8 if small else 20)
+        ui_elements['ai_labels'].append(label)
 
     # Initialize game manager with UI elements dictionary
-    game_manager = GameManager(game_frame, ui_elements)
+    on_quit = lambda: show_frame("home")
+    if ai_strategy is None:
+        game_manager = GameManager(game_frame, ui_elements, on_quit=on_quit, server=server,
+                                   num_players=num_players, endgame_threshold=endgame_threshold)
+    else:
+        game_manager = GameManager(game_frame, ui_elements, ai_strategy=ai_strategy, on_quit=on_quit,
+                                   server=server, num_players=num_players, endgame_threshold=endgame_threshold)
     
     # Configure deck label to draw cards
     ui_elements['deck_label'].bind('<Button-1>', lambda e: game_manager.draw_card())
     
     # Initialize the game state
     game_manager.initialize_game()
+    if notice is not None:
+        game_manager.show_message(notice, 4000)
     
     return game_frame
 
 def open_github():
     webbrowser.open("https://github.com/cuom0")
 
-# Home Frame
-home_frame = ctk.CTkFrame(homescreen, fg_color="transparent", width=1000, height=600)
-home_frame.grid(row=0, column=0, sticky="nsew") # The frame is placed in the grid layout and set to fill the window
+def build_home_frame():
+    home_frame = ctk.CTkFrame(homescreen, fg_color="transparent", width=1000, height=600)
+    home_frame.grid(row=0, column=0, sticky="nsew") # The frame is placed in the grid layout and set to fill the window
 
-title = ctk.CTkLabel(home_frame, text="pyUNO", fg_color="transparent", font=("Impact", 40), text_color="white")
-title.grid(row=0, column=0, columnspan=3, padx=30, pady=15, sticky="n")
+    title = ctk.CTkLabel(home_frame, text="pyUNO", fg_color="transparent", font=("Impact", 40), text_color="white")
+    title.grid(row=0, column=0, columnspan=3, padx=30, pady=15, sticky="n")
 
-play = ctk.CTkButton(home_frame, text="Play!", font=("Arial", 45), width=400, height=90, corner_radius=20, command=lambda: show_frame(mode_selector))
-play.grid(row=1, column=0, columnspan=3, padx=30, pady=5, sticky="n")
+    play = ctk.CTkButton(home_frame, text="Play!", font=("Arial", 45), width=400, height=90, corner_radius=20, command=lambda: show_frame("mode_selector"))
+    play.grid(row=1, column=0, columnspan=3, padx=30, pady=5, sticky="n")
 
-credits = ctk.CTkButton(home_frame, text="Credits", font=("Arial", 25), width=300, height=70, corner_radius=15,
-                         command=lambda: show_frame(credit_frame))
-credits.grid(row=2, column=0, columnspan=3, pady=5, sticky="n")
+    credits = ctk.CTkButton(home_frame, text="Credits", font=("Arial", 25), width=300, height=70, corner_radius=15,
+                             command=lambda: show_frame("credits"))
+    credits.grid(row=2, column=0, columnspan=3, pady=5, sticky="n")
 
-exit_btn = ctk.CTkButton(home_frame, text="Exit", font=("Arial", 25), width=300, height=70, corner_radius=15,
-                         command=close_program)
-exit_btn.grid(row=3, column=0, columnspan=3, pady=5, sticky="n")
+    exit_btn = ctk.CTkButton(home_frame, text="Exit", font=("Arial", 25), width=300, height=70, corner_radius=15,
+                             command=close_program)
+    exit_btn.grid(row=3, column=0, columnspan=3, pady=5, sticky="n")
 
-bgcards = ctk.CTkImage(light_image=Image.open("./media/home/background.png"),
-                        dark_image=Image.open("./media/home/background.png"),
-                        size=(500, 400))
-bgcardslabel = ctk.CTkLabel(home_frame, image=bgcards, text="")
-bgcardslabel.grid(row=0, column=3, rowspan=4, padx=(20, 50), pady=50, sticky="e")
+    bgcards = load_image("./media/home/Background.png", (500, 400))
+    bgcardslabel = ctk.CTkLabel(home_frame, image=bgcards, text="")
+    bgcardslabel.grid(row=0, column=3, rowspan=4, padx=(20, 50), pady=50, sticky="e")
+    return home_frame
 
-# Frame Credits
-credit_frame = ctk.CTkFrame(homescreen, fg_color="transparent", width=1000, height=600)
-credit_frame.grid(row=0, column=0, sticky="nsew")
+def build_credit_frame():
+    credit_frame = ctk.CTkFrame(homescreen, fg_color="transparent", width=1000, height=600)
+    credit_frame.grid(row=0, column=0, sticky="nsew")
 
-ctk.CTkLabel(credit_frame, text="Credits", font=("Impact", 40), text_color="white").pack(pady=20)
+    ctk.CTkLabel(credit_frame, text="Credits", font=("Impact", 40), text_color="white").pack(pady=20)
 
-ctk.CTkLabel(credit_frame, text="Salvatore Cuomo\n(Lead Developer, Game Designer)", font=("Arial", 30), text_color="white").pack(pady=5)
+    ctk.CTkLabel(credit_frame, text="Salvatore Cuomo\n(Lead Developer, Game Designer)", font=("Arial", 30), text_color="white").pack(pady=5)
 
-github_profile_image = ctk.CTkImage(light_image=Image.open("./media/home/githubpfp.jpg"), 
-                                    dark_image=Image.open("./media/home/githubpfp.jpg"),
-                                    size=(50, 50))
-github_button = ctk.CTkButton(credit_frame, text="GitHub", font=("Arial", 20), image=github_profile_image, compound="left", command=open_github)
-github_button.pack(pady=5)
+    github_profile_image = load_image("./media/home/githubpfp.jpg", (50, 50))
+    github_button = ctk.CTkButton(credit_frame, text="GitHub", font=("Arial", 20), image=github_profile_image, compound="left", command=open_github)
+    github_button.pack(pady=5)
 
-ctk.CTkLabel(credit_frame, text="Francesco Ciampa\n(Card Design, PowerPoint)", font=("Arial", 20), text_color="white").pack(pady=10)
-ctk.CTkLabel(credit_frame, text="Antonio De Cicco\n(Ideas, PowerPoint)", font=("Arial", 20), text_color="white").pack(pady=10)
+    ctk.CTkLabel(credit_frame, text="Francesco Ciampa\n(Card Design, PowerPoint)", font=("Arial", 20), text_color="white").pack(pady=10)
+    ctk.CTkLabel(credit_frame, text="Antonio De Cicco\n(Ideas, PowerPoint)", font=("Arial", 20), text_color="white").pack(pady=10)
 
-back_button = ctk.CTkButton(credit_frame, text="Back", font=("Arial", 25), width=200, height=50, corner_radius=15,
-                            command=lambda: show_frame(home_frame))
-back_button.pack(pady=20)
+    back_button = ctk.CTkButton(credit_frame, text="Back", font=("Arial", 25), width=200, height=50, corner_radius=15,
+                                command=lambda: show_frame("home"))
+    back_button.pack(pady=20)
+    return credit_frame
 
-# Mode Selector Frame
-mode_selector = ctk.CTkFrame(homescreen, fg_color="transparent", width=1000, height=800)
-mode_selector.grid(row=0, column=0, sticky="nsew")
+def build_mode_selector():
+    mode_selector = ctk.CTkFrame(homescreen, fg_color="transparent", width=1000, height=800)
+    mode_selector.grid(row=0, column=0, sticky="nsew")
 
-classic_image = ctk.CTkImage(light_image=Image.open("./media/home/classic.png"), 
-                             dark_image=Image.open("./media/home/classic.png"),
-                             size=(100, 100))
-hard_image = ctk.CTkImage(light_image=Image.open("./media/home/hardmode.png"), 
-                          dark_image=Image.open("./media/home/hardmode.png"),
-                          size=(100, 100))
+    classic_image = load_image("./media/home/classic.png", (100, 100))
+    hard_image = load_image("./media/home/hardmode.png", (100, 100))
 
-mode_selector.grid_rowconfigure(0, weight=1)
-mode_selector.grid_rowconfigure(1, weight=1)
-mode_selector.grid_columnconfigure(0, weight=1)
-mode_selector.grid_columnconfigure(1, weight=1)
-mode_selector.grid_columnconfigure(2, weight=1)
-        
-gamemode_label = ctk.CTkLabel(mode_selector, text="Game Mode", font=("Impact", 40), text_color="white")
-gamemode_label.grid(row=0, column=1, pady=10, sticky="n")
-goback = ctk.CTkButton(mode_selector, text="Back", font=("Arial", 25), width=200, height=50, corner_radius=15,
-                       command=lambda: show_frame(home_frame))
-goback.grid(row=0, column=2, padx=2.5, pady=10, sticky="en")
+    mode_selector.grid_rowconfigure(0, weight=1)
+    mode_selector.grid_rowconfigure(1, weight=1)
+    mode_selector.grid_columnconfigure(0, weight=1)
+    mode_selector.grid_columnconfigure(1, weight=1)
+    mode_selector.grid_columnconfigure(2, weight=1)
 
+    gamemode_label = ctk.CTkLabel(mode_selector, text="Game Mode", font=("Impact", 40), text_color="white")
+    gamemode_label.grid(row=0, column=1, pady=10, sticky="n")
+    goback = ctk.CTkButton(mode_selector, text="Back", font=("Arial", 25), width=200, height=50, corner_radius=15,
+                           command=lambda: show_frame("home"))
+    goback.grid(row=0, column=2, padx=2.5, pady=10, sticky="en")
 
-def start_classic_game():
-    print("Starting classic game...")  # Debug print
-    game_frame = start_game()
-    print("Game frame created...")     # Debug print
-    show_frame(game_frame)
-    print("Frame shown...")            # Debug print
-    homescreen.update()
+    players_frame = ctk.CTkFrame(mode_selector, fg_color="transparent")
+    players_frame.grid(row=0, column=0, padx=10, pady=10, sticky="wn")
+    ctk.CTkLabel(players_frame, text="Players:", font=("Arial", 25), text_color="white").pack(side="left", padx=5)
+    players_menu = ctk.CTkOptionMenu(players_frame, values=[str(n) for n in range(2, 11)],
+                                     font=("Arial", 20), width=80, command=set_num_players)
+    players_menu.set(str(num_players))
+    players_menu.pack(side="left")
 
-classic_button = ctk.CTkButton(mode_selector, text="Classic Mode", font=("Arial", 25), 
-                              image=classic_image, compound="top", width=400, height=300, 
-                              corner_radius=20, command=start_classic_game)
-classic_button.grid(row=1, column=0, padx=2.5, pady=0, sticky="e")  # Add this line
+    classic_button = ctk.CTkButton(mode_selector, text="Classic Mode", font=("Arial", 25), 
+                                  image=classic_image, compound="top", width=400, height=300, 
+                                  corner_radius=20, command=start_classic_game)
+    classic_button.grid(row=1, column=0, padx=2.5, pady=0, sticky="e")  # Add this line
 
-def show_coming_soon():
-    coming_soon_label = ctk.CTkLabel(mode_selector, text="Coming soon!", font=("Arial", 20), text_color="white")
-    coming_soon_label.grid(row=2, column=2, pady=10, sticky="n")
+    hard_button = ctk.CTkButton(mode_selector, text="HARD MODE", font=("Arial", 25), text_color="red", image=hard_image, compound="top", width=400, height=300, corner_radius=20, command=start_hard_game)
+    hard_button.grid(row=1, column=2, padx=2.5, pady=0, sticky="w")
+    return mode_selector
 
-hard_button = ctk.CTkButton(mode_selector, text="HARD MODE", font=("Arial", 25), text_color="red", image=hard_image, compound="top", width=400, height=300, corner_radius=20, command=show_coming_soon)
-hard_button.grid(row=1, column=2, padx=2.5, pady=0, sticky="w")
+FRAME_BUILDERS = {
+    "home": build_home_frame,
+    "credits": build_credit_frame,
+    "mode_selector": build_mode_selector,
+}
 
-home_frame.tkraise() # Makes the home frame visible by default
+def start_classic_game():
+    ai_strategy = None
+    notice = None
+    if policy_ai:
+        from policy import PolicyPlayer
+        ai_strategy = PolicyPlayer.load()
+        if ai_strategy is None:
+            notice = "No policy table: playing the greedy AI (train one with policy.py)"
+    game_frame = start_game(ai_strategy=ai_strategy, notice=notice)
+    show_frame(game_frame)
+    homescreen.update()
+
+def start_hard_game():
+    import multiprocessing
+    import os
+    from ismcts import ISMCTSPlayer
+    # Worker processes started with "spawn" would re-run this script, so the
+    # search only uses a process pool where processes are forked
+    workers = 0
+    if multiprocessing.get_start_method() == "fork":
+        workers = max(0, min(4, (os.cpu_count() or 1) - 1))
+    ai_strategy = ISMCTSPlayer(budget=0.2, workers=workers)
+    ai_strategy.start()  # Fork the workers from the Tk thread; quit_to_menu closes them
+    # With 3 cards or fewer in every hand, the endgame solver takes over
+    game_frame = start_game(ai_strategy=ai_strategy, endgame_threshold=3)
+    show_frame(game_frame)
+    homescreen.update()
 
-homescreen.mainloop()
+def preload_game():
+    """Import the game and load its card images while the player is still
+    on the menus, so the first game frame doesn't wait for them"""
+    with profile.phase("preload game"):
+        import game_manager
+        from card import FACE_IMAGES
+        from images import image_cache
+        image_cache.get("./media/cards/pyUNO Retro.png", (150, 225))
+        # Every face at the hand size, then at the top card size, is made
+        # ready off the Tk thread, so a drawn card never waits for PIL
+        image_cache.prefetch([(path, size) for size in ((100, 150), (150, 225)) for path in FACE_IMAGES])
+    profile.report("Game preloaded")
+
+if __name__ == "__main__":
+    with profile.phase("first paint"):
+        show_frame("home") # Only the home frame is built before the first paint
+    profile.report("First paint")
+    homescreen.after(100, preload_game)
+    homescreen.mainloop()
+    if trace_path is not None:
+        tracer.save(trace_path)
+        print(tracer.summary())
+        print(f"Trace written to {trace_path}")
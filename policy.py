@@ -0,0 +1,277 @@
+"""Lookup-table AI: one byte per abstract game situation, trained by self-play.
+
+A situation is what matters for choosing a card, in a few buckets: which
+kinds of card the player can play, their hand size, the next player's and
+the shortest opponent hand, and how many cards of the active color they
+hold. Its byte names the kind of card to play. The table is a flat file,
+memory-mapped when loaded, so a move is a few bit operations and one byte
+read, and loading parses nothing.
+
+Train (or retrain after changing the rules or the features) with:
+
+    python policy.py --games 2000 --rollouts 8 --iterations 2
+
+Training plays self-play games with the current table. At every decision
+with a choice, each kind of card the player could play is tried from
+`rollouts` deals of the cards they cannot see (ismcts.determinize), and
+the games are finished with the current table in every seat. The kind
+winning most often in a situation becomes its entry, so each iteration
+improves on the previous table, starting from greedy_move.
+"""
+import argparse
+import mmap
+import multiprocessing
+import random
+import struct
+from ai import dominant_color, greedy_move
+from card import BLACK, COLORS, DRAW_FOUR, DRAW_TWO, FACE_COLOR, FACE_VALUE, NUM_FACES, REVERSE, SKIP
+from engine import UnoEngine
+
+POLICY_PATH = "./media/policy.bin"
+
+# Kinds of card to play, relative to the active color
+SAME_NUMBER, SAME_SKIP, SAME_REVERSE, SAME_DRAW_TWO, OTHER_COLOR, WILD_CARD, WILD_DRAW_FOUR = range(7)
+KINDS = ("same color number", "same color Skip", "same color Reverse", "same color +2",
+         "other color", "Wild", "+4")
+
+def _build_kind_masks():
+    # KIND_MASKS[color][kind]: faces of that kind when color is active
+    masks = []
+    for color in range(len(COLORS)):
+        kinds = [0] * len(KINDS)
+        for face in range(NUM_FACES):
+            value = FACE_VALUE[face]
+            if FACE_COLOR[face] == BLACK:
+                kind = WILD_DRAW_FOUR if value == DRAW_FOUR else WILD_CARD
+            elif FACE_COLOR[face] != color:
+                kind = OTHER_COLOR
+            elif value == SKIP:
+                kind = SAME_SKIP
+            elif value == REVERSE:
+                kind = SAME_REVERSE
+            elif value == DRAW_TWO:
+                kind = SAME_DRAW_TWO
+            else:
+                kind = SAME_NUMBER
+            kinds[kind] |= 1 << face
+        masks.append(tuple(kinds))
+    return tuple(masks)
+
+KIND_MASKS = _build_kind_masks()
+
+# Feature buckets, indexed by the count (counts past the end use the last)
+HAND_BUCKETS = (0, 0, 1, 2, 3, 3, 3, 4)   # 1, 2, 3, 4-6, 7+ cards
+NEXT_BUCKETS = (0, 0, 1, 2, 3)            # 1, 2, 3, 4+ cards
+FEWEST_BUCKETS = (0, 0, 1, 2)             # 1, 2, 3+ cards
+COLOR_BUCKETS = (0, 1, 2)                 # 0, 1, 2+ cards of the active color
+DIMENSIONS = (1 << len(KINDS), 5, 4, 3, 3)
+NUM_CELLS = 1
+for _size in DIMENSIONS:
+    NUM_CELLS *= _size
+
+HEADER = struct.Struct("<4sB5H")  # Magic, version, DIMENSIONS
+MAGIC = b"UNOP"
+VERSION = 1
+
+def _bucket(buckets, count):
+    return buckets[count] if count < len(buckets) else buckets[-1]
+
+def situation(engine, player):
+    """(table index, bitmask of the kinds player can play, faces player can play)"""
+    hand = engine.hands[player]
+    legal = hand.mask & engine.playable_mask()
+    masks = KIND_MASKS[engine.active_color]
+    kinds = 0
+    for kind in range(len(KINDS)):
+        if legal & masks[kind]:
+            kinds |= 1 << kind
+    next_size = len(engine.hands[engine.next_player()])
+    fewest = min(len(other) for seat, other in enumerate(engine.hands) if seat != player)
+    index = kinds
+    index = index * DIMENSIONS[1] + _bucket(HAND_BUCKETS, len(hand))
+    index = index * DIMENSIONS[2] + _bucket(NEXT_BUCKETS, next_size)
+    index = index * DIMENSIONS[3] + _bucket(FEWEST_BUCKETS, fewest)
+    index = index * DIMENSIONS[4] + _bucket(COLOR_BUCKETS, hand.color_counts[engine.active_color])
+    return index, kinds, legal
+
+def move_of_kind(engine, player, kind, legal):
+    """The move playing the highest face of that kind (the most points, for
+    numbers); wild cards take the color held most"""
+    hand = engine.hands[player]
+    faces = legal & KIND_MASKS[engine.active_color][kind]
+    card = hand.card_of(faces.bit_length() - 1)
+    if FACE_COLOR[card.face] == BLACK:
+        return card, dominant_color(hand)
+    return card, None
+
+class PolicyTable:
+    """A policy file, memory-mapped: entry(index) is the kind to play + 1,
+    or 0 where training never saw the situation"""
+    def __init__(self, path=POLICY_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, *dimensions = HEADER.unpack_from(self.buffer)
+        if (magic, version, tuple(dimensions)) != (MAGIC, VERSION, DIMENSIONS) \
+                or len(self.buffer) != HEADER.size + NUM_CELLS:
+            self.buffer.close()
+            raise ValueError(f"{path} is not a policy table for these features")
+
+    @classmethod
+    def load(cls, path=POLICY_PATH):
+        """The table at path, or None if it is missing or out of date"""
+        try:
+            return cls(path)
+        except (OSError, ValueError):
+            return None
+
+    def entry(self, index):
+        return self.buffer[HEADER.size + index]
+
+    def close(self):
+        self.buffer.close()
+
+def save_table(entries, path=POLICY_PATH):
+    """Write a bytes-like of NUM_CELLS entries"""
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, *DIMENSIONS))
+        f.write(bytes(entries))
+
+class PolicyPlayer:
+    """AI strategy playing the kind of card its table names, like
+    greedy_move where the table has no entry"""
+    def __init__(self, table):
+        self.table = table
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path=POLICY_PATH):
+        """A player with the table at path, or None if there is none"""
+        table = PolicyTable.load(path)
+        return None if table is None else cls(table)
+
+    def __call__(self, engine, player):
+        index, kinds, legal = situation(engine, player)
+        if not kinds:
+            return None
+        if kinds & (kinds - 1):
+            entry = self.table.entry(index)
+            if entry and kinds >> (entry - 1) & 1:
+                self.hits += 1
+                return move_of_kind(engine, player, entry - 1, legal)
+            self.misses += 1
+            return greedy_move(engine, player)
+        return move_of_kind(engine, player, kinds.bit_length() - 1, legal)
+
+    def close(self):
+        self.table.close()
+
+    def __reduce__(self):
+        # The memory map is reopened where the player is unpickled
+        return (_load_player, (self.table.path,))
+
+def _load_player(path):
+    return PolicyPlayer(PolicyTable(path))
+
+class _Policy:
+    """Training's current policy: PolicyPlayer's choice from a bytes table
+    kept in memory"""
+    def __init__(self, entries):
+        self.entries = entries
+
+    def __call__(self, engine, player):
+        index, kinds, legal = situation(engine, player)
+        if not kinds:
+            return None
+        entry = self.entries[index]
+        if entry and kinds >> (entry - 1) & 1:
+            return move_of_kind(engine, player, entry - 1, legal)
+        return greedy_move(engine, player)
+
+def _finish(engine, policy, max_turns=1000):
+    for _ in range(max_turns):
+        if engine.winner is not None:
+            break
+        player = engine.current_player
+        move = policy(engine, player)
+        if move is not None:
+            engine.play(player, *move)
+        elif engine.draw_turn(player) is None:
+            break
+    return engine.winner
+
+def train_games(task):
+    """Play a chunk of self-play games in a worker; returns
+    {index: [[wins, tries] per kind]} of the situations met"""
+    from ismcts import determinize
+    seed, first, count, num_players, rollouts, entries = task
+    policy = _Policy(entries)
+    stats = {}
+    for game_index in range(first, first + count):
+        rng = random.Random(f"{seed}:{game_index}")
+        engine = UnoEngine(num_players=num_players, rng=rng, uno_seats=())
+        engine.deal()
+        for _ in range(1000):
+            if engine.winner is not None:
+                break
+            player = engine.current_player
+            index, kinds, legal = situation(engine, player)
+            if kinds & (kinds - 1):
+                cell = stats.setdefault(index, [[0, 0] for _ in KINDS])
+                for kind in range(len(KINDS)):
+                    if not kinds >> kind & 1:
+                        continue
+                    for _ in range(rollouts):
+                        state = determinize(engine, player, rng)
+                        state.play(player, *move_of_kind(state, player, kind, legal))
+                        cell[kind][0] += _finish(state, policy) == player
+                        cell[kind][1] += 1
+            move = policy(engine, player)
+            if move is not None:
+                engine.play(player, *move)
+            elif engine.draw_turn(player) is None:
+                break
+    return stats
+
+def train(games=2000, rollouts=8, iterations=2, num_players=3, workers=None, seed=0,
+          chunk_size=50, entries=None, min_tries=8, progress=print):
+    """Returns the entries of a table improved `iterations` times over
+    entries (greedy_move everywhere by default)"""
+    entries = bytearray(entries or NUM_CELLS)
+    with multiprocessing.Pool(workers) as pool:
+        for iteration in range(iterations):
+            tasks = [(f"{seed}:{iteration}", first, min(chunk_size, games - first), num_players,
+                      rollouts, bytes(entries)) for first in range(0, games, chunk_size)]
+            totals = {}
+            for done, stats in enumerate(pool.imap_unordered(train_games, tasks), 1):
+                for index, cell in stats.items():
+                    total = totals.setdefault(index, [[0, 0] for _ in KINDS])
+                    for kind, (wins, tries) in enumerate(cell):
+                        total[kind][0] += wins
+                        total[kind][1] += tries
+                progress(f"iteration {iteration + 1}: {done}/{len(tasks)} chunks, {len(totals)} situations")
+            for index, cell in totals.items():
+                rates = [(wins / tries, kind) for kind, (wins, tries) in enumerate(cell) if tries >= min_tries]
+                if rates:
+                    entries[index] = max(rates)[1] + 1
+    return entries
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the lookup-table AI by self-play")
+    parser.add_argument("--games", type=int, default=2000, help="self-play games per iteration")
+    parser.add_argument("--rollouts", type=int, default=8, help="rollouts per kind of card tried")
+    parser.add_argument("--iterations", type=int, default=2)
+    parser.add_argument("--players", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=POLICY_PATH)
+    args = parser.parse_args()
+    entries = train(args.games, args.rollouts, args.iterations, args.players, args.workers, args.seed,
+                    progress=lambda text: print(f"\r{text}", end="", flush=True))
+    print()
+    save_table(entries, args.output)
+    print(f"{sum(1 for entry in entries if entry)} of {NUM_CELLS} situations written to {args.output}")
+
+if __name__ == "__main__":
+    main()
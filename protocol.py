@@ -0,0 +1,119 @@
+"""Messages between table_server.py and its clients.
+
+Every message is a frame: a 2 byte big-endian length, then the message,
+whose first byte is its type. Game events are sent as game log records
+(see game_log.py), so their types are the log opcodes 1-11; a card the
+receiving player may not see is sent as HIDDEN. The other messages are:
+
+    client -> server
+    JOIN   players, humans   Sit at a table of that many players, of which
+                             that many are humans; AIs take the other seats
+    PLAY   card id, color    color is a COLORS index, or NO_COLOR
+    DRAW
+    UNO
+
+    server -> client
+    SEATED table id (4 bytes), seat, players
+    TURN   player, cards left in the deck    After every move
+    HANDS  per player: count, card ids       Every hand, once the game is over
+    ERROR  code
+"""
+import struct
+from card import COLORS
+from game_log import BYTE_CARDS, encode_event, parse_event
+
+JOIN, PLAY, DRAW, UNO = 0x40, 0x41, 0x42, 0x43
+SEATED, TURN, HANDS, ERROR = 0x50, 0x51, 0x52, 0x5F
+NOT_YOUR_TURN, INVALID_MOVE, BAD_MESSAGE, GAME_OVER = range(1, 5)
+
+HIDDEN = 255
+NO_COLOR = 255
+LENGTH = struct.Struct("!H")
+SEATED_STRUCT = struct.Struct("!BIBB")
+
+def frame(message):
+    return LENGTH.pack(len(message)) + message
+
+# Client messages
+def join(players=3, humans=1):
+    return frame(bytes((JOIN, players, humans)))
+
+def play(card, color=None):
+    return frame(bytes((PLAY, card.id, NO_COLOR if color is None else COLORS.index(color))))
+
+DRAW_MESSAGE = frame(bytes((DRAW,)))
+UNO_MESSAGE = frame(bytes((UNO,)))
+
+# Server messages
+def seated(table_id, seat, players):
+    return frame(SEATED_STRUCT.pack(SEATED, table_id, seat, players))
+
+def turn(player, deck_size):
+    return frame(bytes((TURN, player, deck_size)))
+
+def hands(all_hands):
+    out = bytearray((HANDS, len(all_hands)))
+    for hand in all_hands:
+        out.append(len(hand))
+        out.extend(card.id for card in hand)
+    return frame(bytes(out))
+
+def error(code):
+    return frame(bytes((ERROR, code)))
+
+class _HiddenCard:
+    id = HIDDEN
+
+HIDDEN_CARD = _HiddenCard()
+
+def event_for(seat, event, data):
+    """Framed event as seen from seat: other players' dealt and drawn
+    cards are hidden"""
+    if event == "deal":
+        data = dict(data, hands=[hand if p == seat else [HIDDEN_CARD] * len(hand)
+                                 for p, hand in enumerate(data["hands"])])
+    elif event in ("draw", "penalty") and data["player"] != seat:
+        data = dict(data, cards=[HIDDEN_CARD] * len(data["cards"]))
+    return frame(encode_event(event, data))
+
+def decode(message):
+    """Tuple of a server message: game events as parsed by game_log.parse_event,
+    the others as (name, fields...)"""
+    kind = message[0]
+    if kind == SEATED:
+        _, table_id, seat, players = SEATED_STRUCT.unpack(message)
+        return ("seated", table_id, seat, players)
+    if kind == TURN:
+        return ("turn", message[1], message[2])
+    if kind == HANDS:
+        result = []
+        i = 2
+        for _ in range(message[1]):
+            n = message[i]
+            result.append([BYTE_CARDS[c] for c in message[i + 1:i + 1 + n]])
+            i += 1 + n
+        return ("hands", result)
+    if kind == ERROR:
+        return ("error", message[1])
+    return parse_event(message, 0)[0]
+
+def decode_request(message):
+    """Tuple of a client message, or None if it is not one"""
+    if not message:
+        return None
+    kind = message[0]
+    if kind == JOIN and len(message) == 3:
+        return ("join", message[1], message[2])
+    if kind == PLAY and len(message) == 3:
+        color = None if message[2] == NO_COLOR else COLORS[message[2] % len(COLORS)]
+        return ("play", BYTE_CARDS[message[1]], color)
+    if kind == DRAW:
+        return ("draw",)
+    if kind == UNO:
+        return ("uno",)
+    return None
+
+async def read_message(reader):
+    """Next message from an asyncio stream (IncompleteReadError at the end)"""
+    header = await reader.readexactly(2)
+    return await reader.readexactly(LENGTH.unpack(header)[0])
@@ -0,0 +1,133 @@
+import collections
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from tracing import tracer
+
+class TurnScheduler:
+    """Runs AI decisions off the Tk thread and plays them back on it.
+
+    request() hands the strategy to an executor (a thread by default, or
+    any concurrent.futures executor such as a process pool). Worker threads
+    never touch Tk: they only put finished futures on a queue, which the
+    Tk loop drains every poll_interval milliseconds. A strategy that raises
+    is reported and counts as choosing to draw, so the game goes on.
+    """
+    def __init__(self, widget, executor=None, poll_interval=16, history=1000):
+        self.widget = widget
+        self.executor = executor or ThreadPoolExecutor(max_workers=1)
+        self.poll_interval = poll_interval
+        self.results = queue.SimpleQueue()
+        self.waiting = []      # (ready time, callback, result) not yet due
+        self.generation = 0    # Bumped by cancel() so stale results are dropped
+        self.pending = 0
+        self.polling = False
+        self.think_times = collections.deque(maxlen=history)  # Seconds from request to decision
+
+    def request(self, strategy, engine, player, on_done, min_delay=0):
+        """Compute strategy(engine, player) in the background and call
+        on_done(move) on the Tk thread, no sooner than min_delay ms from now.
+        If the strategy raises, on_done(None) is called instead.
+
+        engine should be a copy: the UI keeps using the real one meanwhile.
+        """
+        generation = self.generation
+        submitted_ns = time.perf_counter_ns()
+        submitted = submitted_ns / 1e9
+        ready_at = submitted + min_delay / 1000
+
+        def done(future):  # Runs on the worker side: no Tk calls here
+            finished_ns = time.perf_counter_ns()
+            self.think_times.append((finished_ns - submitted_ns) / 1e9)
+            tracer.add("ai.decision", submitted_ns, finished_ns)
+            self.results.put((generation, ready_at, on_done, future))
+
+        # strategy itself is submitted so process pools can pickle it
+        future = self.executor.submit(strategy, engine, player)
+        self.pending += 1
+        future.add_done_callback(done)
+        if not self.polling:
+            self.polling = True
+            self.widget.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        while True:
+            try:
+                generation, ready_at, on_done, future = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if generation != self.generation:
+                self.pending -= 1
+                continue
+            self.waiting.append((ready_at, on_done, future))
+
+        now = time.perf_counter()
+        due = [item for item in self.waiting if item[0] <= now]
+        self.waiting = [item for item in self.waiting if item[0] > now]
+        for _, on_done, future in due:
+            self.pending -= 1
+            try:
+                move = future.result()
+            except Exception as e:
+                print(f"AI strategy failed, drawing instead: {e!r}")
+                move = None
+            on_done(move)
+
+        if self.pending > 0:
+            self.widget.after(self.poll_interval, self._poll)
+        else:
+            self.polling = False
+
+    def cancel(self):
+        """Drop the results of every request made so far"""
+        self.generation += 1
+        self.pending -= len(self.waiting)
+        self.waiting = []
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+class FrameMonitor:
+    """Measures how late the Tk loop runs a callback scheduled every interval ms.
+
+    The lag is how long a click or key press would wait before Tk handles
+    it, so it doubles as the input latency of the UI.
+    """
+    def __init__(self, widget, interval=16, history=1000):
+        self.widget = widget
+        self.interval = interval
+        self.history = history
+        self.lags = []  # Milliseconds
+        self.running = False
+        self.expected = None
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self.expected = time.perf_counter() + self.interval / 1000
+            self.widget.after(self.interval, self._tick)
+
+    def stop(self):
+        self.running = False
+
+    def _tick(self):
+        if not self.running:
+            return
+        now = time.perf_counter()
+        self.lags.append(max(0.0, (now - self.expected) * 1000))
+        del self.lags[:-self.history]
+        self.expected = now + self.interval / 1000
+        self.widget.after(self.interval, self._tick)
+
+    def stats(self):
+        """Lag percentiles in milliseconds"""
+        if not self.lags:
+            return {"frames": 0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        lags = sorted(self.lags)
+        return {
+            "frames": len(lags),
+            "p50_ms": lags[len(lags) // 2],
+            "p99_ms": lags[min(len(lags) - 1, len(lags) * 99 // 100)],
+            "max_ms": lags[-1],
+        }
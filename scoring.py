@@ -0,0 +1,41 @@
+class Scoreboard:
+    """Scores of a match played over several games, up to a target score.
+
+    The winner of each game scores the points left in the other hands
+    (numbers their value, Skip/Reverse/+2 20, wild cards 50), and the first
+    player to reach target wins the match.
+    """
+    def __init__(self, names, target=500):
+        self.names = list(names)
+        self.target = target
+        self.reset()
+
+    def reset(self):
+        """Start a new match"""
+        self.scores = [0] * len(self.names)
+        self.history = []  # (winner, points) of each game; winner None for a draw
+
+    def record(self, engine):
+        """Score a finished game; returns the points its winner got"""
+        winner = engine.winner
+        points = 0
+        if winner is not None:
+            points = sum(hand.points for hand in engine.hands)  # The winner's hand is empty
+            self.scores[winner] += points
+        self.history.append((winner, points))
+        return points
+
+    @property
+    def games(self):
+        return len(self.history)
+
+    @property
+    def match_winner(self):
+        """Player who reached the target score, or None"""
+        best = max(range(len(self.scores)), key=self.scores.__getitem__)
+        return best if self.scores[best] >= self.target else None
+
+    def lines(self):
+        """One "name: score" line per player, best first"""
+        order = sorted(range(len(self.names)), key=lambda p: -self.scores[p])
+        return [f"{self.names[p]}: {self.scores[p]}" for p in order]
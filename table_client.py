@@ -0,0 +1,237 @@
+"""Clients of table_server.py."""
+import asyncio
+import queue
+import random
+import socket
+import threading
+import protocol
+from card import COLORS, FACE_COLOR, BLACK, PLAYABLE, top_state
+from hand import Hand
+
+class TableView:
+    """One player's view of a table, kept up to date from server messages.
+
+    It has the UnoEngine attributes that the AI strategies and GameManager
+    read, with seats numbered from the player's own: seat 0 is always the
+    player, so greedy_move(view, 0) picks the player's move. Cards the
+    player cannot see are None.
+    """
+    def __init__(self, num_players=0):
+        self.table_id = None
+        self.seat = 0
+        self.num_players = num_players
+        self.hands = [Hand()] + [[] for _ in range(num_players - 1)]
+        self.discard_pile = []
+        self.active_color = None
+        self.current_player = None
+        self.direction = 1
+        self.winner = None
+        self.stalled = False
+        self.over = False
+        self.deck_size = 0
+        self.rng = random.Random()
+
+    def _local(self, player):
+        return (player - self.seat) % self.num_players
+
+    def apply(self, message):
+        """Update the view; returns the (event, data) it amounts to"""
+        kind = message[0]
+        if kind == "seated":
+            _, self.table_id, self.seat, self.num_players = message
+            self.hands = [Hand()] + [[] for _ in range(self.num_players - 1)]
+            return "seated", {"table": self.table_id, "seat": self.seat}
+        if kind == "deal":
+            _, hands, top = message
+            for player, cards in enumerate(hands):
+                local = self._local(player)
+                self.hands[local] = Hand(cards) if local == 0 else list(cards)
+            self.discard_pile = [top]
+            self.active_color = FACE_COLOR[top.face]
+            return "deal", {"top": top}
+        if kind == "play":
+            player, card = self._local(message[1]), message[2]
+            if player == 0:
+                self.hands[0].remove(card)
+            else:
+                self.hands[player].pop()
+            self.discard_pile.append(card)
+            if FACE_COLOR[card.face] != BLACK:
+                self.active_color = FACE_COLOR[card.face]
+            return "play", {"player": player, "card": card, "color": card.color}
+        if kind == "color":
+            self.active_color = COLORS.index(message[2])
+            return "color", {"player": self._local(message[1]), "color": message[2]}
+        if kind in ("draw", "penalty"):
+            player, cards = self._local(message[1]), message[2]
+            self.hands[player].extend(cards)
+            data = {"player": player, "cards": cards}
+            if kind == "draw":
+                data["forced"] = message[3]
+            return kind, data
+        if kind == "direction":
+            self.direction = message[1]
+            return "direction", {"direction": self.direction}
+        if kind in ("skip", "uno"):
+            return kind, {"player": self._local(message[1])}
+        if kind == "win":
+            self.winner = self._local(message[1])
+            return "win", {"player": self.winner}
+        if kind == "stalled":
+            self.stalled = True
+            return "stalled", {"player": self._local(message[1])}
+        if kind == "reshuffle":
+            return "reshuffle", {"size": message[1]}
+        if kind == "turn":
+            self.current_player = self._local(message[1])
+            self.deck_size = message[2]
+            return "turn", {"player": self.current_player, "deck": self.deck_size}
+        if kind == "hands":
+            # The game is over and every hand is shown, so it can be scored
+            for player, cards in enumerate(message[1]):
+                self.hands[self._local(player)] = Hand(cards)
+            self.over = True
+            return "hands", {"winner": self.winner}
+        if kind == "error":
+            return "error", {"code": message[1]}
+        return None
+
+    @property
+    def top_card(self):
+        return self.discard_pile[-1] if self.discard_pile else None
+
+    def playable_mask(self):
+        top = self.top_card
+        if top is None:
+            return 0
+        return PLAYABLE[top_state(top.face, self.active_color)]
+
+    def is_valid_play(self, card):
+        return self.playable_mask() >> card.face & 1 == 1
+
+    def valid_cards(self, player):
+        mask = self.playable_mask()
+        return [card for card in self.hands[player] if mask >> card.face & 1]
+
+class TableClient:
+    """asyncio connection to a table server, for bots"""
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def open(cls, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    def send(self, data):
+        self.writer.write(data)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return protocol.decode(await protocol.read_message(self.reader))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            raise StopAsyncIteration
+
+    def close(self):
+        self.writer.close()
+
+class RemoteEngine(TableView):
+    """The engine GameManager drives when the game runs on a table server.
+
+    Moves are sent to the server instead of being played; the server's
+    messages are read on a background thread and handed to the Tk thread
+    through a queue polled every poll_interval ms, where they update the
+    view and reach the listeners like UnoEngine events. Besides those, it
+    emits "turn" after every move, "hands" once the game is over and
+    "closed" if the connection is lost.
+    """
+    def __init__(self, host, port, widget, players=3, humans=1, poll_interval=16):
+        super().__init__(players)
+        self.widget = widget
+        self.poll_interval = poll_interval
+        self.listeners = []
+        self.inbox = queue.SimpleQueue()
+        self.polling = False
+        self.sock = socket.create_connection((host, port))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.sendall(protocol.join(players, humans))
+        threading.Thread(target=self._receive, daemon=True).start()
+
+    def _receive(self):  # Background thread: no Tk calls here
+        stream = self.sock.makefile("rb")
+        try:
+            while True:
+                header = stream.read(2)
+                if len(header) < 2:
+                    break
+                message = stream.read(protocol.LENGTH.unpack(header)[0])
+                self.inbox.put(protocol.decode(message))
+        except (OSError, ValueError):
+            pass
+        self.inbox.put(None)
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def emit(self, event, data):
+        for listener in self.listeners:
+            listener(event, data)
+
+    def deal(self, hand_size=7):
+        """The server deals; this starts handing its messages to the listeners"""
+        if not self.polling:
+            self.polling = True
+            self.widget.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        if not self.polling:
+            return  # Closed
+        while True:
+            try:
+                message = self.inbox.get_nowait()
+            except queue.Empty:
+                break
+            if message is None:
+                self.polling = False
+                self.emit("closed", {})
+                return
+            result = self.apply(message)
+            if result is not None:
+                self.emit(*result)
+        self.widget.after(self.poll_interval, self._poll)
+
+    def _send(self, data):
+        try:
+            self.sock.sendall(data)
+        except OSError:
+            pass  # The receiving thread reports the lost connection
+
+    # Moves go to the server, which answers with the resulting events. No
+    # one is to move until its next TURN, so a move is never sent twice.
+    def play(self, player, card, chosen_color=None):
+        self._send(protocol.play(card, chosen_color))
+        self.current_player = None
+        return True
+
+    def draw_turn(self, player):
+        self._send(protocol.DRAW_MESSAGE)
+        self.current_player = None
+        return []
+
+    def call_uno(self, player):
+        self._send(protocol.UNO_MESSAGE)
+        return True
+
+    def check_uno(self, player):
+        return True  # The server gives the penalty
+
+    def close(self):
+        self.polling = False
+        try:
+            self.sock.close()
+        except OSError:
+            pass
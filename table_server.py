@@ -0,0 +1,267 @@
+"""Hosts UNO tables for network players, many games per process.
+
+    python table_server.py --port 7777 --ai greedy --ai-delay 1
+
+Clients speak the protocol of protocol.py. A JOIN seats the client at a
+table waiting for humans, or opens a new one; the game starts once every
+human seat is taken and AI players fill the rest. A player who leaves is
+replaced by an AI.
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import protocol
+from ai import STRATEGIES, greedy_move
+from engine import UnoEngine
+from game_log import encode_event
+
+class Connection:
+    """A client; messages are gathered and written once per batch"""
+    __slots__ = ("writer", "out", "table", "seat")
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.out = bytearray()
+        self.table = None
+        self.seat = None
+
+    def send(self, data):
+        self.out += data
+
+    def flush(self):
+        if self.out:
+            if not self.writer.is_closing():
+                self.writer.write(bytes(self.out))
+            self.out.clear()
+
+class Table:
+    """One game: the human seats come first, then the AI seats"""
+    def __init__(self, server, table_id, players, humans, seed):
+        self.server = server
+        self.id = table_id
+        self.engine = UnoEngine(num_players=players, uno_seats=range(humans), seed=seed)
+        self.engine.subscribe(self.broadcast)
+        self.connections = [None] * players  # None for AI seats
+        self.open_seats = list(range(humans))
+        self.started = False
+        self.stalled = False
+        self.pending = None  # Timer of the next delayed AI move
+
+    @property
+    def over(self):
+        return self.engine.winner is not None or self.stalled
+
+    def sit(self, conn):
+        seat = self.open_seats.pop(0)
+        self.connections[seat] = conn
+        conn.table, conn.seat = self, seat
+        conn.send(protocol.seated(self.id, seat, len(self.connections)))
+
+    def leave(self, conn):
+        self.connections[conn.seat] = None
+        conn.table = None
+        if not self.started:
+            self.open_seats.insert(0, conn.seat)
+        elif not any(self.connections):
+            self.server.close_table(self, finished=False)
+        else:
+            # The AI taking the seat over never presses UNO
+            self.engine.uno_seats.discard(conn.seat)
+            self.run_ai()  # In case it was the leaver's turn
+            self.flush()
+
+    def broadcast(self, event, data):
+        plain = None
+        for seat, conn in enumerate(self.connections):
+            if conn is None:
+                continue
+            if event in ("deal", "draw", "penalty"):
+                conn.send(protocol.event_for(seat, event, data))  # Hides the others' cards
+            else:
+                if plain is None:
+                    plain = protocol.frame(encode_event(event, data))
+                conn.send(plain)
+
+    def send_all(self, data):
+        for conn in self.connections:
+            if conn is not None:
+                conn.send(data)
+
+    def flush(self):
+        for conn in self.connections:
+            if conn is not None:
+                conn.flush()
+
+    def start(self):
+        self.started = True
+        self.engine.deal()
+        self.after_move()
+
+    def handle(self, conn, request):
+        """Apply a move of conn's player"""
+        kind, seat, engine = request[0], conn.seat, self.engine
+        if self.over or not self.started:
+            conn.send(protocol.error(protocol.GAME_OVER))
+        elif kind == "uno":
+            engine.call_uno(seat)  # Allowed at any time
+        elif engine.current_player != seat:
+            conn.send(protocol.error(protocol.NOT_YOUR_TURN))
+        elif kind == "play":
+            card, color = request[1], request[2]
+            if card is None or card not in engine.hands[seat] or (card.color == "Black") != (color is not None):
+                conn.send(protocol.error(protocol.INVALID_MOVE))
+            elif not engine.check_uno(seat):
+                self.after_move()  # 2 card penalty, and the player goes on
+            elif not engine.play(seat, card, color):
+                conn.send(protocol.error(protocol.INVALID_MOVE))
+            else:
+                self.after_move()
+        elif kind == "draw":
+            if engine.draw_turn(seat) is None:
+                self.stalled = True
+            self.after_move()
+        self.flush()
+
+    def after_move(self):
+        """Report the move, then end the game or let the AIs play"""
+        self.report()
+        if not self.over:
+            self.run_ai()
+
+    def report(self):
+        self.server.moves += 1
+        self.send_all(protocol.turn(self.engine.current_player, len(self.engine.deck)))
+        if self.over:
+            self.send_all(protocol.hands(self.engine.hands))
+            self.flush()
+            self.server.close_table(self, finished=True)
+
+    def run_ai(self):
+        """Play the AI seats until a human is to move"""
+        engine = self.engine
+        while not self.over and self.connections[engine.current_player] is None:
+            if self.server.ai_delay:
+                if self.pending is None:
+                    loop = asyncio.get_running_loop()
+                    self.pending = loop.call_later(self.server.ai_delay, self._delayed_ai_move)
+                return
+            self.ai_move()
+
+    def _delayed_ai_move(self):
+        self.pending = None
+        if not self.over and self.connections[self.engine.current_player] is None:
+            self.ai_move()
+            self.run_ai()
+        self.flush()
+
+    def ai_move(self):
+        engine = self.engine
+        player = engine.current_player
+        move = self.server.strategy(engine, player)
+        if move is not None:
+            engine.play(player, *move)
+        elif engine.draw_turn(player) is None:
+            self.stalled = True
+        self.report()
+
+    def close(self):
+        if self.pending is not None:
+            self.pending.cancel()
+            self.pending = None
+
+class TableServer:
+    """Runs any number of tables on one asyncio loop.
+
+    AI seats are played with strategy, waiting ai_delay seconds before
+    each AI move so human players can follow them (0 for bots).
+    """
+    def __init__(self, strategy=greedy_move, ai_delay=0.0, seed=None):
+        self.strategy = strategy
+        self.ai_delay = ai_delay
+        self.rng = random.Random(seed)
+        self.ids = itertools.count(1)
+        self.tables = {}   # id -> table being played
+        self.waiting = {}  # (players, humans) -> table waiting for humans
+        self.games = 0
+        self.moves = 0
+
+    async def start(self, host="127.0.0.1", port=7777):
+        return await asyncio.start_server(self.handle_client, host, port)
+
+    async def handle_client(self, reader, writer):
+        conn = Connection(writer)
+        try:
+            while True:
+                request = protocol.decode_request(await protocol.read_message(reader))
+                if request is None:
+                    conn.send(protocol.error(protocol.BAD_MESSAGE))
+                elif request[0] == "join":
+                    self.join(conn, request[1], request[2])
+                elif conn.table is None:
+                    conn.send(protocol.error(protocol.GAME_OVER))
+                else:
+                    conn.table.handle(conn, request)
+                conn.flush()
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if conn.table is not None:
+                conn.table.leave(conn)
+            writer.close()
+
+    def join(self, conn, players, humans):
+        if not 2 <= players <= 10 or not 1 <= humans <= players:
+            conn.send(protocol.error(protocol.BAD_MESSAGE))
+            return
+        if conn.table is not None:
+            conn.table.leave(conn)
+        key = (players, humans)
+        table = self.waiting.get(key)
+        if table is None:
+            table = self.waiting[key] = Table(self, next(self.ids), players, humans,
+                                              self.rng.randrange(2 ** 63))
+        table.sit(conn)
+        if not table.open_seats:
+            del self.waiting[key]
+            self.tables[table.id] = table
+            table.start()
+        table.flush()
+
+    def close_table(self, table, finished):
+        table.close()
+        if self.tables.pop(table.id, None) is not None and finished:
+            self.games += 1
+        for conn in table.connections:
+            if conn is not None:
+                conn.table = None
+
+    def stats(self):
+        return {"tables": len(self.tables), "waiting": len(self.waiting),
+                "games": self.games, "moves": self.moves}
+
+async def serve(host, port, server):
+    listener = await server.start(host, port)
+    print(f"Serving UNO tables on {host}:{port}")
+    async with listener:
+        await listener.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="UNO table server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--ai", default="greedy", help=f"AI for empty seats: {', '.join(STRATEGIES)}")
+    parser.add_argument("--ai-delay", type=float, default=1.0, help="seconds before each AI move")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    if args.ai not in STRATEGIES:
+        parser.error(f"unknown AI {args.ai!r}")
+    server = TableServer(STRATEGIES[args.ai], args.ai_delay, args.seed)
+    try:
+        asyncio.run(serve(args.host, args.port, server))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai import greedy_move
+from engine import UnoEngine
+from game_log import GameLogger, Replayer, replay_many
+
+def test_a_killed_game_leaves_a_log_that_replays(tmp_path):
+    path = str(tmp_path / "game.unolog")
+    engine = UnoEngine(num_players=3, rng=random.Random(5), uno_seats=())
+    logger = GameLogger(path, engine)
+    engine.deal()
+    for turn in range(1, 21):
+        if engine.winner is not None:
+            break
+        player = engine.current_player
+        move = greedy_move(engine, player)
+        if move is not None:
+            engine.play(player, *move)
+        else:
+            engine.draw_turn(player)
+        # Never closed, as if the process were killed: what is on disk
+        # must already replay, at most the turn in progress missing
+        with open(path, "rb") as f:
+            replayer = Replayer(f.read())
+        assert turn - 1 <= replayer.turns <= turn
+        replayer.run()
+    logger.close()
+
+def test_a_log_cut_at_any_byte_replays_its_whole_records(tmp_path):
+    path = str(tmp_path / "game.unolog")
+    engine = UnoEngine(num_players=3, rng=random.Random(7), uno_seats=())
+    logger = GameLogger(path, engine)
+    engine.deal()
+    while engine.winner is None:
+        player = engine.current_player
+        move = greedy_move(engine, player)
+        if move is not None:
+            engine.play(player, *move)
+        elif engine.draw_turn(player) is None:
+            break
+    logger.close()
+    with open(path, "rb") as f:
+        data = f.read()
+
+    turns = Replayer(data).turns
+    previous = 0
+    for size in range(len(data) + 1):
+        replayer = Replayer(data[:size])
+        if replayer.dealt:
+            replayer.run()
+        assert previous <= replayer.turns <= turns
+        previous = replayer.turns
+    assert Replayer(data).run().winner == engine.winner
+
+    cut = str(tmp_path / "cut.unolog")
+    with open(cut, "wb") as f:
+        f.write(data[:3])  # Killed while writing the header
+    assert replay_many([path, cut]) == [engine.winner, None]
@@ -0,0 +1,68 @@
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hand_view
+from card import CARDS, Card
+from hand_view import HandView
+
+class Widget:
+    """Stands in for CTkFrame and CTkButton"""
+    def __init__(self, master=None, **kwargs):
+        self.options = dict(kwargs)
+        self.x = None
+        self.moves = 0
+
+    def pack(self, **kwargs):
+        pass
+
+    def configure(self, **kwargs):
+        self.options.update(kwargs)
+
+    def place(self, x=0, y=0):
+        self.x = x
+        self.moves += 1
+
+    def place_forget(self):
+        self.x = None
+
+    def winfo_reqwidth(self):
+        return 112
+
+    def winfo_reqheight(self):
+        return 162
+
+    def update_idletasks(self):
+        pass
+
+    def destroy(self):
+        pass
+
+def test_playing_a_middle_card_only_moves_the_buttons_after_it(monkeypatch):
+    monkeypatch.setattr(hand_view, "ctk", types.SimpleNamespace(
+        CTkFrame=Widget, CTkButton=Widget,
+        ScalingTracker=types.SimpleNamespace(get_widget_scaling=lambda widget: 1.0)))
+    monkeypatch.setattr(Card, "get_image", lambda card, size=None: card)
+    view = HandView(Widget(), lambda card: None)  # Not scrollable: every card is shown
+    hand = list(CARDS[:9])
+    view.render(hand)
+    buttons = {card: button for card, (button, _) in view.shown.items()}
+    reassigned = view.stats()["reassigned"]
+
+    del hand[4]
+    view.render(hand)
+    assert view.stats()["reassigned"] == reassigned
+    assert view.stats()["created"] == len(CARDS[:9])
+    for index, card in enumerate(hand):
+        button = view.shown[card][0]
+        assert button is buttons[card] and button.options["image"] is card
+        assert button.x == index * view.slot + view.padx
+        assert button.moves == (1 if index < 4 else 2)
+    assert buttons[CARDS[4]].x is None  # Back in the pool, hidden
+
+    hand.insert(2, CARDS[4])  # Drawn back: its idle button is reused
+    view.render(hand)
+    assert view.stats()["reassigned"] == reassigned + 1
+    assert view.stats()["created"] == len(CARDS[:9])
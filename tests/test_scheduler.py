@@ -0,0 +1,40 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import TurnScheduler
+
+class Widget:
+    """Stands in for the Tk widget: after() callbacks run when run() is called"""
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, ms, callback):
+        self.callbacks.append(callback)
+
+    def run(self, executor):
+        while self.callbacks:
+            executor.submit(lambda: None).result()  # Let the worker finish
+            self.callbacks.pop(0)()
+
+def failing(engine, player):
+    raise ValueError("no move")
+
+def test_a_failing_strategy_draws_instead_of_stalling(capsys):
+    widget = Widget()
+    executor = ThreadPoolExecutor(max_workers=1)
+    scheduler = TurnScheduler(widget, executor=executor, history=3)
+    moves = []
+    scheduler.request(failing, None, 1, moves.append)
+    widget.run(executor)
+    assert moves == [None]
+    assert "no move" in capsys.readouterr().out
+
+    for _ in range(5):
+        scheduler.request(lambda engine, player: ("card", None), None, 1, moves.append)
+        widget.run(executor)
+    assert moves == [None] + [("card", None)] * 5
+    assert len(scheduler.think_times) == 3
+    scheduler.shutdown()
@@ -0,0 +1,35 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from table_server import Connection, TableServer
+
+class Writer:
+    """Stands in for an asyncio StreamWriter"""
+    def is_closing(self):
+        return False
+
+    def write(self, data):
+        pass
+
+def test_ai_taking_over_a_left_seat_is_not_penalized():
+    server = TableServer(ai_delay=0, seed=1)
+    wins = 0
+    for _ in range(60):
+        conn = Connection(Writer())
+        server.join(conn, 3, 2)  # Waits for a second human
+        other = Connection(Writer())
+        server.join(other, 3, 2)  # Starts; the AI seat plays up to a human's turn
+        table = conn.table
+        assert table.started and not table.over
+        penalties = []
+        table.engine.subscribe(lambda event, data: event == "penalty" and penalties.append(data["player"]))
+        table.leave(conn)  # Seat 0 is now played by the server's AI
+        while not table.over:
+            # The remaining human only draws, so the game plays on
+            assert table.engine.current_player == other.seat
+            table.handle(other, ("draw",))
+        assert conn.seat not in penalties
+        wins += table.engine.winner == conn.seat
+    assert wins > 0
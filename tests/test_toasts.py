@@ -0,0 +1,107 @@
+import gc
+import os
+import random
+import sys
+import tracemalloc
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import toasts
+from ai import greedy_move
+from engine import UnoEngine
+from game_manager import GameManager
+from toasts import ToastPool
+
+class Widget:
+    """Stands in for CTkFrame and CTkLabel"""
+    live = 0
+
+    def __init__(self, master=None, **kwargs):
+        Widget.live += 1
+        self.placed = False
+
+    def pack(self, **kwargs):
+        pass
+
+    def configure(self, **kwargs):
+        pass
+
+    def place(self, **kwargs):
+        self.placed = True
+
+    def place_forget(self):
+        self.placed = False
+
+    def lift(self):
+        pass
+
+class Parent:
+    """Runs after() callbacks on a clock moved by advance()"""
+    def __init__(self):
+        self.now = 0
+        self.timers = {}  # id -> (due time, callback)
+        self.ids = 0
+
+    def after(self, ms, callback):
+        self.ids += 1
+        self.timers[self.ids] = (self.now + ms, callback)
+        return self.ids
+
+    def after_cancel(self, timer):
+        del self.timers[timer]
+
+    def advance(self, ms):
+        end = self.now + ms
+        while True:
+            due = [(when, timer) for timer, (when, _) in self.timers.items() if when <= end]
+            if not due:
+                break
+            when, timer = min(due)
+            self.now = when
+            self.timers.pop(timer)[1]()
+        self.now = end
+
+def test_500_ai_turns_keep_the_toast_widgets_and_memory_bounded(monkeypatch):
+    monkeypatch.setattr(toasts, "ctk", types.SimpleNamespace(CTkFrame=Widget, CTkLabel=Widget))
+    Widget.live = 0
+    parent = Parent()
+    pool = ToastPool(parent)
+    # GameManager's announcements, without the rest of its UI
+    host = types.SimpleNamespace(show_message=pool.show)
+    rng = random.Random(0)
+    engine = None
+    tracemalloc.start()
+    for turn in range(500):
+        if turn == 100:  # Every slot has its widgets by now
+            gc.collect()  # Finished games are freed as cycles
+            warm = tracemalloc.get_traced_memory()[0]
+        if engine is None or engine.winner is not None:
+            engine = UnoEngine(num_players=4, rng=rng, uno_seats=())
+            engine.subscribe(lambda event, data: GameManager.on_engine_event(host, event, data))
+            engine.deal()
+        player = engine.current_player
+        move = greedy_move(engine, player)
+        if move is not None:
+            engine.play(player, *move)
+        elif engine.draw_turn(player) is None:
+            engine = None
+        parent.advance(200)  # AI turns come faster than the messages expire
+
+        stats = pool.stats()
+        assert Widget.live == stats["widgets"] <= 2 * len(pool.slots)
+        assert stats["visible"] <= len(pool.slots)
+        assert stats["queued"] <= pool.max_queued
+        assert sum(slot.frame is not None and slot.frame.placed for slot in pool.slots) == stats["visible"]
+
+    gc.collect()
+    grown = tracemalloc.get_traced_memory()[0] - warm
+    tracemalloc.stop()
+    # 400 more turns of announcements, with one game in play either way
+    assert grown < 16 * 1024
+
+    stats = pool.stats()
+    assert stats["widgets"] == 2 * len(pool.slots)  # Every slot was used
+    assert stats["merged"] and stats["dropped"]
+    parent.advance(10000)
+    assert pool.stats()["visible"] == 0 and not pool.queue
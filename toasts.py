@@ -0,0 +1,102 @@
+import collections
+import customtkinter as ctk
+
+class _Slot:
+    __slots__ = ("index", "frame", "label", "timer", "text", "count")
+
+    def __init__(self, index):
+        self.index = index
+        self.frame = None
+        self.label = None
+        self.timer = None  # Tk after id while the slot shows a message
+        self.text = None
+        self.count = 0
+
+class ToastPool:
+    """Short messages over the game, shown by a fixed set of reused widgets.
+
+    At most `slots` messages are visible at once, stacked down from the
+    middle of parent. Each slot is a CTkFrame with a CTkLabel created the
+    first time it is needed; after that it is only relabelled, placed and
+    hidden, so the number of widgets never grows. Messages arriving while
+    every slot is busy wait in a queue of at most max_queued, dropping the
+    oldest. A message equal to one on screen or to the last one waiting is
+    merged into it ("AI 1 draws a card (x3)") instead of adding another.
+    """
+    def __init__(self, parent, slots=3, max_queued=6, rely=0.5, spacing=0.1):
+        self.parent = parent
+        self.rely = rely
+        self.spacing = spacing
+        self.slots = [_Slot(i) for i in range(slots)]
+        self.queue = collections.deque()  # [text, duration, count] waiting for a slot
+        self.max_queued = max_queued
+        self.created = 0
+        self.shown = 0
+        self.merged = 0
+        self.dropped = 0
+
+    def show(self, text, duration):
+        """Show text for duration ms, as soon as a slot is free"""
+        for slot in self.slots:
+            if slot.timer is not None and slot.text == text:
+                slot.count += 1
+                self.merged += 1
+                self._display(slot, duration)
+                return
+        if self.queue and self.queue[-1][0] == text:
+            self.queue[-1][1] = max(self.queue[-1][1], duration)
+            self.queue[-1][2] += 1
+            self.merged += 1
+            return
+        for slot in self.slots:
+            if slot.timer is None:
+                slot.text, slot.count = text, 1
+                self._display(slot, duration)
+                return
+        if len(self.queue) >= self.max_queued:
+            self.queue.popleft()
+            self.dropped += 1
+        self.queue.append([text, duration, 1])
+
+    def _display(self, slot, duration):
+        if slot.frame is None:
+            slot.frame = ctk.CTkFrame(self.parent, fg_color="#553D24")
+            slot.label = ctk.CTkLabel(slot.frame, font=("Arial", 20))
+            slot.label.pack(pady=20, padx=40)
+            self.created += 2
+        text = slot.text if slot.count == 1 else f"{slot.text} (x{slot.count})"
+        slot.label.configure(text=text)
+        if slot.timer is None:
+            slot.frame.place(relx=0.5, rely=self.rely + slot.index * self.spacing, anchor="center")
+            slot.frame.lift()
+            self.shown += 1
+        else:
+            self.parent.after_cancel(slot.timer)
+        slot.timer = self.parent.after(duration, lambda: self._expire(slot))
+
+    def _expire(self, slot):
+        slot.timer = None
+        if self.queue:
+            slot.text, duration, slot.count = self.queue.popleft()
+            self._display(slot, duration)
+        else:
+            slot.frame.place_forget()
+
+    def clear(self):
+        """Hide every message and forget the waiting ones"""
+        self.queue.clear()
+        for slot in self.slots:
+            if slot.timer is not None:
+                self.parent.after_cancel(slot.timer)
+                slot.timer = None
+                slot.frame.place_forget()
+
+    def stats(self):
+        return {
+            "widgets": self.created,
+            "visible": sum(slot.timer is not None for slot in self.slots),
+            "queued": len(self.queue),
+            "shown": self.shown,
+            "merged": self.merged,
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,86 @@
+import argparse
+import multiprocessing
+import random
+import time
+from ai import STRATEGIES
+from engine import MAX_PLAYERS, MIN_PLAYERS, UnoEngine, play_game
+
+def game_rng(seed, game_index):
+    """Independent random stream of one game.
+
+    Every game is seeded from the tournament seed and its own index, so
+    results do not depend on how games are spread over the workers.
+    """
+    return random.Random(f"{seed}:{game_index}")
+
+def play_games(task):
+    """Play a chunk of games in a worker and return its totals.
+
+    Seats rotate from game to game so no strategy keeps the first seat.
+    """
+    seed, first, count, lineup = task
+    wins = {name: 0 for name in lineup}
+    turns = 0
+    unfinished = 0
+    for game_index in range(first, first + count):
+        shift = game_index % len(lineup)
+        seats = lineup[shift:] + lineup[:shift]
+        engine = UnoEngine(num_players=len(seats), rng=game_rng(seed, game_index), uno_seats=())
+        engine.deal()
+        plays = []
+        engine.subscribe(lambda event, data: event == "play" and plays.append(data["card"]))
+        winner = play_game(engine, [STRATEGIES[name] for name in seats])
+        turns += len(plays)
+        if winner is None:
+            unfinished += 1
+        else:
+            wins[seats[winner]] += 1
+    return {"games": count, "wins": wins, "plays": turns, "unfinished": unfinished}
+
+def run_tournament(lineup, games, workers=None, seed=0, chunk_size=250):
+    """Play games over a process pool, yielding the running totals each
+    time a chunk of games finishes"""
+    tasks = [(seed, first, min(chunk_size, games - first), list(lineup))
+             for first in range(0, games, chunk_size)]
+    totals = {"games": 0, "wins": {name: 0 for name in lineup}, "plays": 0, "unfinished": 0}
+    with multiprocessing.Pool(workers) as pool:
+        for result in pool.imap_unordered(play_games, tasks):
+            totals["games"] += result["games"]
+            totals["plays"] += result["plays"]
+            totals["unfinished"] += result["unfinished"]
+            for name, count in result["wins"].items():
+                totals["wins"][name] += count
+            yield totals
+
+def main():
+    parser = argparse.ArgumentParser(description="Pit AI strategies against each other")
+    parser.add_argument("lineup", nargs="*", default=["greedy", "random", "greedy"],
+                        help=f"strategy of every seat, from: {', '.join(sorted(STRATEGIES))}")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=250)
+    args = parser.parse_args()
+    unknown = [name for name in args.lineup if name not in STRATEGIES]
+    if unknown or len(args.lineup) < MIN_PLAYERS:
+        parser.error(f"need at least {MIN_PLAYERS} known strategies, got {args.lineup}")
+    if len(args.lineup) > MAX_PLAYERS:
+        parser.error(f"UNO is played by at most {MAX_PLAYERS} players, got {len(args.lineup)}")
+    if args.games < 1 or args.chunk_size < 1:
+        parser.error("--games and --chunk-size must be at least 1")
+
+    start = time.perf_counter()
+    for totals in run_tournament(args.lineup, args.games, args.workers, args.seed, args.chunk_size):
+        elapsed = time.perf_counter() - start
+        print(f"\r{totals['games']}/{args.games} games, {totals['games'] / elapsed:.0f} games/s",
+              end="", flush=True)
+    print()
+
+    # The same strategy in several seats shares one line
+    for name, count in sorted(totals["wins"].items(), key=lambda x: -x[1]):
+        seats = args.lineup.count(name)
+        print(f"{name:>10}: {count:6d} wins ({count / totals['games']:.1%} over {seats} seat(s))")
+    print(f"{'no winner':>10}: {totals['unfinished']:6d}")
+
+if __name__ == "__main__":
+    main()